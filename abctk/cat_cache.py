@@ -0,0 +1,197 @@
+"""
+Process-wide memo tables for ABC categories.
+
+The same few thousand category strings appear over and over in the treebank.
+The functions in this module parse (and pretty-print) each of them only once
+and hand out a single shared :class:`ABCCat` object afterwards,
+so that equal categories share memory
+and most of the parsing calls boil down to dictionary lookups.
+Likewise, the reductions of the few distinct pairs of categories
+that are found on binary nodes are computed only once.
+
+Each table is bounded and evicts the least recently used entry when full.
+The size caps can be set with :func:`configure`
+(`cat-cache` in the configuration).
+Hit / miss counters are available via :func:`get_stats`.
+"""
+
+import collections
+import typing
+
+from abctk.obj.ABCCat import ABCCat, ABCCatReady, ABCCatReprMode, ElimType
+
+K = typing.TypeVar("K", bound = typing.Hashable)
+V = typing.TypeVar("V")
+
+class MemoInfo(typing.NamedTuple):
+    """
+    Statistics of a :class:`BoundedMemo`.
+    """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class BoundedMemo(typing.Generic[K, V]):
+    """
+    A memo table of a function of one hashable argument,
+    with LRU eviction and hit / miss counters.
+
+    Exceptions raised by the function are not memoized.
+    """
+
+    def __init__(
+        self,
+        func: typing.Callable[[K], V],
+        maxsize: int = 65536,
+    ):
+        self._func = func
+        self._table: typing.OrderedDict[K, V] = collections.OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, key: K) -> V:
+        table = self._table
+        try:
+            value = table[key]
+        except KeyError:
+            self.misses += 1
+            value = self._func(key)
+            table[key] = value
+            if len(table) > self.maxsize:
+                table.popitem(last = False)
+            return value
+        else:
+            self.hits += 1
+            table.move_to_end(key)
+            return value
+
+    def info(self) -> MemoInfo:
+        return MemoInfo(
+            hits = self.hits,
+            misses = self.misses,
+            maxsize = self.maxsize,
+            currsize = len(self._table),
+        )
+
+    def clear(self) -> None:
+        """
+        Empty the table and reset the counters.
+        """
+        self._table.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Change the size cap, evicting entries if necessary.
+        """
+        self.maxsize = maxsize
+        while len(self._table) > maxsize:
+            self._table.popitem(last = False)
+
+def _parse(key: typing.Tuple[str, ABCCatReprMode]) -> ABCCat:
+    source, mode = key
+    return ABCCat.parse(source, mode = mode)
+
+def _pprint(key: typing.Tuple[ABCCat, ABCCatReprMode]) -> str:
+    cat, mode = key
+    return cat.pprint(mode)
+
+SimplifyResult = typing.FrozenSet[typing.Tuple[ABCCat, ElimType]]
+
+def _simplify_exh(key: typing.Tuple[ABCCatReady, ABCCatReady]) -> SimplifyResult:
+    left, right = key
+    return frozenset(ABCCat.simplify_exh(parse_cat(left), parse_cat(right)))
+
+_MEMO_PARSE: BoundedMemo[typing.Tuple[str, ABCCatReprMode], ABCCat] = BoundedMemo(_parse)
+_MEMO_PPRINT: BoundedMemo[typing.Tuple[ABCCat, ABCCatReprMode], str] = BoundedMemo(_pprint)
+_MEMO_SIMPLIFY_EXH: BoundedMemo[
+    typing.Tuple[ABCCatReady, ABCCatReady], SimplifyResult
+] = BoundedMemo(_simplify_exh)
+
+MEMOS: typing.Dict[str, BoundedMemo] = {
+    "parse": _MEMO_PARSE,
+    "pprint": _MEMO_PPRINT,
+    "simplify_exh": _MEMO_SIMPLIFY_EXH,
+}
+"""
+All the memo tables of this module, by name.
+"""
+
+def parse_cat(
+    source: ABCCatReady,
+    mode: ABCCatReprMode = ABCCatReprMode.TLCG,
+) -> ABCCat:
+    """
+    Parse a category, interning the result.
+    A drop-in replacement of :meth:`ABCCat.parse`.
+
+    Strings equal to each other get the identical :class:`ABCCat` object
+    as long as it stays in the table.
+    """
+    if isinstance(source, str):
+        return _MEMO_PARSE((source, mode))
+    else:
+        return ABCCat.parse(source, mode = mode)
+
+def pprint_cat(
+    cat: ABCCatReady,
+    mode: ABCCatReprMode = ABCCatReprMode.TLCG,
+) -> str:
+    """
+    Pretty-print a category with memoization.
+    A drop-in replacement of :meth:`ABCCat.pprint`.
+    A string is parsed (see :func:`parse_cat`) before printed.
+    """
+    if isinstance(cat, str):
+        cat = parse_cat(cat)
+
+    return _MEMO_PPRINT((cat, mode))
+
+def simplify_exh(
+    left: ABCCatReady,
+    right: ABCCatReady,
+) -> SimplifyResult:
+    """
+    Reduce a pair of categories in all possible ways, with memoization.
+    A drop-in replacement of :meth:`ABCCat.simplify_exh`,
+    except that the result is shared and thus frozen.
+
+    Strings are parsed by :func:`parse_cat`.
+    Pairs are looked up as they are given,
+    so a category given as a string and as an :class:`ABCCat`
+    has separate entries.
+    """
+    return _MEMO_SIMPLIFY_EXH((left, right))
+
+def configure(config: typing.Mapping[str, typing.Any]) -> None:
+    """
+    Set the size caps of the memo tables
+    by the keys `<name>-max-size` (e.g. `simplify-exh-max-size`),
+    where `<name>` is a key of :data:`MEMOS` with `_` replaced by `-`.
+    Missing keys leave the tables as they are.
+    """
+    for name, memo in MEMOS.items():
+        maxsize = config.get(f"{name.replace('_', '-')}-max-size")
+        if maxsize is not None:
+            memo.resize(int(maxsize))
+
+def get_stats() -> typing.Dict[str, MemoInfo]:
+    """
+    Get the statistics of all the memo tables.
+    """
+    return {name: memo.info() for name, memo in MEMOS.items()}
+
+def clear() -> None:
+    """
+    Empty all the memo tables.
+    """
+    for memo in MEMOS.values():
+        memo.clear()
@@ -0,0 +1,311 @@
+"""
+Precompiled patterns of ABC categories for tree rewriting rules.
+
+Rules check the categories of nodes against fixed categories (e.g. `<N/N>`).
+A :class:`CatPattern` parses its category once
+and memoizes its verdict per category object,
+so that checking a node mostly boils down to a dictionary lookup
+(the categories of nodes are interned by :mod:`abctk.cat_cache`).
+
+A :class:`CatPatternSet` checks a category against many patterns at once.
+The patterns are indexed by their shapes,
+i.e. the categories with the base categories abstracted away
+(e.g. `<N/N>` and `<NP/NP>` share the shape `<_/_>`),
+so that only the patterns of the same shape as the category are tried
+(a discrimination tree keyed on the functor structure, flattened into a dict).
+
+The comparison is chosen by :class:`MatchMode`.
+
+Examples
+--------
+>>> import abctk.cat_pattern as cp
+>>> PAT_REL = cp.CatPattern("<N/N>", cp.MatchMode.EXACT) # doctest: +SKIP
+>>> PAT_REL.match("<N/N>") # doctest: +SKIP
+True
+"""
+
+import enum
+import typing
+
+import abctk.cat_cache as cc
+import abctk.obj.ABCCat as abcc
+from abctk.obj.ABCCat import ABCCat, ABCCatReady
+
+V = typing.TypeVar("V")
+
+class MatchMode(enum.Enum):
+    """
+    How a category is compared with a pattern.
+    """
+
+    EXACT = "exact"
+    """
+    Equal to the pattern, features included.
+    """
+
+    IGNORE_FEATURE = "ignore-feature"
+    """
+    Equivalent to the pattern, features ignored
+    (:meth:`ABCCat.equiv_to` with `ignore_feature`).
+    """
+
+    UNIFY = "unify"
+    """
+    Unifiable with the pattern (:meth:`ABCCat.unify`).
+    ⊥ in a pattern or in a category is taken as a wildcard
+    in looking up the patterns to try.
+    """
+
+def _match_exact(cat: ABCCat, pattern: ABCCat) -> bool:
+    return cat == pattern
+
+def _match_ignore_feature(cat: ABCCat, pattern: ABCCat) -> bool:
+    return cat.equiv_to(pattern, ignore_feature = True)
+
+def _match_unify(cat: ABCCat, pattern: ABCCat) -> bool:
+    return bool(cat.unify(pattern))
+
+_MATCHERS: typing.Dict[MatchMode, typing.Callable[[ABCCat, ABCCat], bool]] = {
+    MatchMode.EXACT: _match_exact,
+    MatchMode.IGNORE_FEATURE: _match_ignore_feature,
+    MatchMode.UNIFY: _match_unify,
+}
+
+Shape = typing.Hashable
+
+_SHAPE_BASE = "_"
+_SHAPE_BOT = "⊥"
+_SHAPE_WILDCARD = "*"
+
+def cat_shape(
+    cat: ABCCat,
+    bot_as_wildcard: bool = False,
+) -> typing.Tuple[Shape, bool]:
+    """
+    Get the shape of a category,
+    i.e. its functor structure with the base categories abstracted away.
+
+    Parameters
+    ----------
+    cat
+    bot_as_wildcard
+        Take ⊥ as a wildcard.
+
+    Returns
+    -------
+    shape
+        A hashable key.
+    has_wildcard
+        Whether the shape contains a wildcard.
+    """
+    # categories are shallow
+    if isinstance(cat, abcc.ABCCatFunctor):
+        shape_ant, wc_ant = cat_shape(cat.ant, bot_as_wildcard)
+        shape_conseq, wc_conseq = cat_shape(cat.conseq, bot_as_wildcard)
+        return (cat.func_mode, shape_ant, shape_conseq), wc_ant or wc_conseq
+    elif isinstance(cat, abcc.ABCCatBot):
+        if bot_as_wildcard:
+            return _SHAPE_WILDCARD, True
+        else:
+            return _SHAPE_BOT, False
+    else:
+        return _SHAPE_BASE, False
+
+class _IdentityMemo(typing.Generic[V]):
+    """
+    A memo table of a function of a category, keyed by the identity of the category.
+
+    The hashes of categories are computed over their whole structures,
+    which costs more than the checks themselves.
+    The categories of nodes are mostly the objects interned by :mod:`abctk.cat_cache`,
+    so that identical objects come again and again.
+    Each entry keeps its category alive so that the identity is not reused.
+    The oldest entry is evicted when the table is full.
+    """
+
+    def __init__(
+        self,
+        func: typing.Callable[[ABCCat], V],
+        maxsize: int = 4096,
+    ):
+        self._func = func
+        self._table: typing.Dict[int, typing.Tuple[ABCCat, V]] = {}
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, cat: ABCCat) -> V:
+        entry = self._table.get(id(cat))
+        if entry is not None and entry[0] is cat:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = self._func(cat)
+        table = self._table
+        if len(table) >= self.maxsize:
+            del table[next(iter(table))]
+        table[id(cat)] = (cat, value)
+        return value
+
+    def info(self) -> cc.MemoInfo:
+        return cc.MemoInfo(
+            hits = self.hits,
+            misses = self.misses,
+            maxsize = self.maxsize,
+            currsize = len(self._table),
+        )
+
+class CatPattern:
+    """
+    A category pattern, parsed once.
+
+    Parameters
+    ----------
+    pattern
+        The category. Strings are parsed by :func:`abctk.cat_cache.parse_cat`.
+    mode
+        See :class:`MatchMode`.
+    maxsize
+        The size cap of the memo table of the verdicts.
+    """
+
+    def __init__(
+        self,
+        pattern: ABCCatReady,
+        mode: MatchMode = MatchMode.IGNORE_FEATURE,
+        maxsize: int = 4096,
+    ):
+        self.cat: ABCCat = cc.parse_cat(pattern)
+        self.mode = mode
+        self._matcher = _MATCHERS[mode]
+        self._bot_as_wildcard = mode is MatchMode.UNIFY
+        self._shape, self._has_wildcard = cat_shape(
+            self.cat, self._bot_as_wildcard
+        )
+        self._memo: _IdentityMemo[bool] = _IdentityMemo(self._match, maxsize)
+
+    def _match(self, cat: ABCCat) -> bool:
+        if not self._has_wildcard:
+            shape, has_wildcard = cat_shape(cat, self._bot_as_wildcard)
+            if not has_wildcard and shape != self._shape:
+                return False
+        # === END IF ===
+
+        return self._matcher(cat, self.cat)
+
+    def match(self, cat: ABCCatReady) -> bool:
+        """
+        Check a category against the pattern.
+        Strings are parsed by :func:`abctk.cat_cache.parse_cat`.
+        """
+        if isinstance(cat, str):
+            cat = cc.parse_cat(cat)
+        return self._memo(cat)
+
+    __call__ = match
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({cc.pprint_cat(self.cat)!r}, {self.mode})"
+
+class CatPatternSet(typing.Generic[V]):
+    """
+    A sequence of category patterns, each with a value,
+    checked at once.
+
+    Parameters
+    ----------
+    patterns
+        The patterns and their values.
+        Strings are parsed by :func:`abctk.cat_cache.parse_cat`.
+    mode
+        See :class:`MatchMode`.
+    maxsize
+        The size cap of the memo table of the matches.
+    """
+
+    def __init__(
+        self,
+        patterns: typing.Iterable[typing.Tuple[ABCCatReady, V]],
+        mode: MatchMode = MatchMode.IGNORE_FEATURE,
+        maxsize: int = 4096,
+    ):
+        patterns = tuple(patterns)
+        self.cats: typing.Tuple[ABCCat, ...] = tuple(
+            cc.parse_cat(cat) for cat, _ in patterns
+        )
+        self.values: typing.Tuple[V, ...] = tuple(value for _, value in patterns)
+        self.mode = mode
+        self._matcher = _MATCHERS[mode]
+        self._bot_as_wildcard = mode is MatchMode.UNIFY
+
+        # the patterns to try, by shape, in the given order
+        index: typing.Dict[Shape, typing.List[int]] = {}
+        generic: typing.List[int] = []
+        for i, cat in enumerate(self.cats):
+            shape, has_wildcard = cat_shape(cat, self._bot_as_wildcard)
+            if has_wildcard:
+                generic.append(i)
+            else:
+                index.setdefault(shape, []).append(i)
+        # === END FOR ===
+
+        self._index: typing.Dict[Shape, typing.Tuple[int, ...]] = {
+            shape: tuple(sorted(indices + generic))
+            for shape, indices in index.items()
+        }
+        self._generic = tuple(generic)
+        self._all = tuple(range(len(self.cats)))
+        self._memo: _IdentityMemo[typing.Tuple[int, ...]] = _IdentityMemo(
+            self._match_indices, maxsize
+        )
+
+    def __len__(self) -> int:
+        return len(self.cats)
+
+    def _match_indices(self, cat: ABCCat) -> typing.Tuple[int, ...]:
+        shape, has_wildcard = cat_shape(cat, self._bot_as_wildcard)
+        if has_wildcard:
+            candidates = self._all
+        else:
+            candidates = self._index.get(shape, self._generic)
+
+        cats = self.cats
+        matcher = self._matcher
+        return tuple(i for i in candidates if matcher(cat, cats[i]))
+
+    def match_all(self, cat: ABCCatReady) -> typing.Tuple[V, ...]:
+        """
+        Get the values of all the patterns that a category matches,
+        in the given order.
+        Strings are parsed by :func:`abctk.cat_cache.parse_cat`.
+        """
+        if isinstance(cat, str):
+            cat = cc.parse_cat(cat)
+
+        values = self.values
+        return tuple(values[i] for i in self._memo(cat))
+
+    def match_first(
+        self,
+        cat: ABCCatReady,
+        default: typing.Optional[V] = None,
+    ) -> typing.Optional[V]:
+        """
+        Get the value of the first pattern that a category matches,
+        or `default` if none.
+        """
+        if isinstance(cat, str):
+            cat = cc.parse_cat(cat)
+
+        indices = self._memo(cat)
+        return self.values[indices[0]] if indices else default
+
+    def match_any(self, cat: ABCCatReady) -> bool:
+        """
+        Check if a category matches any of the patterns.
+        """
+        if isinstance(cat, str):
+            cat = cc.parse_cat(cat)
+
+        return bool(self._memo(cat))
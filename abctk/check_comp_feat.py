@@ -9,6 +9,7 @@ from nltk.tree import Tree
 
 from abctk import ABCTException
 from abctk.obj.ABCCat import Annot
+from abctk.transform_ABC.visitor import fold_tree
 
 _re_comp = re.compile(r"^(?P<index>[0-9]),(?P<names>.+)$")
 
@@ -79,11 +80,28 @@ def collect_comp_feats(
 ) -> typing.Dict[str, typing.Counter[str]]:
     root_found = root_found or dict()
 
-    # Collect info of the children
-    for child in tree:
-        if isinstance(child, Tree):
-            collect_comp_feats(child, ID, root_found)
+    # NOTE: the findings are shared among the nodes
+    # only if `root_found` is given non-empty.
+    # Otherwise, each node collects into its own new dict,
+    # and only those of the root are returned.
+    shared = bool(root_found)
 
+    def _collect(node: Tree, _) -> None:
+        _collect_comp_feats_node(
+            node, ID,
+            root_found if shared or node is tree else dict(),
+        )
+
+    # Collect info of the children first
+    fold_tree(tree, _collect)
+
+    return root_found
+
+def _collect_comp_feats_node(
+    tree: Tree,
+    ID: str,
+    root_found: typing.Dict[str, typing.Counter[str]],
+) -> None:
     label: Annot = tree.label()
 
     if (
@@ -119,5 +137,3 @@ def collect_comp_feats(
                 root_found["index"].update(feats)
         else:
             raise UngrammaticalCompFeatureException(ID, feat_comp)
-
-    return root_found
\ No newline at end of file
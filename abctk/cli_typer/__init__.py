@@ -61,6 +61,30 @@ def cmd_main(
         [],
         "--logfile-level",
     ),
+    profile_path: typing.Optional[pathlib.Path] = typer.Option(
+        None,
+        "--profile",
+        file_okay = True,
+        dir_okay = False,
+        help = """
+            Write a JSON report of the time, the trees and the memory of each stage
+            (loaders, tree operations and writers) to FILE.
+        """
+    ),
+    profile_cprofile: bool = typer.Option(
+        False,
+        "--profile-cprofile",
+        help = """
+            Along with `--profile`, dump a cProfile profile of each stage next to the report.
+        """
+    ),
+    profile_tracemalloc: bool = typer.Option(
+        False,
+        "--profile-tracemalloc",
+        help = """
+            Along with `--profile`, record the peak of the memory traced by tracemalloc in each stage.
+        """
+    ),
 ):
     """
     A CLI toolkit to generate and manupilate the ABC Treebank.
@@ -79,6 +103,8 @@ def cmd_main(
     logfiles
         List of additional log handlers.
         Each item consists of a tuple of a log level and an output path.
+    profile_path
+        The path of the profile report. See :mod:`abctk.profiling`.
     """
     ctx.ensure_object(dict)
 
@@ -139,6 +165,26 @@ def cmd_main(
 
     ctx.obj["CONFIG"] = CONFIG
 
+    import abctk.cat_cache as cc
+    cc.configure(CONFIG.get("cat-cache", {}))
+    import abctk.transform_ABC.morph_janome as mj
+    mj.configure(CONFIG.get("morph-cache", {}))
+
+    # ====================
+    # Set up profiling
+    # ====================
+    if profile_path:
+        import abctk.profiling as prof
+
+        prof.activate(
+            prof.Profiler(
+                profile_path,
+                use_cprofile = profile_cprofile,
+                use_tracemalloc = profile_tracemalloc,
+            )
+        )
+        # after all the subcommands
+        ctx.call_on_close(prof.close)
 
 @app.command("version")
 def cmd_ver():
@@ -197,6 +243,12 @@ app.add_typer(renumber.app, name = "renum")
 from . import ccg2lambda
 app.add_typer(ccg2lambda.app, name = "c2l")
 
+from . import cache
+app.add_typer(cache.app, name = "cache")
+
+from . import fetch
+app.command("fetch")(fetch.cmd_main)
+
 @app.command("interp-parse-result")
 def cmd_interp_parse():
     """
@@ -210,13 +262,13 @@ def cmd_interp_parse():
 
     trees_with_ID = load_ABC_parsed_jsonl_psd(sys.stdin)
 
-    sys.stdout.writelines(
-        nt.flatten_tree_with_ID(ID, tree) + "\n"
-        for ID, tree in trees_with_ID
-    )
+    with nt.PTBWriter(sys.stdout) as writer:
+        for ID, tree in trees_with_ID:
+            writer.write_tree_with_ID(ID, tree)
 
 @app.command("ml-prep")
 def cmd_ml_prep(
+    ctx: typer.Context,
     source_path: pathlib.Path = typer.Argument(
         ...,
         help = """
@@ -229,23 +281,106 @@ def cmd_ml_prep(
         The destination.
         """
     ),
+    use_cache: typing.Optional[bool] = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help = """
+        Whether to use the on-disk cache of parsed trees.
+        Defaults to `tree-cache.enabled` in the configuration.
+        """
+    ),
 ):
     """
     Generate necessary ingredients for depccg training.
     """
     import abctk.io.nltk_tree as nt
+    import abctk.io.psd_cache as pc
     import abctk.ml.gen as g
-    tb = list(nt.load_ABC_psd(source_path))
-
-    ds = g.DepCCGDataSet.from_ABC_NLTK_trees(
-        tb,
+    import abctk.profiling as prof
+    tb = list(
+        prof.wrap_iter(
+            "Loading trees",
+            nt.load_ABC_psd(
+                source_path,
+                n_jobs = ctx.obj["CONFIG"]["max_process_num"],
+                cache = pc.PSDCache.from_config(
+                    ctx.obj["CONFIG"], enabled = use_cache
+                ),
+            ),
+        )
     )
 
-    with fs.open_fs(str(dest_path), create = True) as folder:
-        ds.dump(
-            folder, 
-            add_seen_rules = True
+    with prof.stage("Building the dataset") as stats:
+        ds = g.DepCCGDataSet.from_ABC_NLTK_trees(
+            tb,
         )
+        if stats:
+            stats.trees_in = stats.trees_out = len(tb)
+
+    with prof.stage("Dumping the dataset"):
+        with fs.open_fs(str(dest_path), create = True) as folder:
+            ds.dump(
+                folder, 
+                add_seen_rules = True
+            )
+
+@app.command("obfus")
+def cmd_obfuscate(
+    ctx: typer.Context,
+    source_path: pathlib.Path = typer.Argument(
+        ...,
+        exists = True,
+        file_okay = False,
+        dir_okay = True,
+        help = """
+        The path to the treebank.
+        """
+    ),
+    dest_path: pathlib.Path = typer.Argument(
+        ...,
+        help = """
+        The destination folder.
+        """
+    ),
+    filter: str = typer.Option(
+        "closed",
+        help = """A regex that specifies
+the IDs of the trees to be obfuscated.
+Default to /closed/."""
+    ),
+    n_jobs: int = typer.Option(
+        1,
+        "--jobs", "-j",
+        min = 1,
+        help = """
+        The number of worker processes, each of which obfuscates a file at a time.
+        """
+    ),
+):
+    """
+    Obfuscate a treebank file by file for license / copyright reasons.
+
+    The output is the same as that of
+    `abctk tweak treebank SOURCE_PATH obfus write DEST_PATH`
+    as long as no two files have trees of the same name.
+    """
+    from tqdm import tqdm
+    import abctk.obfuscate
+    import abctk.profiling as prof
+
+    with prof.stage("Obfuscating files") as stats:
+        with tqdm(desc = "Obfuscating files", unit = "file") as bar:
+            for _, count in abctk.obfuscate.obfuscate_psd_folder(
+                source_path,
+                dest_path,
+                filter = filter,
+                skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"],
+                n_jobs = n_jobs,
+            ):
+                bar.update(1)
+                if stats:
+                    stats.trees_in += count
+                    stats.trees_out += count
 
 @app.command("parse")
 def cmd_parse():
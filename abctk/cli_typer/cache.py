@@ -0,0 +1,53 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import sys
+
+import typer
+
+import abctk.io.psd_cache as pc
+
+app = typer.Typer()
+
+@app.callback()
+def cmd_main():
+    """
+    Manage the on-disk cache of parsed treebank files.
+
+    The cache is disabled by default.
+    Enable it by setting `tree-cache.enabled` to true in the configuration
+    or by the `--cache` option of the commands that load treebanks.
+    """
+
+@app.command("stats")
+def cmd_stats(
+    ctx: typer.Context,
+):
+    """
+    Show the statistics of the cache.
+    """
+    import humanize
+
+    cache = pc.PSDCache.from_config(ctx.obj["CONFIG"], enabled = True)
+    if cache is None: raise RuntimeError
+
+    stats = cache.stats()
+    sys.stdout.write(
+        f"Folder: {cache.folder}\n"
+        f"Entries: {stats.entries:,}\n"
+        f"Size: {humanize.naturalsize(stats.size, binary = True)} "
+        f"/ {humanize.naturalsize(stats.max_size, binary = True)}\n"
+    )
+
+@app.command("clear")
+def cmd_clear(
+    ctx: typer.Context,
+):
+    """
+    Remove all the entries of the cache.
+    """
+    cache = pc.PSDCache.from_config(ctx.obj["CONFIG"], enabled = True)
+    if cache is None: raise RuntimeError
+
+    count = cache.clear()
+    sys.stdout.write(f"{count:,} cache entries removed from {cache.folder}\n")
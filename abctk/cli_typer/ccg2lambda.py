@@ -14,6 +14,7 @@ import abctk.ccg2lambda.ccg2lambda_tools
 import abctk.ccg2lambda.semantic_index
 import abctk.ccg2lambda.semparse
 import abctk.ccg2lambda.visualization_tools
+import abctk.profiling as prof
 
 app = typer.Typer()
 
@@ -71,143 +72,149 @@ def cmd_semparse(
 
     # 1. Load sem template
     logger.info("Commencing Step 1: Load semantic templates")
-
-    sem_index = {}
-    if drs:
-        with resc.path("abctk.ccg2lambda", "semantics_comparatives_event.yaml") as sem_index_drs_path: 
-            sem_index_drs_path_str = str(sem_index_drs_path)
-            sem_index["drs"] = abctk.ccg2lambda.semantic_index.SemanticIndex(
-                sem_index_drs_path_str
-            )
-            logger.info(f"Loaded the semantic template DRS at {sem_index_drs_path_str}")
-    if hol:
-        with resc.path("abctk.ccg2lambda", "semantics_comparatives_hol.yaml") as sem_index_hol_path:
-            sem_index_hol_path_str = str(sem_index_hol_path)
-            sem_index["hol"] = abctk.ccg2lambda.semantic_index.SemanticIndex(
-                sem_index_hol_path_str
+    with prof.stage("Loading semantic templates"):
+        sem_index = {}
+        if drs:
+            with resc.path("abctk.ccg2lambda", "semantics_comparatives_event.yaml") as sem_index_drs_path: 
+                sem_index_drs_path_str = str(sem_index_drs_path)
+                sem_index["drs"] = abctk.ccg2lambda.semantic_index.SemanticIndex(
+                    sem_index_drs_path_str
+                )
+                logger.info(f"Loaded the semantic template DRS at {sem_index_drs_path_str}")
+        if hol:
+            with resc.path("abctk.ccg2lambda", "semantics_comparatives_hol.yaml") as sem_index_hol_path:
+                sem_index_hol_path_str = str(sem_index_hol_path)
+                sem_index["hol"] = abctk.ccg2lambda.semantic_index.SemanticIndex(
+                    sem_index_hol_path_str
+                )
+                logger.info(f"Loaded the semantic template HOL at {sem_index_hol_path_str}")
+        for path_template, name in zip(templates, templates_names):
+            sem_index[name] = abctk.ccg2lambda.semantic_index.SemanticIndex(
+                str(path_template)
             )
-            logger.info(f"Loaded the semantic template HOL at {sem_index_hol_path_str}")
-    for path_template, name in zip(templates, templates_names):
-        sem_index[name] = abctk.ccg2lambda.semantic_index.SemanticIndex(
-            str(path_template)
-        )
-        logger.info(f"Loaded the semantic template {name} at {str(path_template)}")
+            logger.info(f"Loaded the semantic template {name} at {str(path_template)}")
 
-    if not sem_index:
-        logger.warning("No semantics template is loaded")
+        if not sem_index:
+            logger.warning("No semantics template is loaded")
 
     # 2. Parse JIGG XML
     logger.info("Commencing Step 2: Load JIGG XML files")
-
-    parser = etree.XMLParser(remove_blank_text = True)
-    source_path: str = str(source)
-    if source_path == "-":
-        root: etree._Element = etree.parse(
-            sys.stdin,
-            parser
-        )
-        logger.info("Loaded the trees from STDIN")
-    else:
-        root = etree.parse(
-            source_path,
-            parser
-        )
-        logger.info(f"Loaded the trees in {source_path}")
-    sentences = root.findall(".//sentence")
+    with prof.stage("Loading JIGG XML") as stats:
+        parser = etree.XMLParser(remove_blank_text = True)
+        source_path: str = str(source)
+        if source_path == "-":
+            root: etree._Element = etree.parse(
+                sys.stdin,
+                parser
+            )
+            logger.info("Loaded the trees from STDIN")
+        else:
+            root = etree.parse(
+                source_path,
+                parser
+            )
+            logger.info(f"Loaded the trees in {source_path}")
+        sentences = root.findall(".//sentence")
+        if stats:
+            stats.trees_out = len(sentences)
 
     res: typing.List[SemParseRecord] = []
 
     # 3. For each sentence and each of its ccg parses
     logger.info("Commencing Step 3: Semantic conversion")
-    
-    # For each sentence and each of its ccg parses
-    for sent_count, sentence in tqdm(
-        enumerate(sentences),
-        total = len(sentences), 
-        desc = "Elaborating semantics",
-    ):
-        sentence_id = sentence.attrib.get(
-            "abc_id", 
-            f"UNTITLED_{sent_count}"
-        )
-
-        for ccg_num, ccg in enumerate(sentence.xpath("./ccg"), start = 1):
-            # 3.0. Create record
-            record = SemParseRecord(
-                sentence_id, ccg_num, 
-                ccg,
-                {},
-                sentence.xpath("./tokens")[0],
-                surf = abctk.ccg2lambda.visualization_tools.get_surf_from_xml_node(sentence)
+    with prof.stage("Elaborating semantics") as stats:
+        # For each sentence and each of its ccg parses
+        for sent_count, sentence in tqdm(
+            enumerate(sentences),
+            total = len(sentences), 
+            desc = "Elaborating semantics",
+        ):
+            sentence_id = sentence.attrib.get(
+                "abc_id", 
+                f"UNTITLED_{sent_count}"
             )
-            res.append(record)
 
-            # 3.1. create sem
-            for sem_type, s_index in sem_index.items():
-                sem_node = etree.Element("semantics")
-                sem_node.set("type", sem_type)
+            for ccg_num, ccg in enumerate(sentence.xpath("./ccg"), start = 1):
+                # 3.0. Create record
+                record = SemParseRecord(
+                    sentence_id, ccg_num, 
+                    ccg,
+                    {},
+                    sentence.xpath("./tokens")[0],
+                    surf = abctk.ccg2lambda.visualization_tools.get_surf_from_xml_node(sentence)
+                )
+                res.append(record)
 
-                try:
-                    sem_tree = abctk.ccg2lambda.ccg2lambda_tools.assign_semantics_to_ccg(
-                        sentence,
-                        s_index,
-                        ccg_num,
-                    )
-                    abctk.ccg2lambda.semparse.filter_attributes(sem_tree)
-                    sem_node.extend(
-                        sem_tree.xpath(".//descendant-or-self::span")
-                    )
-                    if "sem" in sem_tree.attrib and sem_tree.attrib["sem"]:
-                        sem_node.set("status", "success")
-                    else:
-                        sem_node.set("status", "failed")
+                # 3.1. create sem
+                for sem_type, s_index in sem_index.items():
+                    sem_node = etree.Element("semantics")
+                    sem_node.set("type", sem_type)
+
+                    try:
+                        sem_tree = abctk.ccg2lambda.ccg2lambda_tools.assign_semantics_to_ccg(
+                            sentence,
+                            s_index,
+                            ccg_num,
+                        )
+                        abctk.ccg2lambda.semparse.filter_attributes(sem_tree)
+                        sem_node.extend(
+                            sem_tree.xpath(".//descendant-or-self::span")
+                        )
+                        if "sem" in sem_tree.attrib and sem_tree.attrib["sem"]:
+                            sem_node.set("status", "success")
+                        else:
+                            sem_node.set("status", "failed")
                     
-                    sem_node.set("ccg_id",
-                        sentence.xpath(f'./ccg[{ccg_num}]/@id')[0]
-                    )
-                    sem_node.set("root",
-                        sentence.xpath(f'./ccg[{ccg_num}]/@root')[0]
-                    )
+                        sem_node.set("ccg_id",
+                            sentence.xpath(f'./ccg[{ccg_num}]/@id')[0]
+                        )
+                        sem_node.set("root",
+                            sentence.xpath(f'./ccg[{ccg_num}]/@root')[0]
+                        )
 
-                except Exception as e:
-                    sem_node.set("status", "failed")
-                    sentence_surf = " ".join(sentence.xpath("tokens/token/@surf"))
+                    except Exception as e:
+                        sem_node.set("status", "failed")
+                        sentence_surf = " ".join(sentence.xpath("tokens/token/@surf"))
 
-                    logging.error(
-                        "An error occurred during semantic assignment. "
-                        f"Sentence: {sentence_surf}."
-                        f"Error: {e}, "
-                    )
+                        logging.error(
+                            "An error occurred during semantic assignment. "
+                            f"Sentence: {sentence_surf}."
+                            f"Error: {e}, "
+                        )
+                        prof.count_skipped()
 
-                sentence.append(sem_node)
-                record.semparses[sem_type] = sem_node
+                    sentence.append(sem_node)
+                    record.semparses[sem_type] = sem_node
+        if stats:
+            stats.trees_in = len(sentences)
+            stats.trees_out = len(res)
 
     # 4. Dump
     logger.info("Commencing Step 4: Dump results")
-
-    with fs.open_fs(str(dest), create = True) as folder:
-        # 4.1. Dump sem.xml
-        with folder.open("sem.xml", "w") as f_sem_xml:
-            f_sem_xml.write(
-                etree.tostring(
-                    root,
-                    #xml_declaration = True,
-                    encoding = str,
-                    pretty_print = True,
+    with prof.stage("Rendering semantics") as stats:
+        with fs.open_fs(str(dest), create = True) as folder:
+            # 4.1. Dump sem.xml
+            with folder.open("sem.xml", "w") as f_sem_xml:
+                f_sem_xml.write(
+                    etree.tostring(
+                        root,
+                        #xml_declaration = True,
+                        encoding = str,
+                        pretty_print = True,
+                    )
                 )
-            )
-        logger.info(f"Semantics XML successfully dumped into {str(dest)}/sem.xml")
+            logger.info(f"Semantics XML successfully dumped into {str(dest)}/sem.xml")
 
-        # 4.2 Preparation
-        folder.makedirs("rendered", recreate = True)
-        f_index = folder.open("index.html", "w")
-        headers_sem_types = "\n".join(
-            rf"<th>{sem_type}</th>"
-            for sem_type in sem_index.keys()
-        )
+            # 4.2 Preparation
+            folder.makedirs("rendered", recreate = True)
+            f_index = folder.open("index.html", "w")
+            headers_sem_types = "\n".join(
+                rf"<th>{sem_type}</th>"
+                for sem_type in sem_index.keys()
+            )
 
-        f_index.write(
-            rf"""
+            f_index.write(
+                rf"""
         <!DOCTYPE html>
 <html lang="ja">
 <head>
@@ -222,54 +229,56 @@ def cmd_semparse(
         {headers_sem_types}
     </tr>
             """
-        )
+            )
 
-        # 4.3 rendering
-        try:
-            for record in tqdm(
-                res,
-                total = len(res), 
-                desc = "Rendering semantics in HTML",
-            ):
-                sent_path = f"rendered/{record.abc_id}-{record.ccg_num}.html"
-                f_index.write(fr"""
+            # 4.3 rendering
+            try:
+                for record in tqdm(
+                    res,
+                    total = len(res), 
+                    desc = "Rendering semantics in HTML",
+                ):
+                    sent_path = f"rendered/{record.abc_id}-{record.ccg_num}.html"
+                    f_index.write(fr"""
     <tr>
         <td><a href="./{sent_path}">{record.abc_id}</a></td>
         <td>{record.ccg_num}</td>
                 """
-                )
-                with folder.open(sent_path, "w") as f_sent:
-                    sent_html = ""
-                    for sem_type, sem_xml in record.semparses.items():
-                        sent_html += f"<h2>{sem_type}</h2>"
-                        sent_html += abctk.ccg2lambda.visualization_tools.convert_sentence_to_mathml_2(
-                                sentence_label = f"{record.abc_id}-{record.ccg_num}",
-                                sentence_text = record.surf,
-                                xml_ccg = record.ccg,
-                                xml_sem = sem_xml,
-                                xml_tokens = record.tokens,
-                                is_drt = "drs" in sem_type,
-                            )
+                    )
+                    with folder.open(sent_path, "w") as f_sent:
+                        sent_html = ""
+                        for sem_type, sem_xml in record.semparses.items():
+                            sent_html += f"<h2>{sem_type}</h2>"
+                            sent_html += abctk.ccg2lambda.visualization_tools.convert_sentence_to_mathml_2(
+                                    sentence_label = f"{record.abc_id}-{record.ccg_num}",
+                                    sentence_text = record.surf,
+                                    xml_ccg = record.ccg,
+                                    xml_sem = sem_xml,
+                                    xml_tokens = record.tokens,
+                                    is_drt = "drs" in sem_type,
+                                )
 
-                        status = sem_xml.attrib["status"] if sem_xml else "NO OUTPUT"
+                            status = sem_xml.attrib["status"] if sem_xml else "NO OUTPUT"
 
-                        f_index.write(
-                            fr"""
+                            f_index.write(
+                                fr"""
         <td>{status}</td>
                             """
-                        )
-                    # === END FOR sem_type, sem_xml ===
+                            )
+                        # === END FOR sem_type, sem_xml ===
                     
-                    sent_html = abctk.ccg2lambda.visualization_tools.wrap_mathml_in_html(sent_html)
-                    f_sent.write(sent_html)
-                # === END WITH f_sent ===
+                        sent_html = abctk.ccg2lambda.visualization_tools.wrap_mathml_in_html(sent_html)
+                        f_sent.write(sent_html)
+                    # === END WITH f_sent ===
 
-                f_index.write("</tr>")
-            # === END FOR record ===
-            f_index.write(r"""
+                    f_index.write("</tr>")
+                # === END FOR record ===
+                f_index.write(r"""
 </table>
 </body>
 </html>
             """)
-        finally:
-            if f_index: f_index.close()
+            finally:
+                if f_index: f_index.close()
+        if stats:
+            stats.trees_in = stats.trees_out = len(res)
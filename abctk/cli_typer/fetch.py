@@ -0,0 +1,73 @@
+import logging
+logger = logging.getLogger(__name__)
+
+import pathlib
+import sys
+import typing
+
+import typer
+
+import abctk.io.psd_index as pi
+
+def cmd_main(
+    source_path: pathlib.Path = typer.Argument(
+        ...,
+        exists = True,
+        file_okay = False,
+        dir_okay = True,
+        help = """
+        The path to the treebank.
+        """
+    ),
+    IDs: typing.List[str] = typer.Argument(
+        ...,
+        help = """
+        The IDs of the trees to fetch.
+        """
+    ),
+    index_path: typing.Optional[pathlib.Path] = typer.Option(
+        None,
+        "--index",
+        dir_okay = False,
+        help = f"""
+        The path to the index.
+        Defaults to `{pi.INDEX_FILE_NAME}` in the treebank folder.
+        """
+    ),
+    update: bool = typer.Option(
+        True,
+        "--update/--no-update",
+        help = """
+        Whether to update the index before fetching.
+        Only modified files are rescanned.
+        """
+    ),
+    force_rebuild: bool = typer.Option(
+        False,
+        "--rebuild",
+        help = """
+        Rebuild the whole index before fetching.
+        """
+    ),
+):
+    """
+    Fetch trees by their IDs using a sidecar index of the treebank.
+    The trees are printed as they are in the treebank.
+    """
+    missing = []
+    with pi.PSDIndex(source_path, index_path) as index:
+        if update or force_rebuild:
+            stats = index.update(force = force_rebuild)
+            logger.info(f"Index updated: {stats}")
+
+        for ID in IDs:
+            block = index.get_raw(ID)
+            if block is None:
+                logger.warning(f"Tree {ID} is not found")
+                missing.append(ID)
+            else:
+                sys.stdout.write(block.rstrip())
+                sys.stdout.write("\n")
+
+    if missing:
+        raise typer.Exit(code = 1)
@@ -2,13 +2,10 @@ import logging
 
 from abctk.obj.Keyaki import Keyaki_ID
 logger = logging.getLogger(__name__)
-import os
 import pathlib
 import random
 import string
 import sys
-import tempfile
-import typing
 
 import typer
 
@@ -57,49 +54,41 @@ def cmd_from_file(
 
     name_random = "".join(random.choice(string.ascii_letters) for _ in range(6))
 
-    with tempfile.TemporaryDirectory(prefix = "abct_renum_") as temp_folder:
-        source_file: typing.Optional[typing.IO[str]] = None
-        dest_file: typing.Optional[typing.IO[str]] = None
-        try:
-            if source_path.name == "-":
-                # load from stdin
-                source_file = tempfile.NamedTemporaryFile("w", dir = temp_folder)
-                source_file.write(sys.stdin.read())
-                source_file.flush()
-                logger.info(f"STDIN loaded in {source_file.name}")
-            else:
-                source_path = source_path.resolve()
-                source_file_path = f"{temp_folder}/{source_path.name}"
-                os.symlink(source_path, dst = source_file_path)
-                logger.info(f"File symlinked to {source_file_path}")
-
-            tb = nt.load_Keyaki_Annot_psd(temp_folder, re_filter = ".*")
-
-            if dest_path.name == "-":
-                dest_file = sys.stdout
-            else:
-                dest_file = open(str(dest_path.resolve()), "w")
+    # trees are parsed as the lines come in
+    tb = nt.load_Keyaki_Annot_stream(
+        nt.iter_source_lines(source_path),
+        name = "<STDIN>" if source_path.name == "-" else str(source_path),
+    )
 
-            tb_mapped = (
-                (
-                    Keyaki_ID.from_string(
-                        fmt.format(
-                            id_orig = id_orig, 
-                            new_num = num,
-                            name_random = name_random
-                        )
-                    ),
-                    tree
+    tb_mapped = (
+        (
+            Keyaki_ID.from_string(
+                fmt.format(
+                    id_orig = id_orig, 
+                    new_num = num,
+                    name_random = name_random
                 )
-                for num, (id_orig, tree) in enumerate(tb, start = 1)
-            )
+            ),
+            tree
+        )
+        for num, (id_orig, tree) in enumerate(tb, start = 1)
+    )
 
-            dest_file.write(
-                "\n".join(
-                    nt.flatten_tree_with_ID(ID, tree)
-                    for ID, tree in tb_mapped
-                )
-            )
-        finally: 
-            if source_file: source_file.close()
-            if dest_file: dest_file.close()
\ No newline at end of file
+    if dest_path.name == "-":
+        dest_file = sys.stdout
+    else:
+        dest_file = open(str(dest_path.resolve()), "w")
+
+    try:
+        with nt.PTBWriter(
+            dest_file,
+            buffer_size = 1 if dest_file is sys.stdout else 64 * 1024,
+        ) as writer:
+            for num, (ID, tree) in enumerate(tb_mapped):
+                # trees are separated by newlines
+                if num > 0:
+                    writer.write_raw("\n")
+                writer.write_tree_with_ID(ID, tree, end = "")
+    finally: 
+        if dest_file is not sys.stdout:
+            dest_file.close()
@@ -1,11 +1,10 @@
 import importlib.resources
+import itertools
 import logging
 logger = logging.getLogger(__name__)
 
-import os
 import pathlib
 import sys
-import tempfile
 import typing
 
 import lxml.etree as et
@@ -15,6 +14,7 @@ import typer
 import abctk.transform_ABC.jigg as jg
 from abctk.obj.ABCCat import ABCCat, ABCCatReprMode
 import abctk.io.nltk_tree as nt
+import abctk.io.psd_cache as pc
 
 app = typer.Typer()
 
@@ -24,41 +24,15 @@ def cmd_main():
     Convert ABC trees to the JIGG format. Useful for ccg2lambda.
     """
 
-@app.command("treebank")
-def cmd_from_treebank(
-    ctx: typer.Context,
-    source_path: pathlib.Path = typer.Argument(
-        ...,
-        help = """
-        The path to the ABC Treebank.
-        """
-    ),
-    dest_path: pathlib.Path = typer.Argument(
-        ...,
-        help = """
-        The destination.
-        """
-    ),
-):
-    """
-    Convert the ABC Treebank to the JIGG tree file(s).
-    """
-    skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"]
-
-    tb = list(
-        nt.load_ABC_psd(
-            source_path,
-            skip_ill_trees = skip_ill_trees
-        )
-    )
-
-    xml_root = et.Element("root")
-    xml_doc = et.SubElement(xml_root, "document", id = "d0")
-    xml_sentences = et.SubElement(xml_doc, "sentences")
+def _iter_jigg_sentences(
+    tb: typing.Iterable[typing.Tuple[typing.Any, typing.Any]],
+    skip_ill_trees: bool,
+    postag = None,
+) -> typing.Iterator[et._Element]:
     for num, (keyaki_id, tree) in enumerate(tb):
         try:
-            xml_sentences.append(
-                jg.tree_to_jigg(tree, str(keyaki_id), num)
+            yield jg.tree_to_jigg(
+                tree, str(keyaki_id), num, postag
             )
         except jg.JIGGConvException:
             if skip_ill_trees:
@@ -67,6 +41,7 @@ def cmd_from_treebank(
                     f"Tree ID: {keyaki_id}. "
                     "The tree will be abandoned."
                 )
+                continue
             else:
                 logger.error(
                     "An exception was raised by the convertion function. "
@@ -80,12 +55,84 @@ def cmd_from_treebank(
             )
             raise
 
-    et.ElementTree(xml_root).write(
-        str(dest_path),
-        xml_declaration = True,
-        encoding = "utf-8",
-        pretty_print = True,
+def _write_jigg(
+    tb: typing.Iterable[typing.Tuple[typing.Any, typing.Any]],
+    dest: typing.BinaryIO,
+    skip_ill_trees: bool,
+    postag = None,
+    encoding: str = "utf-8",
+) -> None:
+    """
+    Convert trees to JIGG sentences and write them out one by one,
+    in the same layout as the pretty-printed XML of the whole document.
+    `encoding` is the name of UTF-8 given in the XML declaration.
+    """
+    sentences = _iter_jigg_sentences(tb, skip_ill_trees, postag)
+    sentence_first = next(sentences, None)
+
+    with et.xmlfile(dest, encoding = encoding) as xf:
+        xf.write_declaration()
+        with xf.element("root"):
+            xf.write("\n  ")
+            with xf.element("document", id = "d0"):
+                xf.write("\n    ")
+                if sentence_first is None:
+                    xf.write(et.Element("sentences"))
+                else:
+                    with xf.element("sentences"):
+                        for xml_sentence in itertools.chain(
+                            (sentence_first, ), sentences
+                        ):
+                            # nested as in the whole document
+                            et.indent(xml_sentence, space = "  ", level = 3)
+                            xf.write("\n      ", xml_sentence)
+                            xf.flush()
+                        xf.write("\n    ")
+                xf.write("\n  ")
+            xf.write("\n")
+    dest.write(b"\n")
+
+@app.command("treebank")
+def cmd_from_treebank(
+    ctx: typer.Context,
+    source_path: pathlib.Path = typer.Argument(
+        ...,
+        help = """
+        The path to the ABC Treebank.
+        """
+    ),
+    dest_path: pathlib.Path = typer.Argument(
+        ...,
+        help = """
+        The destination.
+        """
+    ),
+    use_cache: typing.Optional[bool] = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help = """
+        Whether to use the on-disk cache of parsed trees.
+        Defaults to `tree-cache.enabled` in the configuration.
+        """
+    ),
+):
+    """
+    Convert the ABC Treebank to the JIGG tree file(s).
+    """
+    skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"]
+
+    tb = nt.load_ABC_psd(
+        source_path,
+        skip_ill_trees = skip_ill_trees,
+        n_jobs = ctx.obj["CONFIG"]["max_process_num"],
+        cache = pc.PSDCache.from_config(
+            ctx.obj["CONFIG"], enabled = use_cache
+        ),
     )
+
+    with open(dest_path, "wb") as dest_file:
+        # declared as by `ElementTree.write`
+        _write_jigg(tb, dest_file, skip_ill_trees, encoding = "UTF-8")
         
 @app.command("file")
 def cmd_from_file(
@@ -144,75 +191,22 @@ def cmd_from_file(
                 postag[i]["category"],
                 ABCCatReprMode.CCG2LAMBDA
             )
+        postag = jg.compile_postag_dict(postag)
 
-    with tempfile.TemporaryDirectory(prefix = "abct_jigg_") as temp_folder:
-        temp_file: typing.Optional[typing.IO[str]] = None
-        try:
-            if source_path.name == "-":
-                # load from stdin
-                temp_file = tempfile.NamedTemporaryFile("w", dir = temp_folder)
-                temp_file.write(sys.stdin.read())
-                logger.info(f"STDIN loaded in {temp_file.name}")
-            else:
-                source_path = source_path.resolve()
-                temp_file_path = f"{temp_folder}/{source_path.name}"
-                os.symlink(source_path, dst = temp_file_path)
-                logger.info(f"File symlinked to {temp_file_path}")
-
-            tb = list(
-                nt.load_ABC_psd(
-                    temp_folder, 
-                    re_filter = ".*",
-                    skip_ill_trees = skip_ill_trees
-                )
-            )
+    # trees are parsed as the lines come in
+    tb = nt.load_ABC_stream(
+        nt.iter_source_lines(source_path),
+        name = "<STDIN>" if source_path.name == "-" else str(source_path),
+        skip_ill_trees = skip_ill_trees,
+    )
 
-            xml_root = et.Element("root")
-            xml_doc = et.SubElement(xml_root, "document", id = "d0")
-            xml_sentences = et.SubElement(xml_doc, "sentences")
-            for num, (keyaki_id, tree) in enumerate(tb):
-                try:
-                    xml_sentences.append(
-                        jg.tree_to_jigg(tree, str(keyaki_id), num, postag)
-                    )
-                except jg.JIGGConvException:
-                    if skip_ill_trees:
-                        logger.warning(
-                            "An exception was raised by the convertion function. "
-                            f"Tree ID: {keyaki_id}. "
-                            "The tree will be abandoned."
-                        )
-                    else:
-                        logger.error(
-                            "An exception was raised by the convertion function. "
-                            f"Tree ID: {keyaki_id}. "
-                            "The process has been aborted."
-                        )
-                        raise
-                except Exception:
-                    logger.error(
-                        "An unexpected exception has been raised. The process has been aborted."
-                    )
-                    raise
-            
-            dest_path_str = str(dest_path)
-            if dest_path_str == "-":
-                sys.stdout.buffer.write(
-                    et.tostring(
-                        xml_root,
-                        xml_declaration = True,
-                        encoding = "utf-8",
-                        pretty_print = True
-                    )
-                )
-                logger.info("Output XML successfully dumped to STDOUT")
-            else:
-                et.ElementTree(xml_root).write(
-                    dest_path_str,
-                    xml_declaration = True,
-                    encoding = "utf-8",
-                    pretty_print = True,
-                )
-                logger.info(f"Output XML successfully dumped into {str(dest_path)}")
-        finally:
-            if temp_file: temp_file.close()
\ No newline at end of file
+    dest_path_str = str(dest_path)
+    if dest_path_str == "-":
+        _write_jigg(tb, sys.stdout.buffer, skip_ill_trees, postag)
+        sys.stdout.buffer.flush()
+        logger.info("Output XML successfully dumped to STDOUT")
+    else:
+        with open(dest_path_str, "wb") as dest_file:
+            # declared as by `ElementTree.write`
+            _write_jigg(tb, dest_file, skip_ill_trees, postag, encoding = "UTF-8")
+        logger.info(f"Output XML successfully dumped into {dest_path_str}")
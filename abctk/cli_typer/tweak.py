@@ -1,10 +1,11 @@
+import collections
+import collections.abc
+import functools
 import logging
 logger = logging.getLogger(__name__)
-import os
 import pathlib
 import re
 import sys
-import tempfile
 import typing
 
 import fs
@@ -13,23 +14,101 @@ import typer
 from nltk.tree import Tree
 
 from abctk.obj.ID import RecordID
-from abctk.obj.Keyaki import Keyaki_ID
 
 import abctk.io.nltk_tree as nt
+import abctk.io.psd_cache as pc
 import abctk.transform_ABC.norm
 import abctk.transform_ABC.binconj
 import abctk.transform_ABC.elim_empty 
 import abctk.transform_ABC.elim_trace 
 import abctk.transform_ABC.morph_janome
 import abctk.transform_ABC.unary
+from abctk.transform_ABC.visitor import RebuildMode
+from abctk.transform_ABC.tree_ops import (
+    OPS, TreeOp, TreeOpStage, TreeStream,
+    run_creator,
+)
 import abctk.check_comp_feat
 import abctk.obfuscate
+import abctk.profiling as prof
 import abctk.gen_comp
 
+# ================
+# Lazy chaining
+# ================
+# Each subcommand stacks a lazy stage on the stream of trees in `ctx.obj["treebank"]`
+# so that every tree flows through the whole chain before the next one is read.
+# The stream returned by the last subcommand is drained after the chain.
+# Operations on single trees can be run in worker processes (`--jobs`).
+# A subcommand that needs the whole corpus at once has to materialize it by itself.
+def push_stage(
+    ctx: typer.Context,
+    stage: typing.Callable[[TreeStream], TreeStream],
+    name: str = "",
+) -> TreeStream:
+    """
+    Stack a lazy stage on the stream of trees.
+    Subcommands should return the resulting stream.
+    `name` identifies the stage in the profile (`abctk --profile`).
+    """
+    tb = prof.wrap_stage(name or stage.__name__, stage)(ctx.obj["treebank"])
+    ctx.obj["treebank"] = tb
+    return tb
+
+def push_tree_op(
+    ctx: typer.Context,
+    op: TreeOp,
+    desc: str,
+) -> TreeStream:
+    """
+    Stack an operation on each tree on the stream of trees.
+    Consecutive operations run together tree by tree,
+    in worker processes if `--jobs` is more than 1.
+    Subcommands should return the resulting stream.
+    """
+    tb = ctx.obj["treebank"]
+
+    if isinstance(tb, TreeOpStage):
+        tb = tb.appended(op, desc)
+    else:
+        tb = TreeOpStage(tb, (op, ), (desc, ), ctx.obj.get("n_jobs", 1))
+
+    ctx.obj["treebank"] = tb
+    return tb
+
+def push_op(
+    ctx: typer.Context,
+    name: str,
+    **arguments,
+) -> TreeStream:
+    """
+    Stack the operation registered as `name` in :data:`abctk.transform_ABC.tree_ops.OPS`
+    on the stream of trees.
+    Subcommands should return the resulting stream.
+    """
+    logger.info(f"Subcommand invoked: {name}")
+    spec = OPS[name]
+
+    return push_tree_op(
+        ctx,
+        spec.make(ctx.obj["CONFIG"]["skip-ill-trees"], **arguments),
+        spec.desc,
+    )
+
+def _drain_treebank(streams: typing.Iterable[typing.Any], **kwargs):
+    # the last stream pulls all the trees through the chain
+    for tb in reversed(list(streams)):
+        if isinstance(tb, (collections.abc.Iterator, TreeOpStage)):
+            collections.deque(tb, maxlen = 0)
+            break
+
 # ================
 # Command for treebank
 # ================
-app_treebank = typer.Typer(chain = True)
+app_treebank = typer.Typer(
+    chain = True,
+    result_callback = _drain_treebank,
+)
 
 @app_treebank.callback()
 def cmd_from_treebank(
@@ -40,6 +119,23 @@ def cmd_from_treebank(
         The path to the ABC Treebank.
         """
     ),
+    use_cache: typing.Optional[bool] = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help = """
+        Whether to use the on-disk cache of parsed trees.
+        Defaults to `tree-cache.enabled` in the configuration.
+        """
+    ),
+    n_jobs: int = typer.Option(
+        1,
+        "--jobs", "-j",
+        min = 1,
+        help = """
+        The number of worker processes that run the subcommands on each tree.
+        The order of the trees is kept.
+        """
+    ),
 ):
     """
     Tweak the whole ABC Treebank files.
@@ -48,16 +144,28 @@ def cmd_from_treebank(
     run `abctk tweak file /dev/null <COMMAND> --help`.
     """
     # load trees
-    tb = list(nt.load_Keyaki_Annot_psd(source_path))
+    tb = prof.wrap_iter(
+        "Loading trees",
+        nt.load_Keyaki_Annot_psd(
+            source_path,
+            cache = pc.PSDCache.from_config(
+                ctx.obj["CONFIG"], enabled = use_cache
+            ),
+        ),
+    )
 
     # store trees in ctx
     ctx.ensure_object(dict)
     ctx.obj["treebank"] = tb
+    ctx.obj["n_jobs"] = n_jobs
 
 # ================
 # Command for single files
 # ================
-app_file = typer.Typer(chain = True)
+app_file = typer.Typer(
+    chain = True,
+    result_callback = _drain_treebank,
+)
 
 @app_file.callback()
 def cmd_from_file(
@@ -70,7 +178,16 @@ def cmd_from_file(
         help = """
         The path to the input file. `-` indicates STDIN.
         """
-    )
+    ),
+    n_jobs: int = typer.Option(
+        1,
+        "--jobs", "-j",
+        min = 1,
+        help = """
+        The number of worker processes that run the subcommands on each tree.
+        The order of the trees is kept.
+        """
+    ),
 ):
     """
     Tweak a single Treebank file or trees in STDIN.
@@ -78,39 +195,19 @@ def cmd_from_file(
     For more info on each subcommand, 
     run `abctk tweak file /dev/null <COMMAND> --help`.
     """
-    temp_folder = tempfile.TemporaryDirectory(
-        prefix = "abct_tweak_"
+    # trees are parsed as the lines come in
+    tb = prof.wrap_iter(
+        "Loading trees",
+        nt.load_Keyaki_Annot_stream(
+            nt.iter_source_lines(source_path),
+            name = "<STDIN>" if source_path.name == "-" else str(source_path),
+        ),
     )
-    source_file: typing.Optional[typing.IO[str]] = None
-    try:
-        if source_path.name == "-":
-            source_file = tempfile.NamedTemporaryFile(
-                "w",
-                dir = temp_folder.name
-            )
-            source_file.write(sys.stdin.read())
-            source_file.flush()
-            logger.info(f"STDIN loaded in {source_file.name}")
-        else:
-            source_path = source_path.resolve()
-            source_file_path = f"{temp_folder.name}/{source_path.name}"
-            os.symlink(source_path, dst = source_file_path)
-            logger.info(f"File symlinked to {source_file_path}")
-
-        tb = list(
-            nt.load_Keyaki_Annot_psd(
-                str(temp_folder.name),
-                re_filter = ".*"
-            )
-        )
-        
-    finally:
-        if source_file: source_file.close()
 
     # pass to ctx
     ctx.ensure_object(dict)
-    ctx.obj["temp_folder"] = temp_folder
     ctx.obj["treebank"] = tb
+    ctx.obj["n_jobs"] = n_jobs
 
 # ================
 # Subcommands
@@ -119,119 +216,37 @@ def cmd_from_file(
 # ----------------
 # General decorators
 # ----------------
-X = typing.TypeVar("X")
 class CommandObject(typing.NamedTuple):
     callback: typing.Callable[[typer.Context], typing.Any]
     help_text: str
     
     @classmethod
-    def wrap_modifier(
-        cls, 
-        function: typing.Callable[[Tree, str], typing.Any],
-        name: str, 
-        bar_desc: str = "",
-        help_text: str = "",
-    ): 
-        '''
-        Parameters
-        ----------
-        function
-
-        name
-            The name of the subcommand.
-        bar_desc
-            A string that describes the progress bar for the :module:`tqdm` library.
-        help_text
-            A help text for the subcommand.
-        '''
-
-        def cmd(ctx: typer.Context):
-            skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"]
-
-            logger.info(f"Subcommand invoked: {name}")
-            for ID, tree in tqdm(
-                ctx.obj["treebank"], 
-                desc = bar_desc or f"Running {name}",
-            ):
-                try:
-                    function(tree, ID)
-                except Exception as e:
-                    if skip_ill_trees:
-                        logger.warning(
-                            "An exception was raised by the conversion function. "
-                            "The tree will be abandoned."
-                            f"Tree ID: {ID}. "
-                            f"Exception: {e}"
-                        )
-                    else:
-                        logger.error(
-                            "An exception was raised by the conversion function. "
-                            "The process has been aborted."
-                            f"Tree ID: {ID}. "
-                            f"Exception: {e}"
-                        )
-                        raise
-        return cls(cmd, help_text)
-
-    @classmethod
-    def wrap_creator(
-        cls, 
-        function: typing.Callable[[X, str], X],
-        name: str, 
-        bar_desc: str = "",
+    def wrap_op(
+        cls,
+        name: str,
         help_text: str = "",
+        **arguments,
     ):
         '''
         Parameters
         ----------
-        function
-
         name
-            The name of the subcommand.
-        bar_desc
-            A string that describes the progress bar for the :module:`tqdm` library.
+            The name of the subcommand,
+            under which the operation is registered in :data:`abctk.transform_ABC.tree_ops.OPS`.
         help_text
             A help text for the subcommand.
+        arguments
+            The arguments of the operation.
         '''
 
         def cmd(ctx: typer.Context):
-            skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"]
+            return push_op(ctx, name, **arguments)
 
-            logger.info(f"Subcommand invoked: {name}")
-        
-            def _yield(tb):
-                for ID, tree in tqdm(
-                    tb, 
-                    desc = bar_desc or f"Running {name}"
-                ):
-                    try:
-                        yield ID, function(tree, ID)
-                    except Exception as e:
-                        if skip_ill_trees:
-                            logger.warning(
-                                "An exception was raised by the conversion function. "
-                                "The tree will be abandoned."
-                                f"Tree ID: {ID}. "
-                                f"Exception: {e}"
-                            )
-                        else:
-                            logger.error(
-                                "An exception was raised by the conversion function. "
-                                "The process has been aborted."
-                                f"Tree ID: {ID}. "
-                                f"Exception: {e}"
-                            )
-                            raise
-
-            ctx.obj["treebank"] = list(_yield(ctx.obj["treebank"]))
-        
         return cls(cmd, help_text)
 
 # ----------------
 # Particular functions
 # ----------------
-_RE_INSTRUCTION_PLUS = re.compile(r"^\+(?P<feat>.*)$")
-_RE_INSTRUCTION_MINUS = re.compile(r"^0(?P<feat>.*)$")
 def cmd_filter_annots(
     ctx: typer.Context,
     instructions: typing.Annotated[
@@ -248,57 +263,12 @@ def cmd_filter_annots(
         )
     ] = ";"
 ):
-    # Build commands
-    instruction_plus: typing.Optional[typing.Set[str]] = None
-    instruction_minus: typing.Optional[typing.Set[str]] = set()
-
-    for instr in instructions.split(separator):
-        if instr == "+*":
-            instruction_plus = None
-            instruction_minus = set()
-        elif instr == "0*":
-            instruction_plus = set()
-            instruction_minus = None
-        elif (match := _RE_INSTRUCTION_PLUS.match(instr)):
-            key = match.group("feat")
-            if isinstance(instruction_plus, set):
-                instruction_plus.add(key)
-            if isinstance(instruction_minus, set):
-                instruction_minus.remove(key)
-        elif (match := _RE_INSTRUCTION_MINUS.match(instr)):
-            key = match.group("feat")
-            if isinstance(instruction_plus, set):
-                instruction_plus.remove(key)
-            if isinstance(instruction_minus, set):
-                instruction_minus.add(key)
-        else:
-            # default as plus
-            if isinstance(instruction_plus, set):
-                instruction_plus.add(instr)
-            if isinstance(instruction_minus, set):
-                instruction_minus.remove(instr)
-    
-    # Exec commands
-    tb: typing.Dict[str, Tree] = ctx.obj["treebank"]
-    if instruction_plus is None:
-        if instruction_minus is None:
-            raise ValueError("Feature sets cannot be both None")
-        else:
-            for ID, tree in tqdm(tb, desc = "Deleting features"):
-                abctk.transform_ABC.norm.delete_feats(
-                    tree, ID,
-                    instruction_minus,
-                )
-    elif instruction_minus is None:
-        for ID, tree in tqdm(tb, desc = "Deleting all features except specified"):
-                abctk.transform_ABC.norm.delete_all_feats_with_white_list(
-                    tree, ID,
-                    instruction_plus,
-                )
-        pass
-    else:
-        raise ValueError("Feature sets cannot be both sets")
-        
+    return push_op(
+        ctx, "filter-annots",
+        instructions = instructions,
+        separator = separator,
+    )
+
 def cmd_minimize_tree(
     ctx: typer.Context,
     discard_trace: bool = typer.Option(
@@ -308,13 +278,11 @@ def cmd_minimize_tree(
         True
     ),
 ):
-    tb: typing.Dict[str, Tree] = ctx.obj["treebank"]
-    for ID, tree in tqdm(tb, desc = "Minimizing annotations"):
-        abctk.transform_ABC.norm.minimize_tree(
-            tree, ID,
-            discard_trace,
-            reduction_check
-        )
+    return push_op(
+        ctx, "min-nodes",
+        discard_trace = discard_trace,
+        reduction_check = reduction_check,
+    )
 
 def cmd_restore_trace(
     ctx: typer.Context,
@@ -324,49 +292,17 @@ def cmd_restore_trace(
         help = ""
     )
 ):
-    logger.info(f"Subcommand invoked: restore-trace")
-    skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"]
-
-    tb: typing.List[typing.Tuple[RecordID, Tree]] = ctx.obj["treebank"]
-
-    for ID, tree in tqdm(tb, desc = "Restoring *T*"):
-        try:
-            abctk.transform_ABC.elim_trace.restore_rel_trace(
-                tree, ID,
-                generous
-            )
-        except abctk.transform_ABC.elim_trace.ElimTraceException as e:
-            if skip_ill_trees:
-                logger.warning(
-                    "An exception was raised by the convertion function. "
-                    f"Tree ID: {ID}. "
-                    "The tree will be abandoned."
-                )
-            else:
-                logger.error(
-                    "An exception was raised by the convertion function. "
-                    f"Tree ID: {ID}. "
-                    "The process has been aborted."
-                )
-                raise
+    return push_op(ctx, "restore-trace", generous = generous)
 
 def cmd_elaborate_cat_annotations(
     ctx: typer.Context,
 ):
-    tb: typing.Dict[str, Tree] = ctx.obj["treebank"]
-    for ID, tree in tqdm(tb, desc = "Elaborating category-related annotations"):
-        abctk.transform_ABC.norm.elaborate_cat_annotations(
-            tree, ID,
-        )
+    return push_op(ctx, "elab-cat-annots")
 
 def cmd_elaborate_char_spans(
     ctx: typer.Context,
 ):
-    tb: typing.Dict[str, Tree] = ctx.obj["treebank"]
-    for ID, tree in tqdm(tb, desc = "Elaborating char span annotations"):
-        abctk.transform_ABC.norm.elaborate_char_spans(
-            tree, ID,
-        )
+    return push_op(ctx, "elab-char-spans")
 
 # ----------------
 # Incorporating comparative annotations
@@ -383,69 +319,11 @@ def cmd_incorporate_comps(
         help = "The format of the comparative annotation file"
     ),
 ):
-    import json
-    import ruamel.yaml
-
-    from abctk.obj.ID import SimpleRecordID
-    from abctk.obj.Keyaki import Keyaki_ID
-    from abctk.obj.comparative import CompRecord, ABCTComp_BCCWJ_ID
-    from abctk.transform_ABC.incorporate_comp import incorporate_all_comps
-
-    # Load file
-    comp_file_format = comp_file_format.lower()
-
-    if comp_file_format == "jsonl":
-        comp_annots_raw: typing.Iterator[dict] = (
-            json.loads(line) for line in comp_file
-        )
-    elif comp_file_format == "yaml":
-        yaml = ruamel.yaml.YAML()
-        comp_annots_raw: typing.Iterator[dict] = (
-            yaml.load(comp_file)
-        )
-    else:
-        logger.error(
-            f"Wrong option for --format: {comp_file_format}. "
-            "Choose between `yaml` and `jsonl`."
-        )
-        raise ValueError
-
-    def _parse_comp_raw(record: dict):
-        ID_raw = record["ID"]
-        ID_parsed = (
-            ABCTComp_BCCWJ_ID.from_string(ID_raw)
-            or Keyaki_ID.from_string(ID_raw)
-            or SimpleRecordID.from_string(ID_raw)
-        )
-
-        return (
-            ID_parsed,
-            CompRecord.from_brackets(
-                line = record["annot"],
-                ID_v1 = record.get("ID_v1"),
-                ID = ID_raw,
-            ).dice()
-        )
-
-    # indexing
-    comp_annots = dict(_parse_comp_raw(record) for record in comp_annots_raw)
-
-    for ID, tree in tqdm(
-        ctx.obj["treebank"], 
-        desc = "Incorporating comparative annotations"
-    ):
-        comp_record = comp_annots.get(ID)
-        if comp_record:
-            incorporate_all_comps(
-                comp_record.comp,
-                tree,
-                ID,
-            )
-        else:
-            logger.warning(
-                f"Comparative annotations are not found for the tree (ID: {ID}). "
-                f"This tree will be skipped."
-            )
+    return push_op(
+        ctx, "incorp-comps",
+        comp_file = comp_file,
+        comp_file_format = comp_file_format,
+    )
 
 app_treebank.command(
     "incorp-comps",
@@ -467,35 +345,27 @@ Default to /closed/."""
 ):
     """
     Obfuscate trees by masking characters for license / copyright reasons.
+
+    To obfuscate the whole treebank file by file in parallel,
+    use `abctk obfus`.
     """
 
-    skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"]
-    tb: typing.List[typing.Tuple[RecordID, Tree]] = ctx.obj["treebank"]
-    matcher = re.compile(filter)
-    
-    def _yield(tb):
-        for ID, tree in tqdm(tb, desc = "Obfuscate trees"):
-            try:
-                if matcher.search(ID.name):
-                    yield ID, abctk.obfuscate.obfuscate_tree(tree, ID)
-                else:
-                    yield ID, tree
-            except Exception as e:
-                if skip_ill_trees:
-                    logger.warning(
-                        "An exception was raised by the convertion function. "
-                        f"Tree ID: {ID}. "
-                        "The tree will be abandoned."
-                    )
-                else:
-                    logger.error(
-                        "An exception was raised by the convertion function. "
-                        f"Tree ID: {ID}. "
-                        "The process has been aborted."
-                    )
-                    raise
-    
-    ctx.obj["treebank"] = list(_yield(tb))
+    return push_op(ctx, "obfus", filter = filter)
+
+def _decrypt_tree(
+    source: abctk.obfuscate.DecryptionSourceWindow,
+    matcher: typing.Pattern[str],
+    tree: Tree,
+    ID: RecordID,
+) -> Tree:
+    if matcher.search(ID.name):
+        return abctk.obfuscate.decrypt_tree(
+            tree, 
+            source.get(ID), 
+            ID = ID
+        )[0]
+    else:
+        return tree
 
 def cmd_decrypt_tree(
     ctx: typer.Context,
@@ -507,6 +377,17 @@ def cmd_decrypt_tree(
             Default to /closed/.
         """
     ),
+    window: int = typer.Option(
+        100000,
+        help = """
+            The maximum number of decrypting texts kept in memory.
+            The texts are read along with the trees,
+            which should come in the same order as the texts
+            up to this number of texts.
+            Set 0 to load all the texts first, in which case
+            the order does not matter.
+        """
+    ),
     source: pathlib.Path = typer.Argument(
         ...,
         file_okay = True,
@@ -542,106 +423,68 @@ def cmd_decrypt_tree(
 
     You can save the yields to run decryption at any time.
     """
-    def _parse_source(line: str):
-        line_broken = line.strip().split("\t")
-        return (
-            Keyaki_ID.from_string(line_broken[0]) or Keyaki_ID.new(), 
-            line_broken[1]
-        )
-
-    with open(source) as h_source:
-        source_dict = dict(
-            _parse_source(line) for line in h_source
-        )
-
     skip_ill_trees = ctx.obj["CONFIG"]["skip-ill-trees"]
-    tb: typing.List[typing.Tuple[RecordID, Tree]] = ctx.obj["treebank"]
     matcher = re.compile(filter)
 
-    def _yield(tb) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
-        for ID, tree in tqdm(tb, desc = "Decrypt trees"):
-            try:
-                if matcher.search(ID.name):
-                    yield (
-                        ID, 
-                        abctk.obfuscate.decrypt_tree(
-                            tree, 
-                            source_dict[ID], 
-                            ID = ID
-                        )[0],
-                    )
-                else:
+    # The texts are joined with the trees in this process
+    # since they are read from the file as the trees come.
+    def _decrypt(tb: TreeStream) -> TreeStream:
+        with open(source) as h_source:
+            source_window = abctk.obfuscate.DecryptionSourceWindow(
+                abctk.obfuscate.parse_decryption_source(h_source),
+                window = window,
+            )
+
+            decrypt_tree = functools.partial(
+                run_creator,
+                functools.partial(_decrypt_tree, source_window, matcher),
+                skip_ill_trees,
+            )
+            for ID, tree in tb:
+                tree = decrypt_tree(tree, ID)
+                if tree is not None:
                     yield ID, tree
-            except Exception as e:
-                if skip_ill_trees:
-                    logger.warning(
-                        "An exception was raised by the convertion function. "
-                        f"Tree ID: {ID}. "
-                        "The tree will be abandoned. "
-                        f"Error: {e}"
-                    )
-                else:
-                    logger.error(
-                        "An exception was raised by the convertion function. "
-                        f"Tree ID: {ID}. "
-                        "The process has been aborted. "
-                        f"Error: {e}"
-                    )
-                    raise
-
-    ctx.obj["treebank"] = list(_yield(tb))
+
+    return push_stage(ctx, _decrypt, "Decrypt trees")
 
 _COMMAND_TABLE: typing.Dict[str, CommandObject] = {
-    "relax": CommandObject.wrap_modifier(
-        function = lambda tree, ID: None,
-        name = "relax",
-        bar_desc = "",
+    "relax": CommandObject.wrap_op(
+        "relax",
         help_text = "Do nothing (Just load trees and check meta-annotations)."
     ),
-    "parse-ABC-cats": CommandObject.wrap_modifier(
-        function = nt.parse_all_labels_ABC,
-        name = "parse-ABC-cats",
-        bar_desc = "Parsing ABC cats",
+    "parse-ABC-cats": CommandObject.wrap_op(
+        "parse-ABC-cats",
         help_text = "Parse all ABC categories in given trees."
     ),
-    "check-comp": CommandObject.wrap_modifier(
-        function = lambda tree, ID: abctk.check_comp_feat.check_comp_feats(
-            abctk.check_comp_feat.collect_comp_feats(
-                tree, ID,
-            ),
-            ID,
-        ),
-        name = "check-comp",
-        bar_desc = "Checking #comp",
+    "check-comp": CommandObject.wrap_op(
+        "check-comp",
         help_text = "Health-check #comp features."
     ),
-    "collapse-unary-nodes": CommandObject.wrap_creator(
-        function = abctk.transform_ABC.unary.collapse_unary_nodes,
-        name = "collapse-unary-nodes",
-        bar_desc = "Collapsing unaries",
-        help_text = "Collaps unary nodes. Must be invoked before parse-ABC-label."
+    "collapse-unary-nodes": CommandObject.wrap_op(
+        "collapse-unary-nodes",
+        help_text = "Collaps unary nodes. Must be invoked before parse-ABC-label.",
+        # the trees in the stream are not shared
+        mode = RebuildMode.IN_PLACE,
     ),
-    "restore-unary-nodes": CommandObject.wrap_creator(
-        function = abctk.transform_ABC.unary.restore_unary_nodes,
-        name = "restore-unary-nodes",
-        bar_desc = "Restoring unaries",
-        help_text = "Restore unary nodes. Must be invoked before parse-ABC-label."
+    "restore-unary-nodes": CommandObject.wrap_op(
+        "restore-unary-nodes",
+        help_text = "Restore unary nodes. Must be invoked before parse-ABC-label.",
+        # the trees in the stream are not shared
+        mode = RebuildMode.IN_PLACE,
     ),
-    "bin-conj": CommandObject.wrap_creator(
-        function = abctk.transform_ABC.binconj.binarize_conj_tree,
-        name = "bin-conj",
-        bar_desc = "Binarizing CONJPs",
-        help_text = "Binarize conjunctions. Expected to be invoked after parse-ABC-label."
+    "bin-conj": CommandObject.wrap_op(
+        "bin-conj",
+        help_text = "Binarize conjunctions. Expected to be invoked after parse-ABC-label.",
+        # the trees in the stream are not shared
+        mode = RebuildMode.IN_PLACE,
     ),
     "flatten-conj": CommandObject(
         lambda ctx: NotImplemented,
         "Flatten conjunctions.",
         #"Flattening CONJPs",
     ),
-    "elim-empty": CommandObject.wrap_modifier(
-        function = abctk.transform_ABC.elim_empty.elim_empty_terminals,
-        name = "elim-empty",
-        bar_desc = "Del'ing * and __",
+    "elim-empty": CommandObject.wrap_op(
+        "elim-empty",
         help_text = "Eliminate nodes of empty categories."
     ),
     "restore-empty": CommandObject(
@@ -658,22 +501,16 @@ _COMMAND_TABLE: typing.Dict[str, CommandObject] = {
         cmd_restore_trace,
         "Restore traces of relative clauses."
     ),
-    "restore-trace-in-comp": CommandObject.wrap_creator(
-        function = abctk.gen_comp.restore_traces_on_demand,
-        name = "restore-trace-in-comp",
-        bar_desc = "Restoring *T* and *pro* in #comp",
+    "restore-trace-in-comp": CommandObject.wrap_op(
+        "restore-trace-in-comp",
         help_text = "Restore *T* and  *pro* in #comp.",
     ),
-    "janome": CommandObject.wrap_modifier(
-        function = abctk.transform_ABC.morph_janome.add_morph_janome,
-        name = "janome",
-        bar_desc = "Adding Janome analyses",
+    "janome": CommandObject.wrap_op(
+        "janome",
         help_text = "Add Janome morphological analyses."
     ),
-    "del-janome": CommandObject.wrap_modifier(
-        function = abctk.transform_ABC.morph_janome.del_morph_janome,
-        name = "del-janome",
-        bar_desc = "Del'ing Janome analyses",
+    "del-janome": CommandObject.wrap_op(
+        "del-janome",
         help_text = "Delete Janome morphological analyses."
     ),
     "min-nodes": CommandObject(
@@ -746,37 +583,49 @@ def cmd_write(
         help = "Verbosely print `#role=none` if set."
     ),
 ):
-    dest_file: typing.Optional[typing.TextIO] = None
-    if dest_path.name == "-":
-        dest_file = sys.stdout
-    elif not force_dir and not dest_path.is_dir():
-        dest_file = open(str(dest_path.resolve()), "w")
-
-    if dest_file:
-        for ID, tree in tqdm(
-            ctx.obj["treebank"], 
-            desc = "Writing out ABC trees"
-        ):
-            dest_file.writelines(
-                (
-                    nt.flatten_tree_with_ID(
-                        ID, tree,
-                        hide_all_feats = hide_all_feats,
-                        feats_to_print = feats_to_print,
-                        verbose_role = verbose_role,
-                    ),
-                    "\n",
-                )
-            )
-    else:
-        with fs.open_fs(str(dest_path), create = True) as folder:
-            nt.dump_ABC_to_psd(
-                ctx.obj["treebank"], 
-                folder,
+    # Trees are passed through to the following subcommands.
+    # The output is completed when the stream is drained.
+    def _yield_file(tb: TreeStream) -> TreeStream:
+        if dest_path.name == "-":
+            dest_file = sys.stdout
+        else:
+            dest_file = open(str(dest_path.resolve()), "w")
+
+        try:
+            with nt.PTBWriter(
+                dest_file,
                 hide_all_feats = hide_all_feats,
                 feats_to_print = feats_to_print,
                 verbose_role = verbose_role,
-            )
+                # pass each tree on to the next command in the pipeline
+                buffer_size = 1 if dest_file is sys.stdout else 64 * 1024,
+            ) as writer:
+                for ID, tree in tqdm(
+                    tb, 
+                    desc = "Writing out ABC trees"
+                ):
+                    writer.write_tree_with_ID(ID, tree)
+                    yield ID, tree
+        finally:
+            if dest_file is not sys.stdout:
+                dest_file.close()
+
+    def _yield_folder(tb: TreeStream) -> TreeStream:
+        with nt.PSDFolderWriter(
+            dest_path,
+            hide_all_feats = hide_all_feats,
+            feats_to_print = feats_to_print,
+            verbose_role = verbose_role,
+            n_jobs = ctx.obj["CONFIG"]["max_process_num"],
+        ) as writer:
+            for ID, tree in tb:
+                writer.add(ID, tree)
+                yield ID, tree
+
+    if dest_path.name == "-" or (not force_dir and not dest_path.is_dir()):
+        return push_stage(ctx, _yield_file, "Writing out ABC trees")
+    else:
+        return push_stage(ctx, _yield_folder, "Writing out ABC trees")
 
 app_treebank.command(
     "write",
@@ -75,6 +75,23 @@ CONF_DEFAULT = {
     "gen-comp": {
         "tree-filter": "typical|関係節|連用節"
     },
+    "tree-cache": {
+        "enabled": False,
+        "folder": DIR_CACHE / "trees",
+        "max-size": 4 * 1024 ** 3, # in bytes
+    },
+    "cat-cache": {
+        # in entries
+        "parse-max-size": 65536,
+        "pprint-max-size": 65536,
+        "simplify-exh-max-size": 65536,
+    },
+    "morph-cache": {
+        # analyses of Janome, keyed by sentences
+        "max-size": 65536, # in entries
+        "persist": False,
+        "path": DIR_CACHE / "morph-janome.sqlite3",
+    },
     "max_process_num": (
         len(num)
         if (num := psutil.Process().cpu_affinity())
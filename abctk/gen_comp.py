@@ -9,6 +9,8 @@ import subprocess
 
 from nltk.tree import Tree
 
+import abctk.cat_cache as cc
+from abctk.cat_pattern import CatPattern, CatPatternSet, MatchMode
 import abctk.config
 import abctk.cli_typer.renumber
 import abctk.io.nltk_tree as nt
@@ -42,6 +44,22 @@ _re_root_cont = re.compile(
     r"(?P<index>^[0-9]+),.*root.*$"
 )
 
+_PAT_CLAUSE = CatPattern("<PP\\S>", MatchMode.IGNORE_FEATURE)
+"""
+The category of clauses with a gap.
+"""
+
+_PATS_REL_MOD: CatPatternSet[str] = CatPatternSet(
+    (
+        (cat, cat)
+        for cat in ("<N/N>", "<NP/NP>", "<NP\\NP>", "<N\\N>")
+    ),
+    MatchMode.IGNORE_FEATURE,
+)
+"""
+The categories of relative clauses.
+"""
+
 def _restore_pro_on_demand_inner(
     tree: X,
     ID: str,
@@ -54,10 +72,7 @@ def _restore_pro_on_demand_inner(
 
         if (
             isinstance(cat, abcc.ABCCatFunctor) 
-            and cat.equiv_to(
-                abcc.ABCCat.p("<PP\\S>"),
-                ignore_feature = True,
-            )
+            and _PAT_CLAUSE.match(cat)
             and (
                 feat_comp_match 
                 := _re_root_cont.match(label.feats.get("comp", ""))
@@ -68,24 +83,7 @@ def _restore_pro_on_demand_inner(
             ant = cat.ant # PP
             conseq = cat.conseq # S
 
-            is_rel: bool = is_unary and (
-                parent_node_cat.equiv_to(
-                    abcc.ABCCat.p("<N/N>"),
-                    ignore_feature = True,
-                ) or
-                parent_node_cat.equiv_to(
-                    abcc.ABCCat.p("<NP/NP>"),
-                    ignore_feature = True,
-                ) or 
-                parent_node_cat.equiv_to(
-                    abcc.ABCCat.p("<NP\\NP>"),
-                    ignore_feature = True,
-                ) or 
-                parent_node_cat.equiv_to(
-                    abcc.ABCCat.p("<N\\N>"),
-                    ignore_feature = True,
-                )
-            )
+            is_rel: bool = is_unary and _PATS_REL_MOD.match_any(parent_node_cat)
 
             root_new_feats = {
                 k:v for k, v in label.feats.items()
@@ -103,21 +101,21 @@ def _restore_pro_on_demand_inner(
                         {"rel": "bind"} if is_rel
                         else {"adv-pro": "bind"}
                     ),
-                    pprinter_cat = abcc.ABCCat.pprint,
+                    pprinter_cat = cc.pprint_cat,
                 ),
                 children = [
                     Tree(
                         node = abcc.Annot( # node: S#comp={index},root#...
                             cat = conseq,
                             feats = root_new_feats,
-                            pprinter_cat = abcc.ABCCat.pprint,
+                            pprinter_cat = cc.pprint_cat,
                         ),
                         children = [
                             Tree(
                                 node = abcc.Annot( # node: PP#comp={index},cont
                                     cat = ant,
                                     feats = {"comp": f"{index},cont"},
-                                    pprinter_cat = abcc.ABCCat.pprint,
+                                    pprinter_cat = cc.pprint_cat,
                                 ),
                                 children = [
                                     ("*T*" if is_rel else "*TRACE-pro*")
@@ -126,7 +124,7 @@ def _restore_pro_on_demand_inner(
                             Tree(
                                 node = abcc.Annot(
                                     cat = cat, # cat PP
-                                    pprinter_cat = abcc.ABCCat.pprint,
+                                    pprinter_cat = cc.pprint_cat,
                                 ),
                                 children = [
                                     _restore_pro_on_demand_inner(
@@ -279,6 +277,7 @@ def convert_io(
             re_filter = filter_re,
             skip_ill_trees = True,
             prog_stream = None,
+            n_jobs = 1, # already run in a worker process
         )
     )
 
@@ -3,27 +3,51 @@ Loaders and dumpers of the Keyaki treebank and the ABC Treebank stored in the Co
     which make use of the NLTK tree class for internal representation.
 """
 
+import collections
+import concurrent.futures as cf
+import functools
+import heapq
+import io
 import itertools
 import logging
 logger = logging.getLogger(__name__)
 import operator
+import os
 import pathlib
+import pickle
+import re
 import sys
+import tempfile
 import typing
 from typing import Tuple, Union
 
 import fs
 import fs.base
+import more_itertools
 from nltk import Tree
-from nltk.corpus.reader.bracket_parse import BracketParseCorpusReader
 
 from abctk import ABCTException
+import abctk.cat_cache as cc
+import abctk.io.psd_cache as pc
 from abctk.obj.ABCCat import ABCCat, Annot
 from abctk.obj.ID import RecordID, SimpleRecordID
 from abctk.obj.Keyaki import Keyaki_ID
 from abctk.obj.comparative import ABCTComp_BCCWJ_ID
 
 X = typing.TypeVar("X", Tree, str)
+_R = typing.TypeVar("_R")
+
+def parse_record_ID(ID_raw: str) -> RecordID:
+    """
+    Parse the content of an ID node.
+    IDs of the comparative annotation and the Keyaki Treebank are tried first.
+    """
+    return (
+        ABCTComp_BCCWJ_ID.from_string(ID_raw)
+        or Keyaki_ID.from_string(ID_raw)
+        or SimpleRecordID.from_string(ID_raw)
+    )
+
 def split_ID_from_Tree(tree: X) -> Tuple[RecordID, X]:
     '''
     Takes a tree as input, extracts the Keyaki ID from it if it exists, and returns a
@@ -46,11 +70,7 @@ def split_ID_from_Tree(tree: X) -> Tuple[RecordID, X]:
         ):
             # If found
             ID_raw: str = child_last[0] # type: ignore
-            ID = (
-                ABCTComp_BCCWJ_ID.from_string(ID_raw)
-                or Keyaki_ID.from_string(ID_raw)
-                or SimpleRecordID.from_string(ID_raw)
-            )
+            ID = parse_record_ID(ID_raw)
             
             # Reform the tree
             if len(child_body) == 1:
@@ -84,6 +104,298 @@ def split_ID_from_Tree(tree: X) -> Tuple[RecordID, X]:
     
     return ID, tree
 
+# ================
+# Streaming reader of PTB-style files
+# ================
+_RE_LEAF_SINGLE_CHAR = re.compile(r"\((.)\)")
+_RE_LEAF_TAG_WORD_ROOT = re.compile(r"\(([^\s()]+) ([^\s()]+) [^\s()]+\)")
+
+class InvalidTreeSyntaxException(ABCTException):
+    """
+    The exception class for trees whose brackets cannot be parsed.
+    """
+
+    location: str
+    """
+    The location (`<file path>:<line number>`) of the problematic tree.
+    """
+
+    def __init__(self, location: str):
+        self.location = location
+        super().__init__(f"Failed to read the bracketed tree at {location}")
+
+    def __reduce__(self):
+        return (self.__class__, (self.location, ))
+
+def find_psd_files(
+    folder: typing.Union[str, pathlib.Path],
+    re_filter: typing.Union[str, typing.Pattern] = r".*\.psd$",
+) -> typing.List[str]:
+    """
+    List the files under `folder` whose relative paths match `re_filter`.
+
+    The paths are sorted and matched in the same way as
+    :class:`nltk.corpus.reader.bracket_parse.BracketParseCorpusReader`
+    does, i.e. the filter has to match the whole relative path.
+
+    Returns
+    -------
+    paths
+        The matched paths, relative to `folder`.
+    """
+    if isinstance(re_filter, str):
+        matcher = re.compile(re_filter + "$").match
+    else:
+        matcher = re_filter.fullmatch
+
+    folder = str(folder)
+    res: typing.List[str] = []
+    for dirname, _, filenames in os.walk(folder):
+        prefix = os.path.relpath(dirname, folder)
+        for filename in filenames:
+            path_rel = (
+                filename if prefix == "."
+                else os.path.join(prefix, filename)
+            )
+            if matcher(path_rel):
+                res.append(path_rel)
+
+    res.sort()
+    return res
+
+def iter_tree_blocks(
+    stream: typing.Iterable[str],
+    line_num_start: int = 1,
+) -> typing.Iterator[typing.Tuple[int, str]]:
+    """
+    Cut a stream of lines into blocks of bracketed trees.
+    Every line starting with an unindented `(` begins a new block.
+    Lines preceding the first block are discarded.
+
+    Only one block is kept in memory at a time.
+
+    Parameters
+    ----------
+    stream
+    line_num_start
+        The line number of the first line of `stream`.
+
+    Yields
+    ------
+    line_num: int
+        The line number where the block begins.
+    block: str
+    """
+    lines: typing.List[str] = []
+    line_num_begin = 0
+
+    for line_num, line in enumerate(stream, start = line_num_start):
+        if line.startswith("("):
+            if lines:
+                yield line_num_begin, "".join(lines)
+            lines = [line]
+            line_num_begin = line_num
+        elif lines:
+            lines.append(line)
+        else:
+            # before the first tree
+            pass
+
+    if lines:
+        yield line_num_begin, "".join(lines)
+
+def parse_tree_block(block: str) -> Tree:
+    """
+    Parse a block of a bracketed tree into an NLTK tree.
+    The block is normalized in the same way as
+    :class:`nltk.corpus.reader.bracket_parse.BracketParseCorpusReader`.
+
+    Raises
+    ------
+    ValueError
+        If the brackets are ill-formed.
+    """
+    block = _RE_LEAF_SINGLE_CHAR.sub(r"(\1 \1)", block)
+    block = _RE_LEAF_TAG_WORD_ROOT.sub(r"(\1 \2)", block)
+    tree = Tree.fromstring(block)
+
+    # Strip the empty node at the top
+    if tree.label() == "" and len(tree) == 1:
+        return tree[0]
+    else:
+        return tree
+
+def iter_trees_from_stream(
+    stream: typing.Iterable[str],
+    name: str = "<STREAM>",
+    skip_ill_trees: bool = True,
+    line_num_start: int = 1,
+) -> typing.Iterator[Tree]:
+    """
+    Read bracketed trees from a stream of lines one by one.
+
+    Parameters
+    ----------
+    stream
+        A text stream or any iterable of lines.
+    name
+        The name of the stream, used in log messages.
+    skip_ill_trees
+        If True, discard trees with ill-formed brackets and continue.
+    line_num_start
+        The line number of the first line of `stream`, used in log messages.
+
+    Raises
+    ------
+    InvalidTreeSyntaxException
+        If `skip_ill_trees` is False and an ill-formed tree is found.
+    """
+    for line_num, block in iter_tree_blocks(stream, line_num_start):
+        try:
+            tree = parse_tree_block(block)
+        except ValueError as e:
+            if skip_ill_trees:
+                logger.warning(
+                    f"An ill-formed tree is found at {name}:{line_num}. The tree will be discarded. Info: {e}"
+                )
+                continue
+            else:
+                raise InvalidTreeSyntaxException(f"{name}:{line_num}") from e
+
+        if tree:
+            yield tree
+        else:
+            # an empty tree, which NLTK also drops
+            pass
+
+def _log_psd_files(
+    paths: typing.Sequence[str],
+    re_filter: typing.Union[str, typing.Pattern],
+) -> None:
+    if paths:
+        logger.info(
+            f"With the filter {re_filter}, the following file(s) are read: {paths}"
+        )
+    else:
+        logger.info(
+            f"No file is read with the specified filter '{re_filter}'. No trees will be yielded."
+        )
+
+def _iter_psd_file_trees(
+    folder: typing.Union[str, pathlib.Path],
+    path: str,
+    skip_ill_trees: bool = True,
+) -> typing.Iterator[Tree]:
+    with open(
+        os.path.join(folder, path), "r", encoding = "utf-8"
+    ) as h_file:
+        yield from iter_trees_from_stream(
+            h_file,
+            name = path,
+            skip_ill_trees = skip_ill_trees,
+        )
+
+def iter_psd_trees(
+    folder: typing.Union[str, pathlib.Path],
+    re_filter: typing.Union[str, typing.Pattern] = r".*\.psd$",
+    skip_ill_trees: bool = True,
+) -> typing.Iterator[Tree]:
+    """
+    Read trees from the files under `folder` one after another,
+    without loading any file as a whole.
+    The memory consumption is bounded by the largest tree.
+
+    Parameters
+    ----------
+    folder
+
+    re_filter
+        See :func:`find_psd_files`.
+
+    skip_ill_trees
+        See :func:`iter_trees_from_stream`.
+    """
+    paths = find_psd_files(folder, re_filter)
+    _log_psd_files(paths, re_filter)
+
+    for path in paths:
+        yield from _iter_psd_file_trees(folder, path, skip_ill_trees)
+
+def iter_source_lines(
+    source_path: typing.Union[str, pathlib.Path],
+) -> typing.Iterator[str]:
+    """
+    Read lines from a file, or from STDIN if `source_path` is `-`.
+    The file is opened at the first line requested and closed
+    when the iteration is over,
+    so that the lines can be handed over to lazy loaders.
+    """
+    if str(source_path) == "-":
+        yield from sys.stdin
+    else:
+        with open(source_path, "r", encoding = "utf-8") as h_file:
+            yield from h_file
+
+def _report_progress(
+    records: typing.Iterable[_R],
+    prog_stream: typing.Optional[typing.IO[str]],
+) -> typing.Iterator[_R]:
+    i = -1
+    for i, record in enumerate(records):
+        yield record
+
+        if prog_stream:
+            prog_stream.write(f"\r# of tree(s) fetched: {i + 1:,}")
+
+    if prog_stream and i >= 0:
+        prog_stream.write("\n")
+
+def _load_with_cache(
+    cache: pc.PSDCache,
+    kind: str,
+    folder: typing.Union[str, pathlib.Path],
+    paths: typing.Sequence[str],
+    parse: typing.Callable[
+        [typing.Sequence[str]],
+        typing.Iterator[typing.Tuple[str, typing.Iterable[_R]]]
+    ],
+) -> typing.Iterator[_R]:
+    """
+    Load records of files, taking those of unmodified files from `cache`.
+
+    Parameters
+    ----------
+    parse
+        A function that takes the paths of the files missing in the cache
+        and yields the pairs of a path and (a part of) its records in the order of the paths.
+        Consecutive pairs may share the same path.
+    """
+    paths_abs = {
+        path: os.path.abspath(os.path.join(folder, path))
+        for path in paths
+    }
+    paths_missed = [
+        path for path in paths
+        if not cache.is_valid(kind, paths_abs[path])
+    ]
+    logger.info(
+        f"Tree cache: {len(paths) - len(paths_missed)} hit(s), "
+        f"{len(paths_missed)} miss(es)"
+    )
+    set_missed = set(paths_missed)
+    parsed = more_itertools.peekable(parse(paths_missed))
+
+    def _records_of(path: str) -> typing.Iterator[_R]:
+        # files yielding no records may have no pairs
+        while parsed and parsed.peek()[0] == path:
+            yield from next(parsed)[1]
+
+    for path in paths:
+        if path in set_missed:
+            yield from cache.store(kind, paths_abs[path], _records_of(path))
+        else:
+            yield from cache.load(kind, paths_abs[path])
+
 def parse_all_labels_Keyaki_Annot(
     tree: Tree
 ):
@@ -107,13 +419,23 @@ def parse_all_labels_Keyaki_Annot(
             # do nothing
             pass
 
+def _parse_Keyaki_Annot_trees(
+    trees: typing.Iterable[Tree],
+) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
+    for ID, content in map(split_ID_from_Tree, trees):
+        parse_all_labels_Keyaki_Annot(content)
+        yield ID, content
+
 def load_Keyaki_Annot_psd(
     folder: typing.Union[str, pathlib.Path], 
-    re_filter: str = r".*\.psd$",
+    re_filter: typing.Union[str, typing.Pattern] = r".*\.psd$",
     prog_stream: typing.Optional[typing.IO[str]] = sys.stderr,
+    skip_ill_trees: bool = True,
+    cache: typing.Optional[pc.PSDCache] = None,
 ) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
     """
-    Utilizing NLTK, load the Keyaki Treebank with additional annotations for the ABC Treebank.
+    Load the Keyaki Treebank with additional annotations for the ABC Treebank.
+    Trees are streamed file by file.
     
     Parameters
     ----------
@@ -124,15 +446,31 @@ def load_Keyaki_Annot_psd(
     prog_stream:
         The stream where the progress info is redirected to and show up there.
         Feature disabled when set to `None`. 
+
+    skip_ill_trees:
+        If True, discard trees with ill-formed brackets and continue the process.
+
+    cache:
+        If given, parsed trees of files are taken from and stored in it.
+        See :mod:`abctk.io.psd_cache`.
     """
-    for i, tree in enumerate(
-        BracketParseCorpusReader(
-            root = str(folder),
-            fileids = re_filter,
-        ).parsed_sents()
-    ):
-        ID, content = split_ID_from_Tree(tree)
-        parse_all_labels_Keyaki_Annot(content)
+    paths = find_psd_files(folder, re_filter)
+    _log_psd_files(paths, re_filter)
+
+    def _parse(paths: typing.Sequence[str]):
+        for path in paths:
+            yield path, _parse_Keyaki_Annot_trees(
+                _iter_psd_file_trees(folder, path, skip_ill_trees)
+            )
+
+    if cache:
+        trees = _load_with_cache(cache, "Keyaki_Annot", folder, paths, _parse)
+    else:
+        trees = itertools.chain.from_iterable(
+            records for _, records in _parse(paths)
+        )
+
+    for i, (ID, content) in enumerate(trees):
         yield ID, content
         if prog_stream:
             prog_stream.write(f"\r# of tree(s) fetched: {i:,}")
@@ -140,6 +478,43 @@ def load_Keyaki_Annot_psd(
     if prog_stream:
         prog_stream.write("\n")
 
+def load_Keyaki_Annot_stream(
+    stream: typing.Iterable[str],
+    name: str = "<STREAM>",
+    prog_stream: typing.Optional[typing.IO[str]] = sys.stderr,
+    skip_ill_trees: bool = True,
+) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
+    """
+    Load trees of the Keyaki Treebank with additional annotations
+    from a stream of lines, e.g. STDIN.
+    Each tree is yielded as soon as it has been read,
+    without waiting for the end of the stream.
+
+    Parameters
+    ----------
+    stream
+        A text stream or any iterable of lines.
+        See also :func:`iter_source_lines`.
+
+    name
+        The name of the stream, used in log messages.
+
+    prog_stream
+
+    skip_ill_trees
+        See :func:`load_Keyaki_Annot_psd`.
+    """
+    yield from _report_progress(
+        _parse_Keyaki_Annot_trees(
+            iter_trees_from_stream(
+                stream,
+                name = name,
+                skip_ill_trees = skip_ill_trees,
+            )
+        ),
+        prog_stream,
+    )
+
 class InvalidABCTreeException(ABCTException):
     """
     The exception class for ABC tree loading.
@@ -154,6 +529,10 @@ class InvalidABCTreeException(ABCTException):
         self.ID = ID
         super().__init__(f"Failed to parse the ABC tree (ID: {ID})")
 
+    def __reduce__(self):
+        # keep the ID when sent back from worker processes
+        return (self.__class__, (self.ID, ))
+
 def parse_all_labels_ABC(
     tree: Tree,
     ID: Union[RecordID, str] = "<UNKNOWN>",
@@ -179,14 +558,14 @@ def parse_all_labels_ABC(
                 if isinstance(label, str):
                     label_parsed: Annot[ABCCat] = Annot.parse(
                         label,
-                        parser_cat = ABCCat.parse, # NOTE: too slow
-                        pprinter_cat = ABCCat.pprint,
+                        parser_cat = cc.parse_cat,
+                        pprinter_cat = cc.pprint_cat,
                     )
                 else:
                     label_parsed: Annot[ABCCat] = Annot(
-                        cat = ABCCat.parse(label.cat),
+                        cat = cc.parse_cat(label.cat),
                         feats = {**label.feats},
-                        pprinter_cat = ABCCat.pprint
+                        pprinter_cat = cc.pprint_cat,
                     )
                 pointer.set_label(label_parsed)
             except Exception as e:
@@ -202,14 +581,152 @@ def parse_all_labels_ABC(
             pass
 
 
+def _parse_ABC_trees(
+    trees: typing.Iterable[Tree],
+    skip_ill_trees: bool = True,
+) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
+    """
+    Split IDs from raw trees and parse their labels as ABC categories.
+    """
+    for ID, tree in map(split_ID_from_Tree, trees):
+        try:
+            parse_all_labels_ABC(tree, ID)
+            yield ID, tree
+        except Exception as e:
+            if skip_ill_trees:
+                logger.warning(
+                    f"An exception has been raised in parsing the nodes of Tree {ID}. The tree will be discarded. Info: {e}"
+                )
+            else:
+                logger.error(
+                    f"An exception has been raised in parsing the nodes of Tree {ID}. The process will halt and the exception will be tossed up.",
+                    exc_info = True,
+                    stack_info = True,
+                )
+                raise InvalidABCTreeException(ID) from e
+
+_PARALLEL_CHUNK_SIZE = 256 * 1024
+"""
+The approximate size (in bytes) of file chunks dispatched to worker processes.
+"""
+
+class _PSDChunk(typing.NamedTuple):
+    path_abs: str
+    name: str
+    offset: int
+    length: int
+    line_num_start: int
+
+def _split_psd_file(
+    path_abs: str,
+    name: str,
+    chunk_size: int = _PARALLEL_CHUNK_SIZE,
+) -> typing.Iterator[_PSDChunk]:
+    """
+    Split a file into chunks of about `chunk_size` bytes.
+    Chunks are cut only right before a line starting with `(`,
+    so that no tree straddles two chunks.
+    """
+    with open(path_abs, "rb") as h_file:
+        offset = 0
+        chunk_offset = 0
+        chunk_line_num = 1
+        for line_num, line in enumerate(h_file, start = 1):
+            if (
+                line.startswith(b"(")
+                and offset - chunk_offset >= chunk_size
+            ):
+                yield _PSDChunk(
+                    path_abs, name,
+                    chunk_offset, offset - chunk_offset,
+                    chunk_line_num,
+                )
+                chunk_offset = offset
+                chunk_line_num = line_num
+            offset += len(line)
+
+        if offset > chunk_offset:
+            yield _PSDChunk(
+                path_abs, name,
+                chunk_offset, offset - chunk_offset,
+                chunk_line_num,
+            )
+
+def _load_ABC_psd_chunk(
+    chunk: _PSDChunk,
+    skip_ill_trees: bool = True,
+) -> typing.List[typing.Tuple[RecordID, Tree]]:
+    """
+    Read and parse all the trees of a file chunk.
+    Run in worker processes of :func:`load_ABC_psd`.
+    """
+    with open(chunk.path_abs, "rb") as h_file:
+        h_file.seek(chunk.offset)
+        content = h_file.read(chunk.length).decode("utf-8")
+
+    return list(
+        _parse_ABC_trees(
+            iter_trees_from_stream(
+                # lines cut as in reading the file in the text mode
+                io.StringIO(content, newline = None),
+                name = chunk.name,
+                skip_ill_trees = skip_ill_trees,
+                line_num_start = chunk.line_num_start,
+            ),
+            skip_ill_trees = skip_ill_trees,
+        )
+    )
+
+def _load_ABC_psd_parallel(
+    folder: typing.Union[str, pathlib.Path],
+    paths: typing.Sequence[str],
+    skip_ill_trees: bool,
+    n_jobs: int,
+) -> typing.Iterator[typing.Tuple[str, typing.List[typing.Tuple[RecordID, Tree]]]]:
+    """
+    Dispatch file chunks to a process pool and yield their trees in the original order,
+    along with the path of the file of each chunk.
+    At most `2 * n_jobs` chunks are in flight at a time to keep memory bounded.
+    """
+    func = functools.partial(
+        _load_ABC_psd_chunk,
+        skip_ill_trees = skip_ill_trees,
+    )
+    chunks = itertools.chain.from_iterable(
+        _split_psd_file(os.path.join(folder, path), path)
+        for path in paths
+    )
+
+    executor = cf.ProcessPoolExecutor(max_workers = n_jobs)
+    logger.info(f"Multiprocessing pool created, number of processes: {n_jobs}")
+    try:
+        futures: typing.Deque[typing.Tuple[str, cf.Future]] = collections.deque(
+            (chunk.name, executor.submit(func, chunk))
+            for chunk in itertools.islice(chunks, n_jobs * 2)
+        )
+
+        while futures:
+            name, future = futures.popleft()
+            trees = future.result()
+
+            if (chunk := next(chunks, None)) is not None:
+                futures.append((chunk.name, executor.submit(func, chunk)))
+
+            yield name, trees
+    finally:
+        executor.shutdown(wait = True, cancel_futures = True)
+
 def load_ABC_psd(
     folder: typing.Union[str, pathlib.Path], 
     re_filter: typing.Union[str, typing.Pattern] = r".*\.psd$",
     prog_stream: typing.Optional[typing.IO[str]] = sys.stderr,
     skip_ill_trees: bool = True,
+    n_jobs: typing.Optional[int] = None,
+    cache: typing.Optional[pc.PSDCache] = None,
 ) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
     """
-    Utilizing NLTK, load the ABC Treebank.
+    Load the ABC Treebank.
+    Trees are streamed file by file.
     
     Parameters
     ----------
@@ -224,6 +741,18 @@ def load_ABC_psd(
     skip_ill_trees:
         If True, try discarding ill-formed trees and continuing the process.
 
+    n_jobs:
+        The number of processes that parse files in parallel.
+        Trees are yielded in the original order regardless of this setting.
+        Files are split into chunks of trees, which are dispatched to the processes.
+        Files are read serially in the current process when it is 1 or less or None (default).
+        The commands pass `max_process_num` of the configuration.
+
+    cache:
+        If given, parsed trees of files are taken from and stored in it.
+        Only files missing in the cache are parsed.
+        See :mod:`abctk.io.psd_cache`.
+
     Yields
     ------
     ID: Keyaki_ID
@@ -234,56 +763,402 @@ def load_ABC_psd(
     InvalidABCTreeException
         If parsing of the given tree of categories therein fails.
     """
+    paths = find_psd_files(folder, re_filter)
+    _log_psd_files(paths, re_filter)
+
+    def _parse(paths: typing.Sequence[str]):
+        if n_jobs is not None and n_jobs > 1 and paths:
+            yield from _load_ABC_psd_parallel(
+                folder, paths,
+                skip_ill_trees = skip_ill_trees,
+                n_jobs = n_jobs,
+            )
+        else:
+            for path in paths:
+                yield path, _parse_ABC_trees(
+                    _iter_psd_file_trees(folder, path, skip_ill_trees),
+                    skip_ill_trees = skip_ill_trees,
+                )
+
+    if cache:
+        trees = _load_with_cache(cache, "ABC", folder, paths, _parse)
+    else:
+        trees = itertools.chain.from_iterable(
+            records for _, records in _parse(paths)
+        )
+
+    yield from _report_progress(trees, prog_stream)
+
+def load_ABC_stream(
+    stream: typing.Iterable[str],
+    name: str = "<STREAM>",
+    prog_stream: typing.Optional[typing.IO[str]] = sys.stderr,
+    skip_ill_trees: bool = True,
+) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
+    """
+    Load ABC trees from a stream of lines, e.g. STDIN.
+    Each tree is yielded as soon as it has been read,
+    without waiting for the end of the stream.
+
+    Parameters
+    ----------
+    stream
+        A text stream or any iterable of lines.
+        See also :func:`iter_source_lines`.
+
+    name
+        The name of the stream, used in log messages.
+
+    prog_stream
+
+    skip_ill_trees
+        See :func:`load_ABC_psd`.
 
-    corpus_reader = BracketParseCorpusReader(
-        root = str(folder),
-        fileids = re_filter,
+    Raises
+    ------
+    InvalidABCTreeException
+        If parsing of the given tree of categories therein fails.
+    """
+    yield from _report_progress(
+        _parse_ABC_trees(
+            iter_trees_from_stream(
+                stream,
+                name = name,
+                skip_ill_trees = skip_ill_trees,
+            ),
+            skip_ill_trees = skip_ill_trees,
+        ),
+        prog_stream,
     )
 
-    fileids = corpus_reader.fileids()
+# ================
+# Streaming writer of PTB-style files
+# ================
+def _make_label_printer(
+    **kwargs,
+) -> typing.Callable[[typing.Any], str]:
+    def _pprint_label(label) -> str:
+        if isinstance(label, Annot):
+            return label.pprint(**kwargs)
+        else:
+            return str(label)
 
-    if fileids:
-        logger.info(
-            f"With the filter {re_filter}, the following file(s) are read: {corpus_reader.fileids()}"
+    return _pprint_label
+
+def _serialize_tree(
+    tree: typing.Union[Tree, str],
+    out: typing.List[str],
+    pprint_label: typing.Callable[[typing.Any], str],
+) -> None:
+    """
+    Append the pieces of the Penn Treebank representation of a tree to `out`.
+    The tree is walked with an explicit stack.
+    """
+    append = out.append
+    stack: typing.List[typing.Any] = [tree]
+    pop = stack.pop
+    push = stack.append
+
+    while stack:
+        node = pop()
+        if isinstance(node, Tree):
+            append("(")
+            append(pprint_label(node.label()))
+            append(" ")
+            push(")")
+            for i in range(len(node) - 1, -1, -1):
+                push(node[i])
+                if i:
+                    push(" ")
+        elif isinstance(node, str):
+            # including the delimiters pushed above
+            append(node)
+        else:
+            append(str(node))
+
+class PTBWriter:
+    """
+    A buffered writer of trees in the Penn Treebank format.
+
+    Trees are serialized without recursion into a buffer of string pieces,
+    which is written to the stream in large blocks.
+
+    Parameters
+    ----------
+    stream
+        The text stream to write to.
+    hide_all_feats
+    feats_to_print
+    verbose_role
+        Passed to :meth:`Annot.pprint` of each label.
+        See also :func:`flatten_tree`.
+    buffer_size
+        The number of buffered pieces that triggers a write to `stream`.
+    pprint_label
+        A custom printer of labels, which overrides the options above.
+
+    Examples
+    --------
+    >>> with PTBWriter(sys.stdout) as writer: # doctest: +SKIP
+    ...     for ID, tree in trees:
+    ...         writer.write_tree_with_ID(ID, tree)
+    """
+
+    def __init__(
+        self,
+        stream: typing.TextIO,
+        hide_all_feats: bool = False,
+        feats_to_print: typing.Sequence[str] = tuple(),
+        verbose_role: bool = False,
+        buffer_size: int = 64 * 1024,
+        pprint_label: typing.Optional[typing.Callable[[typing.Any], str]] = None,
+    ):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer: typing.List[str] = []
+        self._pprint_label = pprint_label or _make_label_printer(
+            hide_all_feats = hide_all_feats,
+            feats_to_print = feats_to_print,
+            verbose_role = verbose_role,
         )
 
-        for i, (ID, tree) in enumerate(
-            split_ID_from_Tree(tree_raw)
-            for tree_raw in corpus_reader.parsed_sents()
-        ):
+    def write_raw(self, text: str) -> None:
+        self._buffer.append(text)
+
+    def write_tree(
+        self,
+        tree: typing.Union[Tree, str],
+        end: str = "",
+    ) -> None:
+        _serialize_tree(tree, self._buffer, self._pprint_label)
+        if end:
+            self._buffer.append(end)
+
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_tree_with_ID(
+        self,
+        ID: RecordID,
+        tree: typing.Union[Tree, str],
+        end: str = "\n",
+    ) -> None:
+        """
+        Write a tree in the format of :func:`flatten_tree_with_ID`, followed by `end`.
+        """
+        buffer = self._buffer
+        buffer.append("(TOP ")
+        _serialize_tree(tree, buffer, self._pprint_label)
+        buffer.append(" (ID ")
+        buffer.append(str(ID))
+        buffer.append("))")
+        if end:
+            buffer.append(end)
+
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+
+    def __enter__(self) -> "PTBWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.flush()
+
+def _flatten_tree_with_ID_by(
+    ID: RecordID,
+    tree: typing.Union[Tree, str],
+    pprint_label: typing.Callable[[typing.Any], str],
+) -> str:
+    out = ["(TOP "]
+    _serialize_tree(tree, out, pprint_label)
+    out.append(" (ID ")
+    out.append(str(ID))
+    out.append("))")
+    return "".join(out)
+
+_DUMP_MEMORY_LIMIT = 256 * 1024 ** 2
+"""
+The default size (in characters) of serialized trees kept in memory by the dumpers.
+Trees beyond it are sorted and spilled to temporary files.
+"""
+
+_DumpRecord = typing.Tuple[str, RecordID, int, str]
+"""
+The file name, the ID, the input order and the serialized tree.
+"""
+
+_dump_record_key = operator.itemgetter(0, 1, 2)
+"""
+The sort key of dump records.
+The input order breaks ties so that trees themselves are never compared.
+"""
+
+def _spill_dump_records(
+    records: typing.List[_DumpRecord],
+    temp_dir: str,
+) -> str:
+    records.sort(key = _dump_record_key)
+    fd, path = tempfile.mkstemp(dir = temp_dir, suffix = ".run")
+    with os.fdopen(fd, "wb") as h_run:
+        for record in records:
+            pickle.dump(record, h_run, protocol = pickle.HIGHEST_PROTOCOL)
+    return path
+
+def _iter_dump_records(path: str) -> typing.Iterator[_DumpRecord]:
+    with open(path, "rb") as h_run:
+        while True:
             try:
-                parse_all_labels_ABC(tree)
-                yield ID, tree
+                yield pickle.load(h_run)
+            except EOFError:
+                break
 
-                if prog_stream:
-                    prog_stream.write(f"\r# of tree(s) fetched: {i + 1:,}")
-            except Exception as e:
-                if skip_ill_trees:
-                    logger.warning(
-                        f"An exception has been raised in parsing the nodes of Tree {ID}. The tree will be discarded. Info: {e}"
-                    )
-                else:
-                    logger.error(
-                        f"An exception has been raised in parsing the nodes of Tree {ID}. The process will halt and the exception will be tossed up.",
-                        exc_info = True,
-                        stack_info = True,
-                    )
-                    raise InvalidABCTreeException(ID) from e
+def _write_psd_file(
+    h_folder: fs.base.FS,
+    file_name: str,
+    texts: typing.Sequence[str],
+) -> None:
+    file_path = Keyaki_ID.from_string("0_" + file_name).tell_path()
 
-        if prog_stream:
-            prog_stream.write("\n")
-    else:
-        logger.info(
-            f"No file is read with the specified filter '{re_filter}'. No trees will be yielded."
+    h_folder.makedir(fs.path.dirname(file_path), recreate = True)
+    with h_folder.open(file_path, "w") as h_file:
+        h_file.write("\n".join(texts))
+
+class PSDFolderWriter:
+    """
+    A writer of trees into files named after their IDs,
+    to which trees are pushed one by one.
+    The files are written when the writer is closed.
+
+    Trees are serialized as soon as they arrive.
+    When the serialized trees exceed `max_memory` characters,
+    they are sorted and spilled to a temporary file,
+    and all the spilled runs are merged at the end (external merge sort).
+    Trees are sorted by their IDs, and those sharing the same ID are kept in the arrival order.
+    Each output file is written by a thread pool of `n_jobs` workers.
+
+    Parameters
+    ----------
+    folder
+        The folder to dump the trees to.
+    hide_all_feats
+    feats_to_print
+    verbose_role
+    pprint_label
+        See :class:`PTBWriter`.
+    max_memory
+        The size (in characters) of serialized trees kept in memory.
+    n_jobs
+        The number of threads that write files concurrently.
+        Files are written one at a time when it is 1 or less or None (default).
+        The commands pass `max_process_num` of the configuration.
+    """
+
+    def __init__(
+        self,
+        folder: typing.Union[str, pathlib.Path, fs.base.FS],
+        hide_all_feats: bool = False,
+        feats_to_print: typing.Sequence[str] = tuple(),
+        verbose_role: bool = False,
+        pprint_label: typing.Optional[typing.Callable[[typing.Any], str]] = None,
+        max_memory: int = _DUMP_MEMORY_LIMIT,
+        n_jobs: typing.Optional[int] = None,
+    ):
+        self.folder = str(folder) if isinstance(folder, pathlib.Path) else folder
+        self.max_memory = max_memory
+        self.n_jobs = max(n_jobs or 1, 1)
+        self._pprint_label = pprint_label or _make_label_printer(
+            hide_all_feats = hide_all_feats,
+            feats_to_print = feats_to_print,
+            verbose_role = verbose_role,
+        )
+
+        self._temp_dir = tempfile.TemporaryDirectory(prefix = "abctk-dump-")
+        self._runs: typing.List[str] = []
+        self._bucket: typing.List[_DumpRecord] = []
+        self._bucket_size = 0
+        self._count = 0
+
+    def add(self, ID: RecordID, tree: typing.Union[Tree, str]) -> None:
+        text = _flatten_tree_with_ID_by(ID, tree, self._pprint_label)
+        self._bucket.append((ID.name, ID, self._count, text))
+        self._bucket_size += len(text)
+        self._count += 1
+
+        if self._bucket_size >= self.max_memory:
+            self._runs.append(_spill_dump_records(self._bucket, self._temp_dir.name))
+            self._bucket = []
+            self._bucket_size = 0
+
+    def close(self) -> None:
+        """
+        Write out all the trees and clean up the temporary files.
+        """
+        try:
+            self._write()
+        finally:
+            self._temp_dir.cleanup()
+
+    def _write(self) -> None:
+        runs = self._runs
+        if runs:
+            logger.info(f"Trees are sorted externally with {len(runs)} spilled run(s)")
+        self._bucket.sort(key = _dump_record_key)
+        records = heapq.merge(
+            *(_iter_dump_records(path) for path in runs),
+            self._bucket,
+            key = _dump_record_key,
         )
 
+        n_jobs = self.n_jobs
+        with fs.open_fs(self.folder, create = True) as h_folder:
+            executor = cf.ThreadPoolExecutor(max_workers = n_jobs)
+            futures: typing.Deque[cf.Future] = collections.deque()
+            try:
+                for file_name, group in itertools.groupby(
+                    records, key = operator.itemgetter(0)
+                ):
+                    futures.append(
+                        executor.submit(
+                            _write_psd_file,
+                            h_folder, file_name,
+                            [text for _, _, _, text in group],
+                        )
+                    )
+
+                    # keep the number of files held in memory bounded
+                    while len(futures) > n_jobs * 2:
+                        futures.popleft().result()
+
+                while futures:
+                    futures.popleft().result()
+            finally:
+                executor.shutdown(wait = True, cancel_futures = True)
+
+    def __enter__(self) -> "PSDFolderWriter":
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # nothing is written
+            self._temp_dir.cleanup()
+
 def dump_Keyaki_to_psd(
     tb: typing.Iterable[typing.Tuple[Keyaki_ID, Tree]],
     folder: typing.Union[str, pathlib.Path, fs.base.FS],
     prog_stream: typing.Optional[typing.IO[str]] = sys.stderr,
+    max_memory: int = _DUMP_MEMORY_LIMIT,
+    n_jobs: typing.Optional[int] = None,
 ) -> None:
     '''
     Takes a bunch of Keyaki trees, and dumps them into a folder.
+    Trees are sorted by their IDs and grouped into files by the names of the IDs.
     
     Parameters
     ----------
@@ -293,45 +1168,22 @@ def dump_Keyaki_to_psd(
         The folder to dump the trees to.
     prog_stream
         A stream to write progress to (using tqdm).
+    max_memory
+        The size (in characters) of serialized trees kept in memory.
+        Beyond it, trees are sorted externally with temporary files.
+    n_jobs
+        The number of threads that write files concurrently.
+        Files are written one at a time when it is 1 or less or None (default).
+        The commands pass `max_process_num` of the configuration.
     '''
-    def _flatten_tree(tree: typing.Union[Tree, str]):
-        if isinstance(tree, Tree):
-            label = tree.label()
-            if isinstance(label, Annot):
-                label_pprint = label.pprint()
-            else:
-                label_pprint = str(label)
-
-            children_pprint = " ".join(
-                _flatten_tree(child) for child in tree
-            )
-            return f"({label_pprint} {children_pprint})"
-        else:
-            return str(tree)
-
-    bucket = list(tb)
-
-    bucket.sort(key = operator.itemgetter(0))
-    bucket_grouped = itertools.groupby(
-        bucket,
-        key = lambda x: x[0].name,
-    )
-
-    if isinstance(folder, pathlib.Path):
-        folder = str(folder)
-    
-    with fs.open_fs(folder, create = True) as h_folder:
-        for file_name, trees in bucket_grouped:
-            file_path = Keyaki_ID.from_string("0_" + file_name).tell_path()
-
-            h_folder.makedir(fs.path.dirname(file_path), recreate = True)
-            with h_folder.open(file_path, "w") as h_file:
-                h_file.write(
-                    "\n".join(
-                        f"(TOP {_flatten_tree(tree)} (ID {ID}))"
-                        for ID, tree in trees
-                    )
-                )
+    with PSDFolderWriter(
+        folder,
+        pprint_label = _make_label_printer(),
+        max_memory = max_memory,
+        n_jobs = n_jobs,
+    ) as writer:
+        for ID, tree in tb:
+            writer.add(ID, tree)
     if prog_stream:
         prog_stream.write("\n")
 
@@ -343,6 +1195,7 @@ def flatten_tree(
 ):
     '''
     Flatten a tree and return its Penn Treebank representation.
+    Use :class:`PTBWriter` to write many trees to a stream.
     
     Parameters
     ----------
@@ -355,30 +1208,16 @@ def flatten_tree(
     -------
         A Penn Treebank representation of the tree.
     '''
-
-    if isinstance(tree, Tree):
-        label = tree.label()
-        if isinstance(label, Annot):
-            label_pprint = label.pprint(
-                hide_all_feats = hide_all_feats,
-                feats_to_print = feats_to_print,
-                verbose_role = verbose_role,
-            )
-        else:
-            label_pprint = str(label)
-
-        children_pprint = " ".join(
-            flatten_tree(
-                child,
-                hide_all_feats = hide_all_feats,
-                feats_to_print = feats_to_print,
-                verbose_role = verbose_role,
-            )
-            for child in tree
-        )
-        return f"({label_pprint} {children_pprint})"
-    else:
-        return str(tree)
+    out: typing.List[str] = []
+    _serialize_tree(
+        tree, out,
+        _make_label_printer(
+            hide_all_feats = hide_all_feats,
+            feats_to_print = feats_to_print,
+            verbose_role = verbose_role,
+        ),
+    )
+    return "".join(out)
 
 def flatten_tree_with_ID(
     ID: RecordID, 
@@ -402,14 +1241,7 @@ def flatten_tree_with_ID(
         An Penn Treebank representation of `tree`.
     
     '''
-    return f"""(TOP {
-        flatten_tree(
-            tree, 
-            hide_all_feats = hide_all_feats,
-            feats_to_print = feats_to_print, 
-            verbose_role = verbose_role
-        )
-    } (ID {ID}))"""
+    return f"(TOP {flatten_tree(tree, hide_all_feats, feats_to_print, verbose_role)} (ID {ID}))"
 
 def dump_ABC_to_psd(
     tb: typing.Iterable[typing.Tuple[Keyaki_ID, Tree]],
@@ -418,10 +1250,14 @@ def dump_ABC_to_psd(
     hide_all_feats: bool = False,
     feats_to_print: typing.Sequence[str] = tuple(),
     verbose_role: bool = False,
+    max_memory: int = _DUMP_MEMORY_LIMIT,
+    n_jobs: typing.Optional[int] = None,
 ) -> None:
     
     '''
     Takes a bunch of ABC trees, and dumps them into a folder.
+    Trees are sorted by their IDs and grouped into files by the names of the IDs.
+    Trees sharing the same ID are kept in the input order.
     
     Parameters
     ----------
@@ -431,34 +1267,23 @@ def dump_ABC_to_psd(
         The folder to dump the trees to.
     prog_stream
         A stream to write progress to (using tqdm).
+    max_memory
+        The size (in characters) of serialized trees kept in memory.
+        Beyond it, trees are sorted externally with temporary files.
+    n_jobs
+        The number of threads that write files concurrently.
+        Files are written one at a time when it is 1 or less or None (default).
+        The commands pass `max_process_num` of the configuration.
     '''
-    bucket = list(tb)
-    bucket.sort(key = operator.itemgetter(0, 1))
-    bucket_grouped = itertools.groupby(
-        bucket,
-        key = lambda x: x[0].name,
-    )
-
-    if isinstance(folder, pathlib.Path):
-        folder = str(folder)
-    
-    with fs.open_fs(folder, create = True) as h_folder:
-        for file_name, trees in bucket_grouped:
-            file_path = Keyaki_ID.from_string("0_" + file_name).tell_path()
-
-            h_folder.makedir(fs.path.dirname(file_path), recreate = True)
-            with h_folder.open(file_path, "w") as h_file:
-                h_file.write(
-                    "\n".join(
-                        flatten_tree_with_ID(
-                            ID, 
-                            tree, 
-                            hide_all_feats = hide_all_feats,
-                            feats_to_print = feats_to_print,
-                            verbose_role = verbose_role,
-                        )
-                        for ID, tree in trees
-                    )
-                )
+    with PSDFolderWriter(
+        folder,
+        hide_all_feats = hide_all_feats,
+        feats_to_print = feats_to_print,
+        verbose_role = verbose_role,
+        max_memory = max_memory,
+        n_jobs = n_jobs,
+    ) as writer:
+        for ID, tree in tb:
+            writer.add(ID, tree)
     if prog_stream:
-        prog_stream.write("\n")
\ No newline at end of file
+        prog_stream.write("\n")
@@ -0,0 +1,327 @@
+"""
+An opt-in on-disk cache of parsed treebank files.
+
+For each source file, the records produced by a loader
+(e.g. `(ID, Tree)` pairs with parsed labels) are stored in the pickle format
+under :data:`DIR_TREE_CACHE`, along with a small JSON file of metadata.
+
+An entry is keyed by the kind of the loader and the absolute path of the source file.
+It is considered valid only if the size of the source file is unchanged
+and either its mtime is unchanged or its SHA-256 hash is identical to the recorded one.
+Entries are evicted in the least recently used order
+when the total size exceeds the cap.
+"""
+
+import hashlib
+import importlib.metadata as im
+import json
+import logging
+logger = logging.getLogger(__name__)
+import os
+import pathlib
+import pickle
+import tempfile
+import typing
+
+import abctk
+import abctk.config
+
+_CONF_DEFAULT = typing.cast(
+    typing.Dict[str, typing.Any],
+    abctk.config.CONF_DEFAULT["tree-cache"],
+)
+
+DIR_TREE_CACHE: pathlib.Path = _CONF_DEFAULT["folder"]
+"""
+The default folder of the cache.
+"""
+
+_FORMAT_VERSION = 1
+
+_SUFFIX_DATA = ".pkl"
+_SUFFIX_META = ".json"
+
+R = typing.TypeVar("R")
+
+def _get_versions() -> typing.Dict[str, str]:
+    """
+    Get the versions of the packages that the pickled objects depend on.
+    Entries created with other versions are invalidated.
+    """
+    res = {
+        "format": str(_FORMAT_VERSION),
+        "abctk": str(abctk.__version__),
+    }
+    try:
+        res["abctk-obj"] = im.version("abctk-obj")
+    except im.PackageNotFoundError:
+        pass
+    return res
+
+def hash_file(path: typing.Union[str, pathlib.Path]) -> str:
+    """
+    Calculate the SHA-256 hash of a file.
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as h_file:
+        while (block := h_file.read(1024 * 1024)):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+class CacheStats(typing.NamedTuple):
+    """
+    The statistics of a :class:`PSDCache`.
+    """
+    entries: int
+    size: int
+    max_size: int
+
+class PSDCache:
+    """
+    An on-disk cache of records loaded from treebank files.
+
+    Parameters
+    ----------
+    folder
+        The folder where cache entries are stored.
+    max_size
+        The maximum total size (in bytes) of the stored records.
+    """
+
+    folder: pathlib.Path
+    max_size: int
+
+    def __init__(
+        self,
+        folder: typing.Union[str, pathlib.Path] = DIR_TREE_CACHE,
+        max_size: int = _CONF_DEFAULT["max-size"],
+    ):
+        self.folder = pathlib.Path(folder)
+        self.max_size = max_size
+        self._versions = _get_versions()
+
+    @classmethod
+    def from_config(
+        cls,
+        config: typing.Mapping[str, typing.Any],
+        enabled: typing.Optional[bool] = None,
+    ) -> typing.Optional["PSDCache"]:
+        """
+        Create a cache following the `tree-cache` section of a configuration.
+
+        Parameters
+        ----------
+        config
+        enabled
+            Overrides `tree-cache.enabled` if not None.
+
+        Returns
+        -------
+        cache
+            None if the cache is disabled.
+        """
+        conf = config.get("tree-cache", {})
+        if enabled is None:
+            enabled = conf.get("enabled", False)
+
+        if enabled:
+            return cls(
+                folder = conf.get("folder", DIR_TREE_CACHE),
+                max_size = conf.get(
+                    "max-size",
+                    _CONF_DEFAULT["max-size"],
+                ),
+            )
+        else:
+            return None
+
+    def _entry_paths(
+        self,
+        kind: str,
+        path_abs: str,
+    ) -> typing.Tuple[pathlib.Path, pathlib.Path]:
+        key = hashlib.sha256(f"{kind}\0{path_abs}".encode("utf-8")).hexdigest()
+        return (
+            self.folder / (key + _SUFFIX_META),
+            self.folder / (key + _SUFFIX_DATA),
+        )
+
+    def _write_meta(self, meta_path: pathlib.Path, meta: dict) -> None:
+        fd, temp_path = tempfile.mkstemp(dir = self.folder, suffix = ".tmp")
+        with os.fdopen(fd, "w") as h_meta:
+            json.dump(meta, h_meta)
+        os.replace(temp_path, meta_path)
+
+    def is_valid(self, kind: str, path_abs: str) -> bool:
+        """
+        Check whether there is a valid entry for a source file.
+        """
+        meta_path, data_path = self._entry_paths(kind, path_abs)
+
+        try:
+            with open(meta_path) as h_meta:
+                meta = json.load(h_meta)
+            stat = os.stat(path_abs)
+        except (OSError, ValueError):
+            return False
+
+        if (
+            meta.get("versions") != self._versions
+            or meta.get("kind") != kind
+            or meta.get("path") != path_abs
+            or meta.get("size") != stat.st_size
+            or not data_path.exists()
+        ):
+            return False
+        elif meta.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+        elif meta.get("sha256") == hash_file(path_abs):
+            # touched but not modified
+            meta["mtime_ns"] = stat.st_mtime_ns
+            self._write_meta(meta_path, meta)
+            return True
+        else:
+            return False
+
+    def load(self, kind: str, path_abs: str) -> typing.Iterator[typing.Any]:
+        """
+        Stream the records of a source file from the cache.
+        The validity of the entry should be checked with :meth:`is_valid` beforehand.
+        """
+        _, data_path = self._entry_paths(kind, path_abs)
+
+        # mark as recently used
+        os.utime(data_path)
+
+        with open(data_path, "rb") as h_data:
+            unpickler = pickle.Unpickler(h_data)
+            while True:
+                try:
+                    record = unpickler.load()
+                except EOFError:
+                    break
+                yield record
+
+    def store(
+        self,
+        kind: str,
+        path_abs: str,
+        records: typing.Iterable[R],
+    ) -> typing.Iterator[R]:
+        """
+        Pass through the records of a source file, storing them in the cache.
+
+        Each record is serialized before it is yielded,
+        so later modifications to it are not reflected in the cache.
+        The entry is committed only if `records` is exhausted.
+        """
+        self.folder.mkdir(parents = True, exist_ok = True)
+        meta_path, data_path = self._entry_paths(kind, path_abs)
+
+        stat = os.stat(path_abs)
+        meta = {
+            "versions": self._versions,
+            "kind": kind,
+            "path": path_abs,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": hash_file(path_abs),
+        }
+
+        fd, temp_path = tempfile.mkstemp(dir = self.folder, suffix = ".tmp")
+        is_completed = False
+        try:
+            with os.fdopen(fd, "wb") as h_data:
+                # The memo of the pickler is kept across records
+                # so that shared objects (e.g. interned categories) are stored once.
+                pickler: typing.Optional[pickle.Pickler] = pickle.Pickler(
+                    h_data, protocol = pickle.HIGHEST_PROTOCOL
+                )
+                for record in records:
+                    if pickler:
+                        try:
+                            pickler.dump(record)
+                        except (pickle.PicklingError, TypeError, AttributeError) as e:
+                            logger.warning(
+                                f"Trees of {path_abs} cannot be cached and are passed through. Info: {e}"
+                            )
+                            pickler = None
+                    yield record
+            is_completed = pickler is not None
+        finally:
+            if is_completed:
+                os.replace(temp_path, data_path)
+                self._write_meta(meta_path, meta)
+                logger.info(f"Trees of {path_abs} are cached at {data_path}")
+                self.evict()
+            else:
+                os.remove(temp_path)
+
+    def _iter_entries(self) -> typing.Iterator[typing.Tuple[pathlib.Path, os.stat_result]]:
+        if self.folder.exists():
+            for data_path in self.folder.glob("*" + _SUFFIX_DATA):
+                try:
+                    yield data_path, data_path.stat()
+                except OSError:
+                    pass
+
+    def _remove_entry(self, data_path: pathlib.Path) -> None:
+        for path in (data_path, data_path.with_suffix(_SUFFIX_META)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries until the total size fits in the cap.
+
+        Returns
+        -------
+        count
+            The number of removed entries.
+        """
+        entries = sorted(
+            self._iter_entries(),
+            key = lambda e: e[1].st_mtime_ns,
+        )
+        size_total = sum(stat.st_size for _, stat in entries)
+
+        count = 0
+        for data_path, stat in entries:
+            if size_total <= self.max_size:
+                break
+            self._remove_entry(data_path)
+            size_total -= stat.st_size
+            count += 1
+
+        if count:
+            logger.info(f"{count} cache entries are evicted")
+        return count
+
+    def stats(self) -> CacheStats:
+        entries = tuple(self._iter_entries())
+        return CacheStats(
+            entries = len(entries),
+            size = sum(stat.st_size for _, stat in entries),
+            max_size = self.max_size,
+        )
+
+    def clear(self) -> int:
+        """
+        Remove all the entries.
+
+        Returns
+        -------
+        count
+            The number of removed entries.
+        """
+        count = 0
+        for data_path, _ in tuple(self._iter_entries()):
+            self._remove_entry(data_path)
+            count += 1
+
+        if self.folder.exists():
+            for path in self.folder.glob("*" + _SUFFIX_META):
+                path.unlink()
+        return count
@@ -0,0 +1,330 @@
+"""
+A sidecar index of treebank files for random access to individual trees.
+
+The index maps the ID of each tree to the location of its bracketed text,
+i.e. the file, the byte offset and the length,
+and is stored in an SQLite database next to the treebank.
+Looking up a tree thus costs a single seek and the parsing of that tree only.
+
+The index is updated incrementally:
+only files whose size or mtime has changed since the last update are rescanned.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+import os
+import pathlib
+import re
+import sqlite3
+import typing
+
+from nltk import Tree
+
+from abctk.obj.ID import RecordID
+import abctk.io.nltk_tree as nt
+
+INDEX_FILE_NAME = ".abctk-index.sqlite3"
+"""
+The default file name of the index, placed in the root folder of the treebank.
+"""
+
+_FORMAT_VERSION = 1
+
+_RE_ID_AT_END = re.compile(r"\(ID\s+([^\s()]+)\)\s*\)\s*\Z")
+"""
+Matches the ID node at the end of the root node.
+"""
+
+class TreeLocation(typing.NamedTuple):
+    """
+    The location of a tree in a treebank.
+    """
+    path: str
+    """
+    The path of the file, relative to the root folder of the treebank.
+    """
+    offset: int
+    length: int
+    line_num: int
+
+class IndexUpdateStats(typing.NamedTuple):
+    scanned: int
+    removed: int
+    unchanged: int
+
+def _iter_blocks_with_offsets(
+    h_file: typing.BinaryIO,
+) -> typing.Iterator[typing.Tuple[int, int, int, bytes]]:
+    """
+    Cut a binary file into tree blocks in the same way as :func:`nt.iter_tree_blocks`.
+
+    Yields
+    ------
+    offset: int
+    length: int
+    line_num: int
+    block: bytes
+    """
+    offset = 0
+    lines: typing.List[bytes] = []
+    block_offset = 0
+    block_line_num = 0
+
+    for line_num, line in enumerate(h_file, start = 1):
+        if line.startswith(b"("):
+            if lines:
+                yield block_offset, offset - block_offset, block_line_num, b"".join(lines)
+            lines = [line]
+            block_offset = offset
+            block_line_num = line_num
+        elif lines:
+            lines.append(line)
+        else:
+            # before the first tree
+            pass
+        offset += len(line)
+
+    if lines:
+        yield block_offset, offset - block_offset, block_line_num, b"".join(lines)
+
+def _extract_ID(block: str) -> typing.Optional[RecordID]:
+    """
+    Get the ID of a tree block, parsing the whole tree only if necessary.
+    """
+    if (match := _RE_ID_AT_END.search(block)):
+        return nt.parse_record_ID(match.group(1))
+
+    try:
+        tree = nt.parse_tree_block(block)
+    except ValueError:
+        return None
+
+    if (
+        isinstance(tree, Tree)
+        and len(tree) >= 2
+        and isinstance(tree[-1], Tree)
+        and tree[-1].label() == "ID"
+        and len(tree[-1]) == 1
+        and isinstance(tree[-1][0], str)
+    ):
+        return nt.parse_record_ID(tree[-1][0])
+    else:
+        # no ID node
+        return None
+
+class PSDIndex:
+    """
+    A sidecar index of a treebank.
+
+    Parameters
+    ----------
+    folder
+        The root folder of the treebank.
+    index_path
+        The path to the index database.
+        Defaults to :data:`INDEX_FILE_NAME` in `folder`.
+    re_filter
+        See :func:`abctk.io.nltk_tree.find_psd_files`.
+
+    Examples
+    --------
+    >>> with PSDIndex("treebank") as index: # doctest: +SKIP
+    ...     index.update()
+    ...     tree = index.get_tree("1_misc_KNB;Keitai_001;1-1-1-01;JP")
+    """
+
+    folder: pathlib.Path
+    index_path: pathlib.Path
+    re_filter: typing.Union[str, typing.Pattern]
+
+    def __init__(
+        self,
+        folder: typing.Union[str, pathlib.Path],
+        index_path: typing.Union[str, pathlib.Path, None] = None,
+        re_filter: typing.Union[str, typing.Pattern] = r".*\.psd$",
+    ):
+        self.folder = pathlib.Path(folder)
+        self.index_path = (
+            pathlib.Path(index_path) if index_path
+            else self.folder / INDEX_FILE_NAME
+        )
+        self.re_filter = re_filter
+
+        self._conn = sqlite3.connect(str(self.index_path))
+        self._init_db()
+
+    def _init_db(self) -> None:
+        conn = self._conn
+        with conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != _FORMAT_VERSION:
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DROP TABLE IF EXISTS trees")
+                conn.execute(f"PRAGMA user_version = {_FORMAT_VERSION}")
+
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER"
+                ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trees ("
+                "ID TEXT, path TEXT, offset INTEGER, length INTEGER, line_num INTEGER"
+                ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS trees_ID ON trees (ID)")
+            conn.execute("CREATE INDEX IF NOT EXISTS trees_path ON trees (path)")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "PSDIndex":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM trees").fetchone()[0]
+
+    def _scan_file(self, path: str, stat: os.stat_result) -> int:
+        """
+        (Re)index the trees of a file.
+
+        Returns
+        -------
+        count
+            The number of indexed trees.
+        """
+        records = []
+        with open(self.folder / path, "rb") as h_file:
+            for offset, length, line_num, block in _iter_blocks_with_offsets(h_file):
+                ID = _extract_ID(block.decode("utf-8"))
+                if ID is None:
+                    logger.warning(
+                        f"The tree at {path}:{line_num} has no ID and is not indexed"
+                    )
+                else:
+                    records.append((str(ID), path, offset, length, line_num))
+
+        with self._conn as conn:
+            conn.execute("DELETE FROM trees WHERE path = ?", (path, ))
+            conn.executemany("INSERT INTO trees VALUES (?, ?, ?, ?, ?)", records)
+            conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns),
+            )
+        return len(records)
+
+    def update(self, force: bool = False) -> IndexUpdateStats:
+        """
+        Bring the index up to date with the treebank.
+
+        Parameters
+        ----------
+        force
+            If True, rescan all the files.
+        """
+        paths = nt.find_psd_files(self.folder, self.re_filter)
+        indexed = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns
+            in self._conn.execute("SELECT path, size, mtime_ns FROM files")
+        }
+
+        scanned = 0
+        unchanged = 0
+        for path in paths:
+            stat = os.stat(self.folder / path)
+            if not force and indexed.get(path) == (stat.st_size, stat.st_mtime_ns):
+                unchanged += 1
+            else:
+                count = self._scan_file(path, stat)
+                logger.info(f"{count:,} tree(s) in {path} are indexed")
+                scanned += 1
+
+        removed = indexed.keys() - set(paths)
+        if removed:
+            with self._conn as conn:
+                conn.executemany(
+                    "DELETE FROM trees WHERE path = ?",
+                    ((path, ) for path in removed),
+                )
+                conn.executemany(
+                    "DELETE FROM files WHERE path = ?",
+                    ((path, ) for path in removed),
+                )
+
+        return IndexUpdateStats(
+            scanned = scanned,
+            removed = len(removed),
+            unchanged = unchanged,
+        )
+
+    def locate(
+        self,
+        ID: typing.Union[RecordID, str],
+    ) -> typing.Optional[TreeLocation]:
+        """
+        Find the location of a tree.
+        If more than one tree has the ID, the first one in the treebank is taken.
+        """
+        if isinstance(ID, str):
+            ID = nt.parse_record_ID(ID)
+
+        row = self._conn.execute(
+            "SELECT path, offset, length, line_num FROM trees WHERE ID = ? "
+            "ORDER BY path, offset LIMIT 1",
+            (str(ID), ),
+        ).fetchone()
+
+        return TreeLocation(*row) if row else None
+
+    def get_raw(
+        self,
+        ID: typing.Union[RecordID, str],
+    ) -> typing.Optional[str]:
+        """
+        Get the bracketed text of a tree as it is in the file.
+        """
+        loc = self.locate(ID)
+        if loc is None:
+            return None
+
+        with open(self.folder / loc.path, "rb") as h_file:
+            h_file.seek(loc.offset)
+            return h_file.read(loc.length).decode("utf-8")
+
+    def get_tree(
+        self,
+        ID: typing.Union[RecordID, str],
+        parse_labels: bool = True,
+    ) -> typing.Optional[Tree]:
+        """
+        Get a tree without its ID node.
+
+        Parameters
+        ----------
+        ID
+        parse_labels
+            If True, labels are parsed as ABC categories
+            as in :func:`abctk.io.nltk_tree.load_ABC_psd`.
+
+        Returns
+        -------
+        tree
+            None if the tree is not found.
+
+        Raises
+        ------
+        ValueError
+            If the brackets of the tree are ill-formed.
+        """
+        block = self.get_raw(ID)
+        if block is None:
+            return None
+
+        ID_found, tree = nt.split_ID_from_Tree(nt.parse_tree_block(block))
+        if parse_labels:
+            nt.parse_all_labels_ABC(tree, ID_found)
+        return tree
@@ -22,6 +22,7 @@ import simplejson as json
 from nltk import Tree
 
 from abctk import ABCTException
+import abctk.cat_cache as cc
 import abctk.obj.ABCCat as abcc
 from abctk.obj.Keyaki import Keyaki_ID
 
@@ -161,7 +162,7 @@ class Instance:
                     else:
                         raise TypeError
 
-                    pointer_cat_parsed = abcc.ABCCat.p(label.cat).pprint(abcc.ABCCatReprMode.DEPCCG)
+                    pointer_cat_parsed = cc.pprint_cat(label.cat, abcc.ABCCatReprMode.DEPCCG)
                     len_children = len(pointer)
 
                     if label.feats.get("deriv", "") == "leave":
@@ -184,13 +185,15 @@ class Instance:
                             only_child_label = only_child.label()
 
                             if isinstance(only_child_label, abcc.Annot):
-                                only_child_cat_parsed = abcc.ABCCat.p(
-                                    only_child_label.cat
-                                ).pprint(abcc.ABCCatReprMode.DEPCCG)
+                                only_child_cat_parsed = cc.pprint_cat(
+                                    only_child_label.cat,
+                                    abcc.ABCCatReprMode.DEPCCG,
+                                )
                             else:
-                                only_child_cat_parsed = abcc.ABCCat.p(
-                                    abcc.Annot.parse(only_child.label()).cat
-                                ).pprint(abcc.ABCCatReprMode.DEPCCG)
+                                only_child_cat_parsed = cc.pprint_cat(
+                                    abcc.Annot.parse(only_child.label()).cat,
+                                    abcc.ABCCatReprMode.DEPCCG,
+                                )
 
                             list_unary.append(
                                 (pointer_cat_parsed, only_child_cat_parsed)
@@ -209,23 +212,27 @@ class Instance:
 
                         child_1_label = child_1.label()
                         if isinstance(child_1_label, abcc.Annot):
-                            child_1_cat_converted = abcc.ABCCat.p(
-                                child_1_label.cat
-                            ).pprint(abcc.ABCCatReprMode.DEPCCG)
+                            child_1_cat_converted = cc.pprint_cat(
+                                child_1_label.cat,
+                                abcc.ABCCatReprMode.DEPCCG,
+                            )
                         else:
-                            child_1_cat_converted = abcc.ABCCat.p(
-                                abcc.Annot.parse(child_1.label()).cat
-                            ).pprint(abcc.ABCCatReprMode.DEPCCG)
+                            child_1_cat_converted = cc.pprint_cat(
+                                abcc.Annot.parse(child_1.label()).cat,
+                                abcc.ABCCatReprMode.DEPCCG,
+                            )
 
                         child_2_label = child_2.label()
                         if isinstance(child_2_label, abcc.Annot):
-                            child_2_cat_converted = abcc.ABCCat.p(
-                                child_2_label.cat
-                            ).pprint(abcc.ABCCatReprMode.DEPCCG)
+                            child_2_cat_converted = cc.pprint_cat(
+                                child_2_label.cat,
+                                abcc.ABCCatReprMode.DEPCCG,
+                            )
                         else:
-                            child_2_cat_converted = abcc.ABCCat.p(
-                                abcc.Annot.parse(child_2.label()).cat
-                            ).pprint(abcc.ABCCatReprMode.DEPCCG)
+                            child_2_cat_converted = cc.pprint_cat(
+                                abcc.Annot.parse(child_2.label()).cat,
+                                abcc.ABCCatReprMode.DEPCCG,
+                            )
 
                         list_binary_seen.append(
                             (child_1_cat_converted, child_2_cat_converted)
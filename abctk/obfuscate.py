@@ -1,3 +1,7 @@
+import concurrent.futures as cf
+import functools
+import os
+import pathlib
 import re
 import typing
 import logging
@@ -6,8 +10,20 @@ logger = logging.getLogger(__name__)
 
 from nltk.tree import Tree
 
+from abctk import ABCTException
+from abctk.obj.Keyaki import Keyaki_ID
+import abctk.io.nltk_tree as nt
+from abctk.transform_ABC.visitor import rewrite_tree
+
 X = typing.TypeVar("X", Tree, str,)
 
+_OBFUSCATED_CHAR = "⛔"
+
+_UNOBFUSCATED_PREFIXES = ("*", "__")
+"""
+Leaves starting with these (empty categories) are not obfuscated.
+"""
+
 def obfuscate_tree(
     subtree: X, 
     ID: str = "<UNKNOWN>"
@@ -15,19 +31,49 @@ def obfuscate_tree(
     """
     Replace characters in a given tree with ⛔.
     """
-    if isinstance(subtree, Tree):
-        return Tree(
-            node = subtree.label(),
-            children = list(obfuscate_tree(child) for child in subtree)
-        )
-    elif isinstance(subtree, str) and not (
-        subtree.startswith("*")
-        or subtree.startswith("__")
+    return rewrite_tree(subtree, leaf = _obfuscate_word)
+
+def _obfuscate_word(word):
+    if isinstance(word, str) and not (
+        word.startswith(_UNOBFUSCATED_PREFIXES)
     ):
-        return "⛔" * len(subtree)
+        return _OBFUSCATED_CHAR * len(word)
     else:
         # do nothing
-        return subtree
+        return word
+
+def obfuscate_tree_in_place(
+    tree: X, 
+    ID: str = "<UNKNOWN>"
+) -> X:
+    """
+    Replace characters in a given tree with ⛔ in situ.
+    Only the leaves are replaced; the nodes are kept as they are.
+    The result is the same as that of :func:`obfuscate_tree`.
+
+    Returns
+    -------
+    tree
+        The given tree,
+        or the obfuscated string if a bare string is given.
+    """
+    if not isinstance(tree, Tree):
+        return obfuscate_tree(tree, ID)
+
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        for i, child in enumerate(node):
+            if isinstance(child, Tree):
+                stack.append(child)
+            elif isinstance(child, str) and not (
+                child.startswith(_UNOBFUSCATED_PREFIXES)
+            ):
+                node[i] = _OBFUSCATED_CHAR * len(child)
+            else:
+                # do nothing
+                pass
+    return tree
 
 def decrypt_tree(
     subtree: X,
@@ -38,6 +84,10 @@ def decrypt_tree(
     """
     Decrypt a given tree with the original text.
 
+    The given tree is not modified.
+    Subtrees without obfuscated characters are shared with the result
+    rather than copied.
+
     Parameters
     ----------
     subtree
@@ -52,40 +102,24 @@ def decrypt_tree(
     ----------
     UnmatchingDecryptionException
     """
-    try:
-        if isinstance(subtree, Tree):
-            new_children = []
-            for child in subtree:
-                new_child, source_pos = decrypt_tree(
-                    child,
-                    source,
-                    source_pos,
-                    ID,
-                )
-                new_children.append(new_child)
-            # === END FOR child ===
-
-            return Tree(
-                node = subtree.label(),
-                children = new_children
-            ), source_pos
-        elif isinstance(subtree, str):
-            word_new = ""
-            for char in subtree:
-                if char == "⛔":
-                    word_new += source[source_pos]
-                    source_pos += 1
-                else:
-                    word_new += char
-                # === END IF ===
-            # === END FOR char ===
-            
-            return word_new, source_pos
-        else:
-            # do nothing
-            return subtree, source_pos
-        # === END IF ===
-    except IndexError:
+    if isinstance(subtree, Tree):
+        return _decrypt_node(subtree, source, source_pos, ID)
+    elif isinstance(subtree, str) and _OBFUSCATED_CHAR in subtree:
+        return _decrypt_word(subtree, source, source_pos, ID)
+    else:
+        # do nothing
+        return subtree, source_pos
+    # === END IF ===
+
+def _decrypt_word(
+    word: str,
+    source: str,
+    source_pos: int,
+    ID: str,
+) -> typing.Tuple[str, int]:
+    num_chars = word.count(_OBFUSCATED_CHAR)
+    source_end = source_pos + num_chars
+    if source_end > len(source):
         logger.error(
             msg = (
                 f"The lexical nodes of Tree {ID} is smaller than the original text. "
@@ -93,8 +127,286 @@ def decrypt_tree(
             ),
             stack_info = False,
         )
-        return subtree, source_pos
-    except Exception as e:
-        raise
-    # == END TRY ===
-# === END ===
\ No newline at end of file
+        return word, len(source)
+    elif num_chars == len(word):
+        return source[source_pos:source_end], source_end
+    else:
+        # linear in the length of the word
+        pieces = word.split(_OBFUSCATED_CHAR)
+        word_new = [pieces[0]]
+        for char, piece in zip(source[source_pos:source_end], pieces[1:]):
+            word_new.append(char)
+            word_new.append(piece)
+        return "".join(word_new), source_end
+
+def _decrypt_node(
+    node: Tree,
+    source: str,
+    source_pos: int,
+    ID: str,
+) -> typing.Tuple[Tree, int]:
+    # NOTE: a specialization of abctk.transform_ABC.visitor.rewrite_tree
+    # in the sharing mode, with the words inlined
+
+    # the current node, its remaining children, the new children so far
+    # and whether any of them is changed
+    children = iter(node)
+    children_new: typing.List[typing.Any] = []
+    is_changed = False
+    # those of the ancestors
+    stack: typing.List[tuple] = []
+    while True:
+        for child in children:
+            if isinstance(child, Tree):
+                stack.append((node, children, children_new, is_changed))
+                node, children, children_new, is_changed = child, iter(child), [], False
+                break
+            elif isinstance(child, str) and _OBFUSCATED_CHAR in child:
+                child_new, source_pos = _decrypt_word(child, source, source_pos, ID)
+                if child_new is not child:
+                    is_changed = True
+                children_new.append(child_new)
+            else:
+                children_new.append(child)
+        else:
+            node_new = Tree(node.label(), children_new) if is_changed else node
+            if not stack:
+                return node_new, source_pos
+
+            node_old = node
+            node, children, children_new, is_changed = stack.pop()
+            if node_new is not node_old:
+                is_changed = True
+            children_new.append(node_new)
+    # === END WHILE ===
+
+def parse_decryption_source(
+    stream: typing.Iterable[str],
+) -> typing.Iterator[typing.Tuple[Keyaki_ID, str]]:
+    """
+    Read pairs of a tree ID and the original text of the tree
+    from lines of the TSV format (`<ID>\\t<text>`).
+    """
+    for line in stream:
+        line_broken = line.strip().split("\t")
+        yield (
+            Keyaki_ID.from_string(line_broken[0]) or Keyaki_ID.new(), 
+            line_broken[1]
+        )
+
+class DecryptionSourceWindow:
+    """
+    Look up the original texts of trees in a stream of them,
+    which is read ahead only as far as needed.
+
+    When the trees come in the same order as the texts,
+    only a few texts are kept in memory at a time.
+    The texts read so far are kept up to `window`,
+    beyond which the oldest one is discarded.
+    A text can be looked up again, e.g. for another tree of the same ID,
+    until it is discarded.
+
+    Parameters
+    ----------
+    source
+        Pairs of a tree ID and the original text.
+        See :func:`parse_decryption_source`.
+        Of the texts of the same ID, the first one is taken.
+    window
+        The maximum number of texts kept at a time.
+        Unbounded if 0 or less,
+        in which case the order of the texts does not matter.
+    """
+
+    def __init__(
+        self,
+        source: typing.Iterable[typing.Tuple[typing.Any, str]],
+        window: int = 100000,
+    ):
+        self._source = iter(source)
+        self.window = window
+        self._buffer: typing.Dict[typing.Any, str] = {}
+        self._used: typing.Set[typing.Any] = set()
+
+    def _keep(self, ID, text: str) -> None:
+        buffer = self._buffer
+        buffer.setdefault(ID, text)
+
+        if 0 < self.window < len(buffer):
+            ID_discarded = next(iter(buffer))
+            del buffer[ID_discarded]
+
+            if ID_discarded in self._used:
+                self._used.remove(ID_discarded)
+            else:
+                logger.warning(
+                    f"The original text of Tree {ID_discarded} is discarded "
+                    "without being used. "
+                    "The trees and the texts may be in different orders."
+                )
+
+    def get(self, ID) -> str:
+        """
+        Look up the original text of the tree `ID`.
+
+        Raises
+        ------
+        KeyError
+            If the text is not found within the window.
+        """
+        buffer = self._buffer
+        if ID in buffer:
+            self._used.add(ID)
+            return buffer[ID]
+
+        window = self.window
+        num_read = 0
+        for ID_source, text in self._source:
+            self._keep(ID_source, text)
+            if ID_source == ID:
+                self._used.add(ID)
+                return buffer[ID]
+
+            # do not go through the rest for a missing text
+            num_read += 1
+            if 0 < window <= num_read:
+                break
+
+        raise KeyError(ID)
+
+# ================
+# Obfuscation of treebank folders
+# ================
+class SharedOutputFileException(ABCTException):
+    """
+    The exception class for trees of the same name (i.e. the same output file)
+    found in different source files by :func:`obfuscate_psd_folder`.
+    """
+    pass
+
+def _obfuscate_psd_file(
+    source: str,
+    path: str,
+    dest: str,
+    filter: str,
+    skip_ill_trees: bool,
+) -> typing.Tuple[str, typing.Set[str], int]:
+    """
+    Obfuscate the trees of a file and write them out.
+    Run in worker processes of :func:`obfuscate_psd_folder`.
+
+    Returns
+    -------
+    path
+    names
+        The names of the trees, which decide the output files.
+    count
+        The number of the trees.
+    """
+    matcher = re.compile(filter)
+    names: typing.Set[str] = set()
+    count = 0
+
+    with open(
+        os.path.join(source, path), "r", encoding = "utf-8"
+    ) as h_file, nt.PSDFolderWriter(dest, n_jobs = 1) as writer:
+        for tree_raw in nt.iter_trees_from_stream(
+            h_file,
+            name = path,
+            skip_ill_trees = skip_ill_trees,
+        ):
+            ID, tree = nt.split_ID_from_Tree(tree_raw)
+            nt.parse_all_labels_Keyaki_Annot(tree)
+            if matcher.search(ID.name):
+                obfuscate_tree_in_place(tree, ID)
+
+            writer.add(ID, tree)
+            names.add(ID.name)
+            count += 1
+
+    return path, names, count
+
+def obfuscate_psd_folder(
+    source: typing.Union[str, pathlib.Path],
+    dest: typing.Union[str, pathlib.Path],
+    filter: str = "closed",
+    re_filter: typing.Union[str, typing.Pattern] = r".*\.psd$",
+    skip_ill_trees: bool = True,
+    n_jobs: int = 1,
+) -> typing.Iterator[typing.Tuple[str, int]]:
+    """
+    Obfuscate a treebank folder file by file, each in a worker process.
+
+    The output is the same as that of
+    `abctk tweak treebank <SOURCE> obfus --filter <FILTER> write <DEST>`,
+    provided that no two source files have trees of the same name,
+    as is the case with the Keyaki and the ABC Treebank.
+    Otherwise, :class:`SharedOutputFileException` is raised
+    after the files are written.
+
+    Parameters
+    ----------
+    source
+        The treebank folder.
+    dest
+        The folder to write the obfuscated trees to.
+    filter
+        A regex that specifies the names of the trees to be obfuscated.
+    re_filter
+        A regex that specifies the files to be read.
+        See :func:`abctk.io.nltk_tree.find_psd_files`.
+    skip_ill_trees
+        If True, discard trees with ill-formed brackets and continue the process.
+    n_jobs
+        The number of worker processes.
+
+    Yields
+    ------
+    path
+        The path of each source file done, in no particular order.
+    count
+        The number of the trees of the file.
+    """
+    source = str(source)
+    dest = str(dest)
+    paths = nt.find_psd_files(source, re_filter)
+    func = functools.partial(
+        _obfuscate_psd_file,
+        source,
+        dest = dest,
+        filter = filter,
+        skip_ill_trees = skip_ill_trees,
+    )
+
+    names_written: typing.Dict[str, str] = {}
+    names_shared: typing.Set[str] = set()
+
+    def _check_names(path: str, names: typing.Set[str]) -> None:
+        for name in names:
+            path_prev = names_written.setdefault(name, path)
+            if path_prev != path:
+                logger.error(
+                    f"Trees of the name {name} are found "
+                    f"in both {path_prev} and {path}."
+                )
+                names_shared.add(name)
+
+    if n_jobs > 1:
+        with cf.ProcessPoolExecutor(max_workers = n_jobs) as executor:
+            logger.info(f"Multiprocessing pool created, number of processes: {n_jobs}")
+            futures = [executor.submit(func, path) for path in paths]
+            for future in cf.as_completed(futures):
+                path, names, count = future.result()
+                _check_names(path, names)
+                yield path, count
+    else:
+        for path in paths:
+            path, names, count = func(path)
+            _check_names(path, names)
+            yield path, count
+
+    if names_shared:
+        raise SharedOutputFileException(
+            f"The output files of the following names are overwritten: {sorted(names_shared)}. "
+            "Use `abctk tweak treebank` instead."
+        )
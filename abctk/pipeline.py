@@ -0,0 +1,222 @@
+"""
+Tree transforms of `abctk tweak` as a library.
+
+A :class:`TreePipeline` is built from the names of the subcommands of `abctk tweak`
+and runs them on trees without the CLI,
+so that a long-running process can transform many batches of trees
+without paying the import, the start-up and the loading of resources
+(e.g. the Janome dictionary, parsed categories) every time.
+
+Examples
+--------
+>>> from abctk.pipeline import TreePipeline
+>>> with TreePipeline( # doctest: +SKIP
+...     [
+...         "janome",
+...         ("filter-annots", {"instructions": "0*;+role"}),
+...         "min-nodes",
+...     ],
+...     n_jobs = 4,
+... ) as pipeline:
+...     for batch in batches:
+...         trees = pipeline.run(batch)
+"""
+
+import concurrent.futures as cf
+import inspect
+import logging
+import typing
+
+from nltk.tree import Tree
+
+from abctk import ABCTException
+import abctk.config as CONF
+from abctk.obj.ID import RecordID
+import abctk.transform_ABC.tree_ops as tree_ops
+from abctk.transform_ABC.tree_ops import OPS, TreeOp, TreeOpStage
+
+logger = logging.getLogger(__name__)
+
+CommandSpec = typing.Union[str, typing.Tuple[str, typing.Mapping[str, typing.Any]]]
+"""
+The name of a subcommand of `abctk tweak`,
+optionally paired with its arguments by the names of the parameters
+of the operation in :data:`abctk.transform_ABC.tree_ops.OPS`
+(e.g. `{"generous": True}` for `restore-trace`).
+Omitted arguments take their defaults.
+"""
+
+class InvalidPipelineException(ABCTException):
+    """
+    The exception class for pipelines with unknown commands or bad arguments.
+    """
+    pass
+
+def _make_op(
+    name: str,
+    skip_ill_trees: bool,
+    arguments: typing.Mapping[str, typing.Any],
+) -> TreeOp:
+    spec = OPS.get(name)
+    if spec is None:
+        # including those not runnable on single trees, e.g. `decrypt`
+        raise InvalidPipelineException(f"Unknown command: {name}")
+
+    try:
+        inspect.signature(spec.make).bind(skip_ill_trees, **arguments)
+    except TypeError as e:
+        raise InvalidPipelineException(
+            f"Bad arguments of the command {name}: {e}"
+        ) from e
+
+    return spec.make(skip_ill_trees, **arguments)
+
+def _init_pipeline_worker(
+    ops: typing.Sequence[TreeOp],
+    warm_ups: typing.Sequence[typing.Callable[[], typing.Any]],
+) -> None:
+    tree_ops.init_worker(ops)
+    for warm_up in warm_ups:
+        warm_up()
+
+class TreePipeline:
+    """
+    A sequence of subcommands of `abctk tweak`, run on each tree.
+
+    Commands run in this process modify the given trees in place
+    as on the CLI, except that the rebuilding ones
+    (`collapse-unary-nodes`, `restore-unary-nodes`, `bin-conj`)
+    make new trees unless given `{"mode": RebuildMode.IN_PLACE}`.
+    Pass copies of the trees to keep the originals.
+
+    Parameters
+    ----------
+    commands
+        The subcommands.
+        See :data:`CommandSpec` and :data:`abctk.transform_ABC.tree_ops.OPS`.
+    config
+        The configuration. Defaults to :data:`abctk.config.CONF_DEFAULT`.
+    skip_ill_trees
+        Whether to abandon the trees on which a command fails and continue.
+        Overrides `skip-ill-trees` in `config`.
+    n_jobs
+        The number of worker processes.
+        The workers are started at the first parallel run
+        and kept alive with their resources loaded until :meth:`close`.
+    chunk_size
+        The number of trees sent to a worker at a time.
+    progress
+        Show progress bars.
+
+    Raises
+    ------
+    InvalidPipelineException
+        If a command is unknown, not implemented, not runnable on single trees,
+        or given bad arguments.
+    """
+
+    def __init__(
+        self,
+        commands: typing.Iterable[CommandSpec],
+        config: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        skip_ill_trees: typing.Optional[bool] = None,
+        n_jobs: int = 1,
+        chunk_size: int = 64,
+        progress: bool = False,
+    ):
+        config = dict(config if config is not None else CONF.CONF_DEFAULT)
+        if skip_ill_trees is not None:
+            config["skip-ill-trees"] = skip_ill_trees
+
+        self.config = config
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._executor: typing.Optional[cf.ProcessPoolExecutor] = None
+
+        stage = TreeOpStage(iter(()), (), ())
+        names = []
+        for spec in commands:
+            name, arguments = (spec, {}) if isinstance(spec, str) else spec
+
+            stage = stage.appended(
+                _make_op(name, config["skip-ill-trees"], arguments),
+                OPS[name].desc,
+            )
+            names.append(name)
+
+        self.names: typing.Tuple[str, ...] = tuple(names)
+        self.ops: typing.Tuple[TreeOp, ...] = stage.ops
+        self.descs: typing.Tuple[str, ...] = stage.descs
+
+        self._warm_ups: typing.Tuple[typing.Callable[[], typing.Any], ...] = tuple(
+            warm_up
+            for warm_up in (OPS[name].warm_up for name in dict.fromkeys(names))
+            if warm_up is not None
+        )
+        for warm_up in self._warm_ups:
+            warm_up()
+
+    def run_tree(self, tree: Tree, ID: RecordID) -> typing.Optional[Tree]:
+        """
+        Run the commands on a single tree in this process.
+        Returns None if the tree is abandoned.
+        """
+        return tree_ops.apply_ops(self.ops, tree, ID)
+
+    def _get_executor(self) -> cf.ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = cf.ProcessPoolExecutor(
+                max_workers = self.n_jobs,
+                initializer = _init_pipeline_worker,
+                initargs = (self.ops, self._warm_ups),
+            )
+            logger.info(f"Worker pool started, number of processes: {self.n_jobs}")
+        return self._executor
+
+    def stream(
+        self,
+        trees: typing.Iterable[typing.Tuple[RecordID, Tree]],
+    ) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
+        """
+        Run the commands on trees lazily.
+        Trees are taken from `trees` as the results are requested,
+        and the results are yielded in the input order without the abandoned ones.
+
+        Trees are modified in situ if run in this process (see :class:`TreePipeline`).
+        """
+        return iter(
+            TreeOpStage(
+                trees,
+                self.ops, self.descs,
+                n_jobs = self.n_jobs,
+                chunk_size = self.chunk_size,
+                progress = self.progress,
+                executor = self._get_executor() if self.n_jobs > 1 else None,
+            )
+        )
+
+    def run(
+        self,
+        trees: typing.Iterable[typing.Tuple[RecordID, Tree]],
+    ) -> typing.List[typing.Tuple[RecordID, Tree]]:
+        """
+        Run the commands on a batch of trees.
+        See :meth:`stream`.
+        """
+        return list(self.stream(trees))
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        The pipeline can still be used, starting new workers if needed.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait = True)
+            self._executor = None
+
+    def __enter__(self) -> "TreePipeline":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,432 @@
+"""
+Per-stage profiling of CLI pipelines.
+
+A stage is a loader, an operation on trees or a writer of a command.
+Most stages are lazy and pull trees from one another,
+so the time of a stage is measured exclusively:
+the time spent in the stages that it pulls trees from is not counted as its own.
+For each stage, the following are recorded:
+
+* wall time and CPU time
+* the number of trees that come in and go out
+* the number of trees whose exceptions are skipped
+* the peak RSS of the process observed while the stage is running
+
+The report also has the hit rates of the memo tables of :mod:`abctk.cat_cache`.
+
+Optionally, each stage gets its own :mod:`cProfile` profile
+and the peak of the memory traced by :mod:`tracemalloc`.
+
+The profiler is process-wide and disabled by default.
+The global `--profile` option of `abctk` enables it
+and writes the report as JSON when the command ends.
+All the functions in this module do (almost) nothing while it is disabled.
+"""
+
+import contextlib
+import cProfile
+import json
+import logging
+import pathlib
+import re
+import sys
+import time
+import tracemalloc
+import typing
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+X = typing.TypeVar("X")
+Y = typing.TypeVar("Y")
+
+_RSS_SAMPLE_INTERVAL = 0.05
+"""
+The minimum interval (in seconds) between two samplings of the RSS.
+"""
+
+class StageStats:
+    """
+    The measurements of a stage.
+    """
+
+    __slots__ = (
+        "name", "wall", "cpu",
+        "trees_in", "trees_out", "skipped",
+        "rss_peak", "traced_peak", "profile",
+    )
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile: typing.Optional[cProfile.Profile] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.trees_in = 0
+        self.trees_out = 0
+        self.skipped = 0
+        self.rss_peak = 0
+        self.traced_peak: typing.Optional[int] = None
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        res = {
+            "name": self.name,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "trees_in": self.trees_in,
+            "trees_out": self.trees_out,
+            "skipped": self.skipped,
+            "rss_peak": self.rss_peak,
+        }
+        if self.traced_peak is not None:
+            res["traced_peak"] = self.traced_peak
+        return res
+
+    def merge(self, other: typing.Dict[str, typing.Any]) -> None:
+        """
+        Add the measurements of the same stage taken in another process.
+        """
+        self.wall += other["wall"]
+        self.cpu += other["cpu"]
+        self.trees_in += other["trees_in"]
+        self.trees_out += other["trees_out"]
+        self.skipped += other["skipped"]
+        self.rss_peak = max(self.rss_peak, other["rss_peak"])
+        if "traced_peak" in other:
+            self.traced_peak = max(self.traced_peak or 0, other["traced_peak"])
+
+class _Frame:
+    __slots__ = ("stats", "wall_start", "cpu_start", "wall_children", "cpu_children")
+
+    def __init__(self, stats: StageStats, wall_start: float, cpu_start: float):
+        self.stats = stats
+        self.wall_start = wall_start
+        self.cpu_start = cpu_start
+        self.wall_children = 0.0
+        self.cpu_children = 0.0
+
+class Profiler:
+    """
+    A collection of the measurements of stages.
+
+    Parameters
+    ----------
+    path
+        The path of the JSON report.
+        If None, nothing is written (e.g. in worker processes,
+        whose measurements are sent back with their results).
+    use_cprofile
+        Profile each stage with :mod:`cProfile`.
+        The profiles are dumped next to the report,
+        named `<report>.<num>-<stage>.prof`.
+    use_tracemalloc
+        Record the peak of the memory traced by :mod:`tracemalloc` in each stage.
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, pathlib.Path, None] = None,
+        use_cprofile: bool = False,
+        use_tracemalloc: bool = False,
+    ):
+        self.path = pathlib.Path(path) if path is not None else None
+        self.use_cprofile = use_cprofile
+        self.use_tracemalloc = use_tracemalloc
+
+        self.stages: typing.Dict[str, StageStats] = {}
+        self._stack: typing.List[_Frame] = []
+        self._process = psutil.Process()
+        self._rss_sampled_at = 0.0
+        self.rss_peak = 0
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+        if use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def new_stage(self, name: str) -> StageStats:
+        """
+        Register a stage.
+        Stages of the same name are numbered from the second one on.
+        """
+        name_unique = name
+        num = 1
+        while name_unique in self.stages:
+            num += 1
+            name_unique = f"{name} #{num}"
+
+        stats = StageStats(name_unique)
+        if self.use_cprofile:
+            stats.profile = cProfile.Profile()
+        self.stages[name_unique] = stats
+        return stats
+
+    def get_stage(self, name: str) -> StageStats:
+        """
+        Get a registered stage, or register it if not yet.
+        """
+        try:
+            return self.stages[name]
+        except KeyError:
+            return self.new_stage(name)
+
+    @property
+    def current(self) -> typing.Optional[StageStats]:
+        return self._stack[-1].stats if self._stack else None
+
+    def _sample_memory(self, stats: StageStats, force: bool = False) -> None:
+        now = time.perf_counter()
+        if force or now - self._rss_sampled_at >= _RSS_SAMPLE_INTERVAL:
+            self._rss_sampled_at = now
+            rss = self._process.memory_info().rss
+            if rss > stats.rss_peak:
+                stats.rss_peak = rss
+            if rss > self.rss_peak:
+                self.rss_peak = rss
+
+    def _suspend(self, stats: StageStats) -> None:
+        if stats.profile is not None:
+            stats.profile.disable()
+        if self.use_tracemalloc:
+            _, peak = tracemalloc.get_traced_memory()
+            stats.traced_peak = max(stats.traced_peak or 0, peak)
+            tracemalloc.reset_peak()
+
+    def _resume(self, stats: StageStats) -> None:
+        if stats.profile is not None:
+            stats.profile.enable()
+
+    def enter(self, stats: StageStats) -> None:
+        """
+        Start (or resume) measuring `stats`, suspending the current stage.
+        Must be paired with :meth:`leave`.
+        """
+        stack = self._stack
+        if stack:
+            self._suspend(stack[-1].stats)
+        elif self.use_tracemalloc:
+            tracemalloc.reset_peak()
+
+        stack.append(_Frame(stats, time.perf_counter(), time.process_time()))
+        self._resume(stats)
+
+    def leave(self, force_sample: bool = False) -> None:
+        """
+        Stop measuring the current stage and resume the one it was called from.
+        """
+        stack = self._stack
+        frame = stack.pop()
+        stats = frame.stats
+        self._suspend(stats)
+
+        wall = time.perf_counter() - frame.wall_start
+        cpu = time.process_time() - frame.cpu_start
+        stats.wall += wall - frame.wall_children
+        stats.cpu += cpu - frame.cpu_children
+        # at least once for every stage
+        self._sample_memory(stats, force = force_sample or not stats.rss_peak)
+
+        if stack:
+            parent = stack[-1]
+            parent.wall_children += wall
+            parent.cpu_children += cpu
+            self._resume(parent.stats)
+
+    def export(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Take out the measurements of the stages and start over.
+        Used to send measurements from worker processes.
+        """
+        res = {}
+        for name, stats in self.stages.items():
+            res[name] = stats.as_dict()
+            stats.reset()
+        return res
+
+    def merge(self, exported: typing.Dict[str, typing.Dict[str, typing.Any]]) -> None:
+        """
+        Add measurements exported by :meth:`export` of another profiler.
+        """
+        for name, record in exported.items():
+            self.get_stage(name).merge(record)
+
+    def report(self) -> typing.Dict[str, typing.Any]:
+        import abctk.cat_cache as cc
+
+        return {
+            "command": sys.argv,
+            "wall": time.perf_counter() - self._wall_start,
+            "cpu": time.process_time() - self._cpu_start,
+            "rss_peak": max(self.rss_peak, self._process.memory_info().rss),
+            "stages": [stats.as_dict() for stats in self.stages.values()],
+            # of this process only
+            "memos": {
+                name: dict(info._asdict(), hit_rate = info.hit_rate)
+                for name, info in cc.get_stats().items()
+            },
+        }
+
+    def dump(self) -> None:
+        """
+        Write the report and the profiles of the stages.
+        """
+        if self.path is None:
+            return
+
+        with open(self.path, "w") as h_report:
+            json.dump(self.report(), h_report, indent = 2, ensure_ascii = False)
+        logger.info(f"Profile report written to {self.path}")
+
+        for num, stats in enumerate(self.stages.values(), start = 1):
+            if stats.profile is not None:
+                slug = re.sub(r"[^\w.-]+", "_", stats.name).strip("_")
+                path_prof = self.path.with_name(
+                    f"{self.path.stem}.{num:02d}-{slug}.prof"
+                )
+                stats.profile.dump_stats(str(path_prof))
+                logger.info(f"Profile of stage {stats.name} written to {path_prof}")
+
+# ================
+# The process-wide profiler
+# ================
+_PROFILER: typing.Optional[Profiler] = None
+
+def activate(profiler: typing.Optional[Profiler]) -> None:
+    """
+    Set the process-wide profiler. Pass None to disable profiling.
+    """
+    global _PROFILER
+    _PROFILER = profiler
+
+def get_profiler() -> typing.Optional[Profiler]:
+    return _PROFILER
+
+def close() -> None:
+    """
+    Disable the profiler and write its report.
+    """
+    profiler = _PROFILER
+    activate(None)
+    if profiler is not None:
+        profiler.dump()
+
+@contextlib.contextmanager
+def stage(name: str) -> typing.Iterator[typing.Optional[StageStats]]:
+    """
+    Measure a block as a stage.
+    Yields the stats of the stage, whose tree counts can be set by the block,
+    or None if profiling is disabled.
+    """
+    profiler = _PROFILER
+    if profiler is None:
+        yield None
+        return
+
+    stats = profiler.new_stage(name)
+    profiler.enter(stats)
+    try:
+        yield stats
+    finally:
+        profiler.leave(force_sample = True)
+
+def count_skipped() -> None:
+    """
+    Count a tree whose exception is skipped in the current stage.
+    """
+    profiler = _PROFILER
+    if profiler is not None and profiler._stack:
+        profiler._stack[-1].stats.skipped += 1
+
+def _iter_counted(stats: StageStats, source: typing.Iterable[X]) -> typing.Iterator[X]:
+    for item in source:
+        stats.trees_in += 1
+        yield item
+
+def _iter_measured(
+    profiler: Profiler,
+    stats: StageStats,
+    iterable: typing.Iterable[X],
+) -> typing.Iterator[X]:
+    iterator: typing.Optional[typing.Iterator[X]] = None
+    while True:
+        profiler.enter(stats)
+        try:
+            if iterator is None:
+                iterator = iter(iterable)
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            profiler.leave()
+
+        stats.trees_out += 1
+        yield item
+
+def wrap_iter(name: str, iterable: typing.Iterable[X]) -> typing.Iterable[X]:
+    """
+    Measure the production of the items of `iterable` (e.g. a loader) as a stage.
+    `iterable` is returned as it is if profiling is disabled.
+    """
+    profiler = _PROFILER
+    if profiler is None:
+        return iterable
+
+    return _iter_measured(profiler, profiler.new_stage(name), iterable)
+
+def wrap_stage(
+    name: str,
+    stage: typing.Callable[[typing.Iterable[X]], typing.Iterable[Y]],
+) -> typing.Callable[[typing.Iterable[X]], typing.Iterable[Y]]:
+    """
+    Measure a lazy stage that takes a stream and returns another one.
+    `stage` is returned as it is if profiling is disabled.
+    """
+    profiler = _PROFILER
+    if profiler is None:
+        return stage
+
+    stats = profiler.new_stage(name)
+
+    def _stage(source: typing.Iterable[X]) -> typing.Iterator[Y]:
+        return _iter_measured(
+            profiler, stats,
+            stage(_iter_counted(stats, source)),
+        )
+
+    return _stage
+
+class _MeasuredOp:
+    def __init__(self, profiler: Profiler, stats: StageStats, op: typing.Callable):
+        self.profiler = profiler
+        self.stats = stats
+        self.op = op
+
+    def __call__(self, tree, ID):
+        stats = self.stats
+        stats.trees_in += 1
+        self.profiler.enter(stats)
+        try:
+            res = self.op(tree, ID)
+        finally:
+            self.profiler.leave()
+        if res is not None:
+            stats.trees_out += 1
+        return res
+
+def wrap_op(
+    name: str,
+    op: typing.Callable[[X, typing.Any], typing.Optional[X]],
+) -> typing.Callable[[X, typing.Any], typing.Optional[X]]:
+    """
+    Measure an operation on single trees as a stage.
+    The operation returns None if the tree is abandoned.
+    `op` is returned as it is if profiling is disabled.
+    """
+    profiler = _PROFILER
+    if profiler is None:
+        return op
+
+    return _MeasuredOp(profiler, profiler.get_stage(name), op)
@@ -1,10 +1,10 @@
-import itertools
 import re
 import typing
 
 from nltk.tree import Tree 
 
 import abctk.obj.ABCCat as abcc
+from abctk.transform_ABC.visitor import RebuildMode, rebuild_node, rewrite_tree
 
 _re_P_PU = re.compile(r"^(P|PU|CONJ)$")
 
@@ -78,10 +78,7 @@ class _ConjunctSpan(typing.NamedTuple):
         pt: typing.Optional[Tree] = next(children, None)
         pt2: typing.Optional[Tree] = None
 
-        if pt is None:
-            # end of iteration
-            return
-        else:
+        while pt is not None:
             pt_label: abcc.Annot[abcc.ABCCat] = pt.label()
             pt_label_cat = pt_label.cat
 
@@ -94,7 +91,7 @@ class _ConjunctSpan(typing.NamedTuple):
                     conj = None,
                     p = pt,
                 )
-                yield from cls.chop_children(children)
+                pt = next(children, None)
             elif (pt2 := next(children, None)):
                 pt2_label: abcc.Annot[abcc.ABCCat] = pt2.label()
                 pt2_label_cat = pt2_label.cat
@@ -108,7 +105,7 @@ class _ConjunctSpan(typing.NamedTuple):
                         conj = pt,
                         p = pt2,
                     )
-                    yield from cls.chop_children(children)
+                    pt = next(children, None)
                 else:
                     # pt is an orphan conjucnt
                     yield cls(
@@ -118,18 +115,15 @@ class _ConjunctSpan(typing.NamedTuple):
 
                     # The status of pt2 is underdetermined.
                     # It should be pushed back.
-                    yield from cls.chop_children(
-                        itertools.chain(
-                            (pt2, ), 
-                            children
-                        )
-                    )
+                    pt = pt2
             else:
                 # pt1 is the last child and a unary conjunct
                 yield cls(
                     conj = pt,
                     p = None,
                 )
+                return
+        # === END WHILE ===
 
 def __chaining_conjuncts(
     given_label: abcc.Annot[abcc.ABCCat],
@@ -139,7 +133,6 @@ def __chaining_conjuncts(
             Tree,
         ],
     ],
-    is_root: bool = True,
 ) -> Tree:
     root_cat = given_label.cat
     if len(conjuncts) == 1:
@@ -147,61 +140,79 @@ def __chaining_conjuncts(
         conjunct_leftmost = conjuncts[0]
         return conjunct_leftmost(root_cat)
     else:
-        conjunct_leftmost, conjunct_remainder = conjuncts[0], conjuncts[1:]
-
-        if is_root:
-            tree_label_feats = {
-                **{
-                    k: v for k, v in given_label.feats.items() 
-                    if not (k == "deriv" and v == "conj")
-                },
-                "trace.binconj": "root"
-            }
-        else:
-            tree_label_feats = {
-                "trace.binconj": "intermediate"
-            }
-
-        tree_label: abcc.Annot[abcc.ABCCat] = abcc.Annot(
-            cat = root_cat,
-            feats = tree_label_feats,
-            pprinter_cat = abcc.ABCCat.pprint,
-        )
+        conjuncts_made = [
+            conjunct(
+                root_cat.adj_l() # <root_cat/root_cat>
+            )
+            for conjunct in conjuncts[:-1]
+        ]
+
+        # chain the conjuncts from the rightmost one
+        tree = conjuncts[-1](root_cat)
+        for i in reversed(range(len(conjuncts_made))):
+            if i == 0:
+                tree_label_feats = {
+                    **{
+                        k: v for k, v in given_label.feats.items() 
+                        if not (k == "deriv" and v == "conj")
+                    },
+                    "trace.binconj": "root"
+                }
+            else:
+                tree_label_feats = {
+                    "trace.binconj": "intermediate"
+                }
+
+            tree_label: abcc.Annot[abcc.ABCCat] = abcc.Annot(
+                cat = root_cat,
+                feats = tree_label_feats,
+                pprinter_cat = abcc.ABCCat.pprint,
+            )
 
-        return Tree(
-            node = tree_label,
-            children = [
-                conjunct_leftmost(
-                    root_cat.adj_l() # <root_cat/root_cat>
-                ), 
-                __chaining_conjuncts(
-                    given_label,
-                    conjunct_remainder,
-                    is_root = False,
-                ),
-            ]
-        )
+            tree = Tree(
+                node = tree_label,
+                children = [conjuncts_made[i], tree]
+            )
+        # === END FOR i ===
+
+        return tree
 
 def binarize_conj_tree(
     tree: Tree, 
-    ID: str = "<UNKNOWN>"
+    ID: str = "<UNKNOWN>",
+    mode: RebuildMode = RebuildMode.COPY,
 ) -> Tree:
     """
     Given a tree, binarize recursively its parts that is marked as a conjunction phrase.
 
+    Parameters
+    ----------
+    tree
+    ID
+    mode
+        How the nodes of the result are made. See :class:`abctk.transform_ABC.visitor.RebuildMode`.
+        The binarized conjunctions are always made anew.
+        With :attr:`~abctk.transform_ABC.visitor.RebuildMode.SHARE`,
+        the subtrees without conjunctions are shared with the given tree,
+        and only the nodes above the conjunctions are copied.
+        With :attr:`~abctk.transform_ABC.visitor.RebuildMode.IN_PLACE`,
+        the given tree is tampered.
+
     Notes
     -----
-    This method is safe in the sense that it always creates a new Tree instance.
+    With the default mode, this method is safe in the sense that it always creates a new Tree instance.
     """
+    return rewrite_tree(
+        tree,
+        lambda node, children: _binarize_conj_node(node, children, mode),
+    )
+
+def _binarize_conj_node(
+    tree: Tree,
+    children_binarized: typing.List[typing.Any],
+    mode: RebuildMode,
+) -> Tree:
     label: abcc.Annot[abcc.ABCCat] = tree.label()
-    children_binarized = [
-        (
-            binarize_conj_tree(child, ID) 
-            if isinstance(child, Tree)
-            else child
-        )
-        for child in tree
-    ]
 
     if (
         len(tree) > 1 
@@ -217,7 +228,4 @@ def binarize_conj_tree(
             ],
         )
     else:
-        return Tree(
-            node = label,
-            children = children_binarized
-        )
\ No newline at end of file
+        return rebuild_node(tree, children_binarized, mode)
@@ -3,6 +3,7 @@ import typing
 from nltk.tree import Tree
 import abctk.obj.ABCCat as abcc
 from abctk.obj.ABCCat import ABCCatBot, Annot, ABCCat
+from abctk.transform_ABC.visitor import fold_tree
 
 def elim_empty_terminals(
     tree,
@@ -19,39 +20,42 @@ def elim_empty_terminals(
     Returns
     -------
     is_empty: bool
-        For internal recursion only.
+        Whether the tree is an empty terminal or a unary chain down to one,
+        which is removed by its parent.
     """
+    return fold_tree(tree, _elim_empty_node, leaf = _is_empty_terminal)
 
-    if isinstance(tree, Tree):
-        children_cats = tuple(
-            elim_empty_terminals(child, ID)
-            for child in tree
+def _elim_empty_node(
+    tree: Tree,
+    children_cats: typing.List[bool],
+) -> bool:
+    # NOTE: subtrees tampered
+
+    children_num = len(children_cats)
+    if children_num == 1:
+        return children_cats[0] # propagate the result of the only child
+    elif any(children_cats):
+        children = list(tree)
+
+        tree.clear()
+        tree.extend(
+            child for child, is_empty in zip(children, children_cats)
+            if not is_empty
         )
-        # NOTE: subtrees tampered
-
-        children_num = len(children_cats)
-        if children_num == 1:
-            return children_cats[0] # propagate the result of the only child
-        elif any(children_cats):
-            children = list(tree)
-
-            tree.clear()
-            tree.extend(
-                child for child, is_empty in zip(children, children_cats)
-                if not is_empty
-            )
-            
-            if children_num == 2:
-                self_label: Annot = tree.label()
-                self_label.feats["deriv"] = "unary-elim-empty"
-            # === END IF ===
-
-            return False 
-        else:
-            # do nothing
-            return False
-    elif isinstance(tree, str):
+        
+        if children_num == 2:
+            self_label: Annot = tree.label()
+            self_label.feats["deriv"] = "unary-elim-empty"
+        # === END IF ===
+
+        return False 
+    else:
+        # do nothing
+        return False
+
+def _is_empty_terminal(tree) -> bool:
+    if isinstance(tree, str):
         return tree.startswith("*") or tree.startswith("__")
     else:
         # do nothing
-        return False
\ No newline at end of file
+        return False
@@ -6,9 +6,12 @@ logger = logging.getLogger(__name__)
 from nltk.tree import Tree
 
 from abctk import ABCTException
+import abctk.cat_cache as cc
+from abctk.cat_pattern import CatPattern, MatchMode
 from abctk.obj.ID import RecordID
 import abctk.obj.ABCCat as abcc
 from abctk.obj.ABCCat import ABCCat, ABCCatFunctor, ABCCatReady, Annot
+from abctk.transform_ABC.visitor import iter_nodes
 
 class ElimTraceException(ABCTException):
     ID: str
@@ -69,6 +72,16 @@ def elim_trace(
 
     return False
 
+_PAT_REL_MOD = CatPattern("<N/N>", MatchMode.EXACT)
+"""
+The category of relativization.
+"""
+
+_PAT_REL_PRED = CatPattern("<PP\\S>", MatchMode.IGNORE_FEATURE)
+"""
+The category of the clause under relativization.
+"""
+
 def restore_rel_trace(
     tree,
     ID: Union[RecordID, str] = "<UNKNOWN>",
@@ -93,12 +106,12 @@ def restore_rel_trace(
     generous
         sdf
     """
-    if isinstance(tree, Tree):
-        label: Annot[ABCCatReady] = tree.label()
+    for node in iter_nodes(tree):
+        label: Annot[ABCCatReady] = node.label()
         feats = label.feats
 
         if (
-            ABCCat.parse(label.cat) == ABCCat.p("<N/N>")
+            _PAT_REL_MOD.match(label.cat)
             and (
                  generous
                  or feats.get("deriv", "none") == "unary-IPREL"
@@ -106,7 +119,7 @@ def restore_rel_trace(
         ):
             # Derivation of relativzation is found!
             # 1. check the number of the children
-            if len(tree) != 1:
+            if len(node) != 1:
                 if generous:
                     logger.info(
                         "A subtree labeled <N/N> is deemed not to be an relativization structure. "
@@ -115,10 +128,10 @@ def restore_rel_trace(
 
                     # doing nothing on this node
                 else:
-                    raise NonUnaryRelativizationSubtreeException(ID, tree)
+                    raise NonUnaryRelativizationSubtreeException(ID, node)
             else:
                 # unary
-                only_child = tree[0]
+                only_child = node[0]
 
                 # and ABCCat.parse(child.label().cat).equiv_to(
                 #     "<PP\\S>",
@@ -133,25 +146,22 @@ def restore_rel_trace(
                         )
                     else:
                         raise UnexpectedLexicalNodeException(
-                            str(ID), tree, only_child
+                            str(ID), node, only_child
                     )
                 elif not isinstance(only_child, Tree):
                     raise IllegalRelativizationSubtreeException(
-                        str(ID), tree,
+                        str(ID), node,
                         None,
                     )
                 else:
                     child_label: Annot[ABCCatReady] = only_child.label()
                     # take the trace argument type
-                    child_cat = ABCCat.p(child_label.cat)
+                    child_cat = cc.parse_cat(child_label.cat)
 
                     # check the only child has the category (Xbase → Y)
                     if (
                         isinstance(child_cat, ABCCatFunctor)
-                        and child_cat.equiv_to(
-                            "<PP\\S>",
-                            ignore_feature = True,
-                        )
+                        and _PAT_REL_PRED.match(child_cat)
                     ):
                         logging.info(
                             f"Found a relativization structure in {ID}"
@@ -159,25 +169,25 @@ def restore_rel_trace(
                         child_cat_ant = child_cat.ant
 
                         # rewrite the derivation
-                        tree.clear()
-                        tree.append(
+                        node.clear()
+                        node.append(
                             Tree(
                                 Annot(
-                                    ABCCat.p("Srel").v(child_cat_ant),
+                                    cc.parse_cat("Srel").v(child_cat_ant),
                                     {"rel": "bind"},
-                                    pprinter_cat = ABCCat.pprint,
+                                    pprinter_cat = cc.pprint_cat,
                                 ),
                                 [
                                     Tree(
                                         Annot(
-                                            ABCCat.p("Srel"),
-                                            pprinter_cat = ABCCat.pprint,
+                                            cc.parse_cat("Srel"),
+                                            pprinter_cat = cc.pprint_cat,
                                         ),
                                         [
                                             Tree(
                                                 Annot(
                                                     child_cat_ant,
-                                                    pprinter_cat = ABCCat.pprint,
+                                                    pprinter_cat = cc.pprint_cat,
                                                 ),
                                                 ["*T*"],
                                             ),
@@ -196,14 +206,7 @@ def restore_rel_trace(
                             )
                         else:
                             raise IllegalRelativizationSubtreeException(
-                                str(ID), tree,
+                                str(ID), node,
                                 child_cat,
                             )
-
-        # propagate to children
-        for child in tree:
-            restore_rel_trace(child, ID, generous)
-    else:
-        # not a tree
-        # do nothing
-        pass
\ No newline at end of file
+    # === END FOR node ===
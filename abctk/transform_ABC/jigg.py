@@ -12,7 +12,10 @@ from nltk.tree import Tree
 import lxml.etree as et
 from abctk import ABCTException
 
+import abctk.cat_cache as cc
+from abctk.cat_pattern import CatPatternSet, MatchMode
 import abctk.obj.ABCCat as abcc
+import abctk.transform_ABC.morph_janome as mj
 
 class ABCMorphAnalyzer(janome.tokenizer.Tokenizer):
     def analyze(
@@ -140,8 +143,6 @@ class ABCMorphAnalyzer(janome.tokenizer.Tokenizer):
         return tokens
     # === END ===
 
-_janome_tokenizer: typing.Optional[ABCMorphAnalyzer] = None
-
 def _morph_analyze_janome(tokens_root: et._Element):
     tokens = tuple(tokens_root.xpath("token"))
 
@@ -170,15 +171,9 @@ def _morph_analyze_janome(tokens_root: et._Element):
         if is_non_empty
     )
 
-    global _janome_tokenizer
-    if _janome_tokenizer is None:
-        _janome_tokenizer = ABCMorphAnalyzer()
-
     for i, token_analyzed in zip(
         surf_token_nonempty_indices,
-        _janome_tokenizer.analyze(
-            text = surf_token_nonempty,
-        )
+        mj.get_cache().analyze(surf_token_nonempty)
     ):
         token_xml = tokens[i]
 
@@ -187,7 +182,7 @@ def _morph_analyze_janome(tokens_root: et._Element):
             "pron": token_analyzed.phonetic,
             "yomi": token_analyzed.reading,
             "lemma": "", # no viable attrib?
-            "cForm": token_analyzed.info_form,
+            "cForm": token_analyzed.infl_form,
             "cType": token_analyzed.infl_type,
         }
         for key, val in attribs.items():
@@ -221,11 +216,30 @@ class JIGGConvException(ABCTException):
         self.ID = ID
         super().__init__(f'Conversion error at Tree {ID}')
 
+_re_comp_bind = re.compile(r"(?P<num>[0-9]+),(?P<role>[a-zA-Z]+),bind")
+
+PostagRules = CatPatternSet[typing.Mapping[str, typing.Any]]
+"""
+POS tag rules compiled by :func:`compile_postag_dict`.
+"""
+
+def compile_postag_dict(postag_dict: typing.Iterable[typing.Mapping[str, typing.Any]]) -> PostagRules:
+    """
+    Compile POS tag rules (see `abctk/ccg2lambda/semtag.yaml`) for :func:`tree_to_jigg`.
+    A rule applies to the terminals whose categories unify with its `category`
+    and whose base forms are listed in its `base`.
+    The first applicable rule is taken.
+    """
+    return CatPatternSet(
+        ((tag["category"], tag) for tag in postag_dict),
+        MatchMode.UNIFY,
+    )
+
 def tree_to_jigg(
     tree: Tree,
     ID: str = "<UNKNOWN>",
     jigg_ID: typing.Any = 0,
-    postag_dict: typing.Optional[list] = None,
+    postag_dict: typing.Union[list, PostagRules, None] = None,
 ) -> et._Element:
     """
     Put an ABC Tree in the JIGG format.
@@ -236,6 +250,9 @@ def tree_to_jigg(
     ID
     jigg_ID
     postag_dict
+        POS tag rules. 
+        Compile them beforehand by :func:`compile_postag_dict`
+        when many trees are converted.
 
     Returns
     ------
@@ -245,8 +262,10 @@ def tree_to_jigg(
     ------
     JIGGConvException
     """
-    if not postag_dict: 
-        postag_dict = []
+    if isinstance(postag_dict, CatPatternSet):
+        postag_rules = postag_dict
+    else:
+        postag_rules = compile_postag_dict(postag_dict or [])
 
     xml_pool: et._Element = et.Element(
         "sentence",
@@ -283,7 +302,7 @@ def tree_to_jigg(
                 label = pointer.label()
                 if not isinstance(label, abcc.Annot):
                     raise TypeError
-                label_cat = abcc.ABCCat.p(label.cat)
+                label_cat = cc.parse_cat(label.cat)
                 
                 token_span_begin = min(w.token_span_begin for w in return_values)
                 token_span_end = min(w.token_span_end for w in return_values)
@@ -293,8 +312,9 @@ def tree_to_jigg(
                 xml_span = et.SubElement(
                     xml_ccgs,
                     "span",
-                    category = label_cat.pprint(
-                        mode = abcc.ABCCatReprMode.CCG2LAMBDA
+                    category = cc.pprint_cat(
+                        label_cat,
+                        abcc.ABCCatReprMode.CCG2LAMBDA,
                     ),
                     begin = str(token_span_begin),
                     end = str(token_span_end),
@@ -316,8 +336,7 @@ def tree_to_jigg(
                     else:
                         # find whether it is a comparative binding
                         comparative_maybe: str = label.feats.get("comp", "")
-                        _re = re.compile(r"(?P<num>[0-9]+),(?P<role>[a-zA-Z]+),bind")
-                        comp_parsed = _re.match(comparative_maybe)
+                        comp_parsed = _re_comp_bind.match(comparative_maybe)
                         if comp_parsed:
                             # comparative binding
                             d = comp_parsed.groupdict()
@@ -339,9 +358,9 @@ def tree_to_jigg(
                                 # try to automatically find it
                                 if children_num == 2:
                                     child_1, child_2 = pointer
-                                    child_1_cat: abcc.ABCCat = abcc.ABCCat.parse(child_1.label().cat)
-                                    child_2_cat: abcc.ABCCat= abcc.ABCCat.parse(child_2.label().cat)
-                                    simp_candidates = abcc.ABCCat.simplify_exh(child_1_cat, child_2_cat)
+                                    child_1_cat: abcc.ABCCat = cc.parse_cat(child_1.label().cat)
+                                    child_2_cat: abcc.ABCCat = cc.parse_cat(child_2.label().cat)
+                                    simp_candidates = cc.simplify_exh(child_1_cat, child_2_cat)
                                     if simp_candidates:
                                         _, simp_elimtype = next(iter(simp_candidates))
                                         span_rule = str(simp_elimtype)
@@ -376,11 +395,8 @@ def tree_to_jigg(
                         )
                         # add additional POS
                         # match with
-                        for tag in postag_dict:
-                            if (
-                                label_cat.unify(tag["category"])
-                                and pointer_token.attrib["base"] in tag["base"]
-                            ):
+                        for tag in postag_rules.match_all(label_cat):
+                            if pointer_token.attrib["base"] in tag["base"]:
                                 pointer_token.set("pos", tag["pos"])
                                 break
 
@@ -1,3 +1,11 @@
+import hashlib
+import importlib.metadata as im
+import json
+import logging
+logger = logging.getLogger(__name__)
+import os
+import pathlib
+import sqlite3
 import typing
 
 from nltk.tree import Tree
@@ -6,7 +14,11 @@ from janome.lattice import Node as JNode
 import janome.tokenizer
 from janome.tokenizer import Token as JToken
 
+import abctk
+import abctk.cat_cache as cc
+import abctk.config
 import abctk.obj.ABCCat as abcc
+from abctk.transform_ABC.visitor import TreeVisitor, iter_nodes
 
 class ABCMorphAnalyzer(janome.tokenizer.Tokenizer):
     def analyze(
@@ -111,7 +123,240 @@ class ABCMorphAnalyzer(janome.tokenizer.Tokenizer):
 
 _janome_tokenizer: typing.Optional[ABCMorphAnalyzer] = None
 
-def _serialize_JToken(ana: JToken):
+def get_analyzer() -> ABCMorphAnalyzer:
+    """
+    Get the analyzer shared in the process.
+    It is built (which takes a while to load the dictionary) at the first call.
+    """
+    global _janome_tokenizer
+    if _janome_tokenizer is None:
+        _janome_tokenizer = ABCMorphAnalyzer()
+    return _janome_tokenizer
+
+# ================
+# Caching analyses
+# ================
+class MorphToken(typing.NamedTuple):
+    """
+    The analysis of a word,
+    with the attributes of :class:`janome.tokenizer.Token` that are used here.
+    """
+    surface: str
+    part_of_speech: str
+    infl_type: str
+    infl_form: str
+    base_form: str
+    reading: str
+    phonetic: str
+
+    @classmethod
+    def from_janome(cls, token: JToken) -> "MorphToken":
+        return cls(
+            token.surface,
+            token.part_of_speech,
+            token.infl_type,
+            token.infl_form,
+            token.base_form,
+            token.reading,
+            token.phonetic,
+        )
+
+_FORMAT_VERSION = 1
+
+def make_dic_key(
+    user_dic_entries: typing.Optional[typing.Iterable[typing.Sequence]] = None,
+) -> str:
+    """
+    Make the key of what analyses depend on,
+    i.e. the version of this package (which builds the user dictionary),
+    the version of Janome (with its system dictionary)
+    and the SHA-256 hash of the user dictionary entries, if any.
+    """
+    if user_dic_entries is None:
+        user_dic_hash = "none"
+    else:
+        hasher = hashlib.sha256()
+        for entry in user_dic_entries:
+            hasher.update(",".join(map(str, entry)).encode("utf-8"))
+            hasher.update(b"\n")
+        user_dic_hash = hasher.hexdigest()
+
+    return (
+        f"abctk-{abctk.__version__};"
+        f"janome-{im.version('janome')};"
+        f"user-dic-{user_dic_hash}"
+    )
+
+class MorphCache:
+    """
+    A memo table of the analyses of tokenized texts by :class:`ABCMorphAnalyzer`,
+    keyed by the tuple of the words.
+    Headlines, boilerplates and near-duplicate sentences come again and again in corpora,
+    each of which costs a whole lattice otherwise.
+
+    The analyses are kept as tuples of :class:`MorphToken`
+    in a table with LRU eviction.
+    Optionally, they are also persisted in an SQLite database
+    (serialized in JSON)
+    so that they are reused across runs.
+
+    Parameters
+    ----------
+    analyzer_factory
+        Builds the analyzer at the first miss.
+    maxsize
+        The size cap (in entries) of the in-memory table.
+    db_path
+        The SQLite database. Nothing is persisted if None.
+    dic_key
+        See :func:`make_dic_key`. Persisted analyses are looked up under this key.
+    """
+
+    def __init__(
+        self,
+        analyzer_factory: typing.Callable[[], "ABCMorphAnalyzer"],
+        maxsize: int = 65536,
+        db_path: typing.Union[str, pathlib.Path, None] = None,
+        dic_key: typing.Optional[str] = None,
+    ):
+        self._analyzer_factory = analyzer_factory
+        self._analyzer: typing.Optional[ABCMorphAnalyzer] = None
+        self._memo: cc.BoundedMemo[
+            typing.Tuple[str, ...], typing.Tuple[MorphToken, ...]
+        ] = cc.BoundedMemo(self._analyze_uncached, maxsize)
+        self.db_path = pathlib.Path(db_path) if db_path else None
+        self.dic_key = dic_key or make_dic_key()
+        self.db_hits = 0
+
+        # opened lazily in each process
+        self._conn: typing.Optional[sqlite3.Connection] = None
+        self._conn_pid: typing.Optional[int] = None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        if self.db_path is None: raise RuntimeError
+        self.db_path.parent.mkdir(parents = True, exist_ok = True)
+        conn = sqlite3.connect(str(self.db_path), timeout = 60)
+        with conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != _FORMAT_VERSION:
+                conn.execute("DROP TABLE IF EXISTS analyses")
+                conn.execute(f"PRAGMA user_version = {_FORMAT_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "dic_key TEXT, words TEXT, tokens TEXT, "
+                "PRIMARY KEY (dic_key, words)"
+                ")"
+            )
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _analyze_uncached(
+        self,
+        words: typing.Tuple[str, ...],
+    ) -> typing.Tuple[MorphToken, ...]:
+        if self.db_path is not None:
+            conn = self._get_conn()
+            words_serialized = json.dumps(words, ensure_ascii = False)
+            row = conn.execute(
+                "SELECT tokens FROM analyses WHERE dic_key = ? AND words = ?",
+                (self.dic_key, words_serialized),
+            ).fetchone()
+            if row is not None:
+                self.db_hits += 1
+                return tuple(MorphToken(*token) for token in json.loads(row[0]))
+        # === END IF ===
+
+        if self._analyzer is None:
+            self._analyzer = self._analyzer_factory()
+
+        tokens = tuple(
+            MorphToken.from_janome(token)
+            for token in self._analyzer.analyze(words)
+        )
+
+        if self.db_path is not None:
+            # committed one by one since worker processes are killed without notice
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)",
+                    (
+                        self.dic_key,
+                        words_serialized,
+                        json.dumps(tokens, ensure_ascii = False, separators = (",", ":")),
+                    ),
+                )
+        # === END IF ===
+
+        return tokens
+
+    def analyze(self, words: typing.Iterable[str]) -> typing.Tuple[MorphToken, ...]:
+        """
+        Give the analysis of a tokenized text, computed at most once.
+        See :meth:`ABCMorphAnalyzer.analyze`.
+        """
+        return self._memo(tuple(words))
+
+    def info(self) -> cc.MemoInfo:
+        """
+        The statistics of the in-memory table.
+        The misses include those found in the database (see :attr:`db_hits`).
+        """
+        return self._memo.info()
+
+    def resize(self, maxsize: int) -> None:
+        self._memo.resize(maxsize)
+
+    def close(self) -> None:
+        if self._conn is not None and self._conn_pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._conn_pid = None
+
+_morph_cache: typing.Optional[MorphCache] = None
+
+def configure(config: typing.Mapping[str, typing.Any]) -> None:
+    """
+    Set up the cache of the process
+    following the `morph-cache` section of a configuration:
+    `max-size` (in entries), `persist` and `path` of the SQLite database.
+    Missing keys fall back to the defaults.
+    """
+    global _morph_cache
+
+    conf_default = typing.cast(
+        typing.Dict[str, typing.Any],
+        abctk.config.CONF_DEFAULT["morph-cache"],
+    )
+    if _morph_cache is not None:
+        _morph_cache.close()
+
+    _morph_cache = MorphCache(
+        get_analyzer,
+        maxsize = int(config.get("max-size", conf_default["max-size"])),
+        db_path = (
+            config.get("path", conf_default["path"])
+            if config.get("persist", conf_default["persist"])
+            else None
+        ),
+    )
+
+def get_cache() -> MorphCache:
+    """
+    Get the cache of analyses shared in the process,
+    set up with the defaults unless :func:`configure` is called beforehand.
+    """
+    if _morph_cache is None:
+        configure({})
+    if _morph_cache is None: raise RuntimeError
+    return _morph_cache
+
+def _serialize_JToken(ana: typing.Union[JToken, MorphToken]):
     return f'{ana.part_of_speech},{ana.infl_type},{ana.infl_form},{ana.base_form},{ana.reading},{ana.phonetic}'
     # TODO: escape #
 
@@ -119,28 +364,30 @@ def add_morph_janome(
     tree: Tree,
     ID: str = "<UNKNOWN>"
 ):
-    # 1. Collect lexical nodes
-    def yield_tokens(node: Tree):
-        for child in node:
+    # 1. Collect lexical nodes in the order of the text
+    tokens_found: typing.List[typing.Tuple[str, Tree]] = []
+    stack = [(tree, iter(tree))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
             if isinstance(child, Tree):
-                yield from yield_tokens(child)
+                stack.append((child, iter(child)))
+                break
             elif isinstance(child, str):
                 if (
                     not child.startswith("*")
                     and not child.startswith("__")
                 ):
-                    yield (child, node)
+                    tokens_found.append((child, node))
             else:
                 pass
-    tokens = tuple(yield_tokens(tree))
+        else:
+            stack.pop()
+    tokens = tuple(tokens_found)
 
     # 2. Analyze
-    global _janome_tokenizer
-    if _janome_tokenizer is None:
-        _janome_tokenizer = ABCMorphAnalyzer()
-
-    tokens_analyzed = _janome_tokenizer.analyze(
-        tuple(word for word, _ in tokens)
+    tokens_analyzed = get_cache().analyze(
+        word for word, _ in tokens
     )
 
     # 3. Merge into the tree nodes
@@ -160,11 +407,21 @@ def add_morph_janome(
     # === END ===
 
 def del_morph_janome(tree: Tree, ID: str = "<UNKNOWN>"):
-    label = tree.label()
+    for node in iter_nodes(tree):
+        label = node.label()
+
+        if isinstance(label, abcc.Annot):
+            label.feats.pop("janome", None)
 
-    if isinstance(label, abcc.Annot):
-        label.feats.pop("janome", None)
+class DelJanomeVisitor(TreeVisitor):
+    """
+    The visitor version of :func:`del_morph_janome`.
+    """
 
-    for child in tree:
-        if isinstance(child, Tree):
-            del_morph_janome(child, ID)
+    def run_alone(self, tree, ID) -> None:
+        del_morph_janome(tree, ID)
+
+    def visit(self, node: Tree) -> None:
+        label = node.label()
+        if isinstance(label, abcc.Annot):
+            label.feats.pop("janome", None)
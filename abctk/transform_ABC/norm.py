@@ -3,8 +3,10 @@ import typing
 import attr
 
 from nltk.tree import Tree
+import abctk.cat_cache as cc
 import abctk.obj.ABCCat as abcc
 from abctk.obj.ABCCat import ABCCatBot, Annot, ABCCat, ABCCatBase
+from abctk.transform_ABC.visitor import TreeVisitor, fold_tree, iter_nodes
 
 def minimize_tree(
     tree: typing.Union[str, Tree],
@@ -22,67 +24,79 @@ def minimize_tree(
     Returns
     -------
     category: ABCCat or None
-        For internal recursion only.
+        The category of `tree` before minimized.
 
     Notes
     -----
     This method is destructive in the sense that the given `tree` is modified in situ.
     """
 
-    if isinstance(tree, Tree):
-        self_label: Annot = tree.label()
-        self_label_cat = self_label.cat
-        self_label_feats = self_label.feats
-
-        children_cats = tuple(
-            minimize_tree(child, ID, discard_trace)
-            for child in tree
+    def _minimize_node(
+        node: Tree,
+        children_cats: typing.List[typing.Optional[ABCCat]],
+    ) -> typing.Optional[ABCCat]:
+        # NOTE: `reduction_check` only applies to the root
+        return _minimize_node_label(
+            node, children_cats,
+            discard_trace,
+            reduction_check or node is not tree,
         )
-        # NOTE: subtrees tampered
-
-        cat_new: typing.Union[ABCCat, str]
-        feat_new: typing.Dict[str, typing.Any]
-
-        if reduction_check:
-            if (
-                len(children_cats) == 2
-                and self_label_feats.get("deriv", "") in ["", "none"] 
-            ):
-                child1_cat, child2_cat = children_cats
-                cat_new = "" if (
-                    child1_cat 
-                    and child2_cat 
-                    and ABCCat.simplify_exh(child1_cat, child2_cat)
-                ) else self_label_cat
-            else:
-                cat_new = self_label_cat
-        else:
-            cat_new = (
-                "" 
-                if self_label_feats.get("deriv", "") in ["", "none"]
-                else self_label_cat
-            )
 
-        feat_new = dict(
-            (key, val) for key, val in self_label_feats.items()
-            if not (
-                (discard_trace and key.startswith("trace."))
-                or (
-                    discard_trace and 
-                    key == "role"
-                    #and self_label_feats.get("deriv", "") in ["", "none"] 
-                )
-            )
+    return fold_tree(tree, _minimize_node, leaf = _none)
+
+def _none(_) -> None:
+    return None
+
+def _minimize_node_label(
+    node: Tree,
+    children_cats: typing.Sequence[typing.Optional[ABCCat]],
+    discard_trace: bool,
+    reduction_check: bool,
+) -> typing.Optional[ABCCat]:
+    """
+    Minimize the label of a node, given the categories of its children.
+    Returns the category of the node before minimized.
+    """
+    self_label: Annot = node.label()
+    self_label_cat = self_label.cat
+    self_label_feats = self_label.feats
+
+    cat_new: typing.Union[ABCCat, str]
+    feat_new: typing.Dict[str, typing.Any]
+
+    if reduction_check:
+        if (
+            len(children_cats) == 2
+            and self_label_feats.get("deriv", "") in ["", "none"] 
+        ):
+            child1_cat, child2_cat = children_cats
+            cat_new = "" if (
+                child1_cat 
+                and child2_cat 
+                and cc.simplify_exh(child1_cat, child2_cat)
+            ) else self_label_cat
+        else:
+            cat_new = self_label_cat
+    else:
+        cat_new = (
+            "" 
+            if self_label_feats.get("deriv", "") in ["", "none"]
+            else self_label_cat
         )
 
-        tree.set_label(
-            Annot(cat_new, feat_new)
+    feat_new = dict(
+        (key, val) for key, val in self_label_feats.items()
+        if not (
+            discard_trace
+            and (key.startswith("trace.") or key == "role")
         )
-        
-        return self_label_cat
-    else:
-        # do nothing
-        return None
+    )
+
+    node.set_label(
+        Annot(cat_new, feat_new)
+    )
+    
+    return self_label_cat
 
 def elaborate_cat_annotations(
     tree,
@@ -98,123 +112,126 @@ def elaborate_cat_annotations(
     Returns
     -------
     category: ABCCat or None
-        For internal recursion only.
+        The category of `tree`.
     """
 
-    if isinstance(tree, Tree):
-        self_label: Annot = tree.label()
-        self_label_cat = self_label.cat
-        self_label_feats = self_label.feats
-
-        if (
-            isinstance(self_label_cat, ABCCatBase) and self_label_cat.name == "COMMENT"
-            or self_label_cat == "COMMENT"
-        ):
-            return None
-
-        # RECURSION
-        children_cats = tuple(
-            filter(
-                None,
-                (elaborate_cat_annotations(child, ID) for child in tree)
-            )
-        )
-        # NOTE: subtrees tampered
-
-        children_count = len(children_cats)
-        deriv: str = self_label_feats.get("deriv", "none")
-
-        if children_count == 2:
-            if abcc.ElimType.is_compatible_repr(deriv):
-                child_1, child_2 = children_cats
-                if child_1 is None or child_2 is None:
-                    pass
-                else:
-                    cat_applied_res_set = ABCCat.simplify_exh(child_1, child_2)
-                    if cat_applied_res_set:
-                        # simp successful
-                        new_cat, elimtype = next(iter(cat_applied_res_set))
-                        if not self_label_cat and deriv == "none":
-                            # self_label_cat is empty, no deriv speficied
-                            # supplement it with the result
-                            self_label_cat = new_cat
-
-                            self_label_feats["deriv"] = str(elimtype)
-                            tree.set_label(
-                                attr.evolve(
-                                    self_label,
-                                    cat = new_cat,
-                                )
-                            )
-                        elif abcc.ABCCat.p(self_label_cat) == new_cat:
-                            # successful
-                            # check deriv
-                            if deriv == "none":
-                                # no deriv 
-                                # fill it
-                                self_label_feats["deriv"] = str(elimtype)
-                            else:
-                                deriv_parsed = abcc.ElimType.maybe_parse(deriv)
-                                if deriv_parsed != elimtype:
-                                    self_label_feats["trace.elab.wrong-rule"] = str(elimtype)
-                        else:
-                            # categories are not identical
-                            self_label_feats["trace.elab.error"] = "cat-discrepancy"
-                            self_label_feats["trace.elab.res"] = new_cat.pprint()
-                            self_label_feats["trace.elab.res-deriv"] = str(elimtype)
+    return fold_tree(
+        tree,
+        _elaborate_cat_node,
+        leaf = _none,
+        pre = _is_not_comment_node,
+        pruned = _none,
+    )
+
+def _is_comment(cat) -> bool:
+    return (
+        isinstance(cat, ABCCatBase) and cat.name == "COMMENT"
+        or cat == "COMMENT"
+    )
+
+def _is_not_comment_node(node: Tree) -> bool:
+    return not _is_comment(node.label().cat)
+
+def _elaborate_cat_node(
+    node: Tree,
+    results: typing.Sequence[typing.Optional[ABCCat]],
+) -> typing.Optional[ABCCat]:
+    """
+    Elaborate the label of a node, given the categories of its children.
+    Returns the category of the node.
+    """
+    self_label: Annot = node.label()
+    self_label_cat = self_label.cat
+    self_label_feats = self_label.feats
+
+    children_cats = tuple(filter(None, results))
+    children_count = len(children_cats)
+    deriv: str = self_label_feats.get("deriv", "none")
+
+    if children_count == 2:
+        if abcc.ElimType.is_compatible_repr(deriv):
+            child_1, child_2 = children_cats
+            cat_applied_res_set = cc.simplify_exh(child_1, child_2)
+            if cat_applied_res_set:
+                # simp successful
+                new_cat, elimtype = next(iter(cat_applied_res_set))
+                if not self_label_cat and deriv == "none":
+                    # self_label_cat is empty, no deriv speficied
+                    # supplement it with the result
+                    self_label_cat = new_cat
+
+                    self_label_feats["deriv"] = str(elimtype)
+                    node.set_label(
+                        attr.evolve(
+                            self_label,
+                            cat = new_cat,
+                        )
+                    )
+                elif cc.parse_cat(self_label_cat) == new_cat:
+                    # successful
+                    # check deriv
+                    if deriv == "none":
+                        # no deriv 
+                        # fill it
+                        self_label_feats["deriv"] = str(elimtype)
                     else:
-                        if not self_label_cat:
-                            # self_label_cat is empty
-                            # supplement it with ⊥
-                            self_label_cat = ABCCatBot.BOT
-                            tree.set_label(
-                                attr.evolve(
-                                    self_label,
-                                    cat = ABCCatBot.BOT,
-                                )
-                            )
-                        # === END IF ===
-
-                        self_label_feats["trace.elab.error"] = "failed-simp"
+                        deriv_parsed = abcc.ElimType.maybe_parse(deriv)
+                        if deriv_parsed != elimtype:
+                            self_label_feats["trace.elab.wrong-rule"] = str(elimtype)
+                else:
+                    # categories are not identical
+                    self_label_feats["trace.elab.error"] = "cat-discrepancy"
+                    self_label_feats["trace.elab.res"] = new_cat.pprint()
+                    self_label_feats["trace.elab.res-deriv"] = str(elimtype)
             else:
-                # special derivations
-                # do nothing
-                pass
-        elif children_count == 1:
-            if deriv == "none":
-                # check if it is actually a |-intro
-                only_child = children_cats[0]
-                if only_child is not None and self_label_cat:
-                    # self_label has a cat & the only_child also has a cat
-                    self_label_cat_parsed = abcc.ABCCat.p(self_label_cat)
-
-                    if (
-                        isinstance(self_label_cat_parsed, abcc.ABCCatFunctor)
-                        and self_label_cat_parsed.func_mode == abcc.ABCCatFunctorMode.VERT
-                        and abcc.ABCCat.parse(only_child) == self_label_cat_parsed.conseq
-                    ):
-                        # found a |-intro situation
-        
-                        # Try finding indices
-                        index = "unary-unknown"
-                        comp_list = self_label_feats.get("comp", "").split(",")
-                        if comp_list and "bind" in comp_list:
-                            index = f"{comp_list[1]}{comp_list[0]}"
-
-                        self_label_feats["deriv"] = f"|intro-{index}"
-                    else:
-                        # found an ordinary unary branching
-                        self_label_feats["deriv"] = "unary-unknown"
+                if not self_label_cat:
+                    # self_label_cat is empty
+                    # supplement it with ⊥
+                    self_label_cat = ABCCatBot.BOT
+                    node.set_label(
+                        attr.evolve(
+                            self_label,
+                            cat = ABCCatBot.BOT,
+                        )
+                    )
+                # === END IF ===
+
+                self_label_feats["trace.elab.error"] = "failed-simp"
+        else:
+            # special derivations
+            # do nothing
+            pass
+    elif children_count == 1:
+        if deriv == "none":
+            # check if it is actually a |-intro
+            only_child = children_cats[0]
+            if self_label_cat:
+                # self_label has a cat & the only_child also has a cat
+                self_label_cat_parsed = cc.parse_cat(self_label_cat)
+
+                if (
+                    isinstance(self_label_cat_parsed, abcc.ABCCatFunctor)
+                    and self_label_cat_parsed.func_mode == abcc.ABCCatFunctorMode.VERT
+                    and cc.parse_cat(only_child) == self_label_cat_parsed.conseq
+                ):
+                    # found a |-intro situation
+    
+                    # Try finding indices
+                    index = "unary-unknown"
+                    comp_list = self_label_feats.get("comp", "").split(",")
+                    if comp_list and "bind" in comp_list:
+                        index = f"{comp_list[1]}{comp_list[0]}"
+
+                    self_label_feats["deriv"] = f"|intro-{index}"
                 else:
-                    pass
+                    # found an ordinary unary branching
+                    self_label_feats["deriv"] = "unary-unknown"
             else:
                 pass
-        
-        return self_label_cat
-    else:
-        # do nothing
-        return None
+        else:
+            pass
     
+    return self_label_cat
 
 def elaborate_char_spans(
     tree: typing.Union[str, Tree],
@@ -234,44 +251,54 @@ def elaborate_char_spans(
     Returns
     -------
     span
-        For internal recursion only.
+        The character span of `tree`.
 
     Notes
     -----
     This method is destructive in the sense that the given `tree` is modified in situ.
     """
 
-    if isinstance(tree, Tree):
-        self_label: Annot[ABCCat] = tree.label()
-        
-        self_cat = self_label.cat
-        if (
-            isinstance(self_cat, ABCCatBase) and self_cat.name == "COMMENT"
-            or self_cat == "COMMENT"
-        ):
-            return (offset, offset)
-        else:
-            span_start = offset
-            span_end = offset
+    if not isinstance(tree, Tree):
+        return (offset, offset + _len_chars(tree))
+
+    if _is_comment(tree.label().cat):
+        return (offset, offset)
 
-            for child in tree:
-                # RECURSION and collect the end
-                _, span_end = elaborate_char_spans(child, ID, offset)
+    # the current node, its remaining children and where it starts
+    node, children, span_start = tree, iter(tree), offset
+    # those of the ancestors
+    stack: typing.List[tuple] = []
+    while True:
+        for child in children:
+            if isinstance(child, Tree):
+                if _is_comment(child.label().cat):
+                    continue
+
+                stack.append((node, children, span_start))
+                node, children, span_start = child, iter(child), offset
+                break
+            else:
                 # move the offset
-                offset = span_end
-
-            self_label.feats["char-start"] = span_start
-            self_label.feats["char-end"] = span_end
-            return (span_start, span_end)
-    elif isinstance(tree, str):
-        l = (
-            0 
-            if tree.startswith("*") or tree.startswith("__") 
-            else len(tree) 
-        )
-        return (offset, offset + l)
+                offset += _len_chars(child)
+        else:
+            feats = node.label().feats
+            feats["char-start"] = span_start
+            feats["char-end"] = offset
+            if not stack:
+                return (span_start, offset)
+            node, children, span_start = stack.pop()
+    # === END WHILE ===
+
+def _len_chars(leaf) -> int:
+    """
+    The number of the characters of a terminal in the text.
+    """
+    if isinstance(leaf, str) and not (
+        leaf.startswith("*") or leaf.startswith("__")
+    ):
+        return len(leaf)
     else:
-        return (offset, offset)
+        return 0
 
 def delete_all_feats_with_white_list(
     tree: typing.Union[str, Tree],
@@ -285,10 +312,10 @@ def delete_all_feats_with_white_list(
     -----
     This method is destructive in the sense that the given `tree` is modified in situ.
     """
-    if isinstance(tree, Tree):
-        self_label = tree.label()
+    for node in iter_nodes(tree):
+        self_label = node.label()
         if isinstance(self_label, Annot):
-            tree.set_label(
+            node.set_label(
                 Annot(
                     cat = self_label.cat,
                     feats = {
@@ -297,8 +324,6 @@ def delete_all_feats_with_white_list(
                     }
                 )
             )
-        for child in tree:
-            delete_all_feats_with_white_list(child, ID, white_list)
 
 def delete_feats(
     tree: typing.Union[str, Tree],
@@ -312,10 +337,10 @@ def delete_feats(
     -----
     This method is destructive in the sense that the given `tree` is modified in situ.
     """
-    if isinstance(tree, Tree):
-        self_label = tree.label()
+    for node in iter_nodes(tree):
+        self_label = node.label()
         if isinstance(self_label, Annot):
-            tree.set_label(
+            node.set_label(
                 Annot(
                     cat = self_label.cat,
                     feats = {
@@ -324,5 +349,60 @@ def delete_feats(
                     }
                 )
             )
-        for child in tree:
-            delete_feats(child, ID, black_list)
+
+# ================
+# Visitors
+# ================
+# The rewrites of single nodes above declared as visitors
+# (see :mod:`abctk.transform_ABC.visitor`),
+# which give the same results as the functions.
+
+class DeleteFeatsVisitor(TreeVisitor):
+    """
+    The visitor version of :func:`delete_feats`.
+    """
+
+    def __init__(self, black_list: typing.Set[str] = set()):
+        self.black_list = black_list
+
+    def run_alone(self, tree, ID) -> None:
+        delete_feats(tree, ID, self.black_list)
+
+    def visit(self, node: Tree) -> None:
+        self_label = node.label()
+        if isinstance(self_label, Annot):
+            black_list = self.black_list
+            node.set_label(
+                Annot(
+                    cat = self_label.cat,
+                    feats = {
+                        k:v for k, v in self_label.feats.items()
+                        if k not in black_list
+                    }
+                )
+            )
+
+class WhiteListFeatsVisitor(TreeVisitor):
+    """
+    The visitor version of :func:`delete_all_feats_with_white_list`.
+    """
+
+    def __init__(self, white_list: typing.Set[str] = set()):
+        self.white_list = white_list
+
+    def run_alone(self, tree, ID) -> None:
+        delete_all_feats_with_white_list(tree, ID, self.white_list)
+
+    def visit(self, node: Tree) -> None:
+        self_label = node.label()
+        if isinstance(self_label, Annot):
+            white_list = self.white_list
+            node.set_label(
+                Annot(
+                    cat = self_label.cat,
+                    feats = {
+                        k:v for k, v in self_label.feats.items()
+                        if k in white_list
+                    }
+                )
+            )
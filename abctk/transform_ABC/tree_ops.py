@@ -0,0 +1,725 @@
+"""
+Operations on single trees and their runner.
+
+The tree transforms of `abctk tweak` are registered in :data:`OPS` by the names of the subcommands.
+They are stacked by the CLI (:mod:`abctk.cli_typer.tweak`)
+and by the pipelines of the library (:mod:`abctk.pipeline`) alike
+and run tree by tree by :class:`TreeOpStage`, serially or in worker processes.
+"""
+
+import collections
+import concurrent.futures as cf
+import functools
+import logging
+logger = logging.getLogger(__name__)
+import re
+import typing
+
+import more_itertools
+from tqdm.auto import tqdm
+from nltk.tree import Tree
+
+from abctk.obj.ID import RecordID
+
+import abctk.io.nltk_tree as nt
+import abctk.transform_ABC.norm
+import abctk.transform_ABC.binconj
+import abctk.transform_ABC.elim_empty
+import abctk.transform_ABC.elim_trace
+import abctk.transform_ABC.morph_janome
+import abctk.transform_ABC.unary
+from abctk.transform_ABC.visitor import TreeVisitor, FusedTraversal, RebuildMode
+import abctk.check_comp_feat
+import abctk.obfuscate
+import abctk.profiling as prof
+
+TreeStream = typing.Iterable[typing.Tuple[RecordID, Tree]]
+TreeOp = typing.Callable[[Tree, RecordID], typing.Optional[Tree]]
+"""
+An operation on a single tree.
+It returns the resulting tree, or None if the tree is abandoned.
+Operations are sent to worker processes and thus must be picklable.
+"""
+
+# ================
+# Exception handling
+# ================
+X = typing.TypeVar("X")
+
+def run_modifier(
+    function: typing.Callable[[Tree, str], typing.Any],
+    skip_ill_trees: bool,
+    tree: Tree,
+    ID: RecordID,
+) -> Tree:
+    """
+    Run `function`, which modifies `tree` in place, as an operation.
+    """
+    try:
+        function(tree, ID)
+    except Exception as e:
+        if skip_ill_trees:
+            logger.warning(
+                "An exception was raised by the conversion function. "
+                "The tree will be abandoned."
+                f"Tree ID: {ID}. "
+                f"Exception: {e}"
+            )
+            prof.count_skipped()
+        else:
+            logger.error(
+                "An exception was raised by the conversion function. "
+                "The process has been aborted."
+                f"Tree ID: {ID}. "
+                f"Exception: {e}"
+            )
+            raise
+    return tree
+
+def run_creator(
+    function: typing.Callable[[X, str], X],
+    skip_ill_trees: bool,
+    tree: X,
+    ID: RecordID,
+) -> typing.Optional[X]:
+    """
+    Run `function`, which returns the resulting tree, as an operation.
+    """
+    try:
+        return function(tree, ID)
+    except Exception as e:
+        if skip_ill_trees:
+            logger.warning(
+                "An exception was raised by the conversion function. "
+                "The tree will be abandoned."
+                f"Tree ID: {ID}. "
+                f"Exception: {e}"
+            )
+            prof.count_skipped()
+            return None
+        else:
+            logger.error(
+                "An exception was raised by the conversion function. "
+                "The process has been aborted."
+                f"Tree ID: {ID}. "
+                f"Exception: {e}"
+            )
+            raise
+
+class VisitorOp:
+    """
+    An operation that runs visitors on a tree in fused traversals.
+    Exceptions are handled as in :func:`run_modifier`.
+    """
+
+    def __init__(
+        self,
+        visitors: typing.Sequence[TreeVisitor],
+        skip_ill_trees: bool,
+    ):
+        self.visitors = tuple(visitors)
+        self.skip_ill_trees = skip_ill_trees
+        self.traversal = FusedTraversal(self.visitors)
+
+    def __call__(self, tree: Tree, ID: RecordID) -> Tree:
+        return run_modifier(self.traversal, self.skip_ill_trees, tree, ID)
+
+# ================
+# Running operations
+# ================
+def apply_ops(
+    ops: typing.Sequence[TreeOp],
+    tree: Tree,
+    ID: RecordID,
+) -> typing.Optional[Tree]:
+    """
+    Run `ops` on `tree` in turn.
+    Returns None if the tree is abandoned by one of them.
+    """
+    for op in ops:
+        tree = op(tree, ID)
+        if tree is None:
+            return None
+    return tree
+
+_worker_ops: typing.Sequence[TreeOp] = tuple()
+
+def init_worker(
+    ops: typing.Sequence[TreeOp],
+    names_profiled: typing.Optional[typing.Sequence[str]] = None,
+) -> None:
+    """
+    Initialize a worker process of :class:`TreeOpStage` with the operations to run.
+    """
+    global _worker_ops
+    if names_profiled is not None:
+        # measurements are sent back along with the results
+        prof.activate(prof.Profiler())
+        ops = tuple(
+            prof.wrap_op(name, op)
+            for name, op in zip(names_profiled, ops)
+        )
+    _worker_ops = ops
+
+def _run_ops_on_chunk(
+    chunk: typing.Sequence[typing.Tuple[RecordID, Tree]],
+) -> typing.Tuple[
+    typing.List[typing.Tuple[RecordID, Tree]],
+    typing.Optional[typing.Dict[str, typing.Dict[str, typing.Any]]],
+]:
+    res = []
+    for ID, tree in chunk:
+        tree_new = apply_ops(_worker_ops, tree, ID)
+        if tree_new is not None:
+            res.append((ID, tree_new))
+
+    profiler = prof.get_profiler()
+    return res, (profiler.export() if profiler else None)
+
+class TreeOpStage:
+    """
+    A stage that runs consecutive operations on each tree,
+    in worker processes if `n_jobs` is more than 1.
+    In the latter case, trees are sent in chunks,
+    and the results are yielded in the input order.
+    Each operation is profiled as a stage (`abctk --profile`),
+    including those run in worker processes.
+
+    A pool of workers initialized with :func:`init_worker`
+    can be given as `executor`, which is then kept open for reuse.
+    """
+
+    def __init__(
+        self,
+        source: TreeStream,
+        ops: typing.Sequence[TreeOp],
+        descs: typing.Sequence[str],
+        n_jobs: int = 1,
+        chunk_size: int = 64,
+        progress: bool = True,
+        executor: typing.Optional[cf.Executor] = None,
+    ):
+        self.source = source
+        self.ops = tuple(ops)
+        self.descs = tuple(descs)
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.executor = executor
+
+    def replaced(
+        self,
+        ops: typing.Sequence[TreeOp],
+        descs: typing.Sequence[str],
+    ) -> "TreeOpStage":
+        return TreeOpStage(
+            self.source,
+            ops, descs,
+            self.n_jobs,
+            self.chunk_size,
+            self.progress,
+            self.executor,
+        )
+
+    def appended(self, op: TreeOp, desc: str) -> "TreeOpStage":
+        """
+        Stack `op` on the operations.
+        Visitors share traversals with the last ones as far as possible.
+        """
+        op_last = self.ops[-1] if self.ops else None
+
+        if (
+            isinstance(op, VisitorOp)
+            and isinstance(op_last, VisitorOp)
+            and op_last.skip_ill_trees == op.skip_ill_trees
+        ):
+            return self.replaced(
+                self.ops[:-1] + (
+                    VisitorOp(op_last.visitors + op.visitors, op.skip_ill_trees),
+                ),
+                self.descs[:-1] + (f"{self.descs[-1]}; {desc}", ),
+            )
+        else:
+            return self.replaced(self.ops + (op, ), self.descs + (desc, ))
+
+    def _iter_serial(
+        self,
+        names_profiled: typing.Optional[typing.Sequence[str]] = None,
+    ) -> TreeStream:
+        ops = self.ops
+        if names_profiled is not None:
+            ops = tuple(
+                prof.wrap_op(name, op)
+                for name, op in zip(names_profiled, ops)
+            )
+
+        for ID, tree in self.source:
+            tree_new = apply_ops(ops, tree, ID)
+            if tree_new is not None:
+                yield ID, tree_new
+
+    def _iter_parallel(
+        self,
+        names_profiled: typing.Optional[typing.Sequence[str]] = None,
+    ) -> TreeStream:
+        n_jobs = self.n_jobs
+        profiler = prof.get_profiler()
+
+        def _results(future: cf.Future) -> typing.List[typing.Tuple[RecordID, Tree]]:
+            res, measurements = future.result()
+            if profiler and measurements:
+                profiler.merge(measurements)
+            return res
+
+        def _dispatch(executor: cf.Executor) -> TreeStream:
+            futures: typing.Deque[cf.Future] = collections.deque()
+            for chunk in more_itertools.chunked(self.source, self.chunk_size):
+                futures.append(executor.submit(_run_ops_on_chunk, chunk))
+
+                # keep the number of trees in flight bounded
+                while len(futures) > n_jobs * 2:
+                    yield from _results(futures.popleft())
+
+            while futures:
+                yield from _results(futures.popleft())
+
+        if self.executor:
+            yield from _dispatch(self.executor)
+        else:
+            with cf.ProcessPoolExecutor(
+                max_workers = n_jobs,
+                initializer = init_worker,
+                initargs = (self.ops, names_profiled),
+            ) as executor:
+                yield from _dispatch(executor)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[RecordID, Tree]]:
+        # a generator, so that nothing is set up until the first tree is requested
+        # (`tqdm` calls `iter` on the stage once more than it iterates)
+        desc = "; ".join(self.descs)
+
+        profiler = prof.get_profiler()
+        names_profiled = (
+            [profiler.new_stage(d).name for d in self.descs]
+            # the workers of a given pool are not profiled
+            if profiler and not (self.n_jobs > 1 and self.executor)
+            else None
+        )
+
+        if self.n_jobs > 1:
+            desc = f"{desc} ({self.n_jobs} processes)"
+            trees = self._iter_parallel(names_profiled)
+        else:
+            trees = self._iter_serial(names_profiled)
+
+        if self.progress:
+            trees = tqdm(trees, desc = desc)
+
+        # the overhead of the stage itself, e.g. the communication with the workers
+        yield from prof.wrap_iter(desc, trees)
+
+# ================
+# Particular operations
+# ================
+def _relax(tree: Tree, ID: RecordID) -> None:
+    pass
+
+def _check_comp(tree: Tree, ID: RecordID) -> None:
+    abctk.check_comp_feat.check_comp_feats(
+        abctk.check_comp_feat.collect_comp_feats(
+            tree, ID,
+        ),
+        ID,
+    )
+
+def _restore_traces_in_comp(tree: Tree, ID: RecordID) -> Tree:
+    # imported here as it depends on the CLI modules
+    import abctk.gen_comp
+
+    return abctk.gen_comp.restore_traces_on_demand(tree, ID)
+
+_RE_INSTRUCTION_PLUS = re.compile(r"^\+(?P<feat>.*)$")
+_RE_INSTRUCTION_MINUS = re.compile(r"^0(?P<feat>.*)$")
+def make_filter_annots_visitor(
+    instructions: str = "+*",
+    separator: str = ";",
+) -> TreeVisitor:
+    """
+    Make a visitor that filters (out) meta annotations.
+
+    Parameters
+    ----------
+    instructions
+        Instructions separated with `separator`.
+        Available commands: `+{feat}`, `0{feat}`, `+*`, `0*`.
+    separator
+        The separator used in the instructions.
+    """
+    # Build commands
+    instruction_plus: typing.Optional[typing.Set[str]] = None
+    instruction_minus: typing.Optional[typing.Set[str]] = set()
+
+    for instr in instructions.split(separator):
+        if instr == "+*":
+            instruction_plus = None
+            instruction_minus = set()
+        elif instr == "0*":
+            instruction_plus = set()
+            instruction_minus = None
+        elif (match := _RE_INSTRUCTION_PLUS.match(instr)):
+            key = match.group("feat")
+            if isinstance(instruction_plus, set):
+                instruction_plus.add(key)
+            if isinstance(instruction_minus, set):
+                instruction_minus.remove(key)
+        elif (match := _RE_INSTRUCTION_MINUS.match(instr)):
+            key = match.group("feat")
+            if isinstance(instruction_plus, set):
+                instruction_plus.remove(key)
+            if isinstance(instruction_minus, set):
+                instruction_minus.add(key)
+        else:
+            # default as plus
+            if isinstance(instruction_plus, set):
+                instruction_plus.add(instr)
+            if isinstance(instruction_minus, set):
+                instruction_minus.remove(instr)
+
+    # Exec commands
+    if instruction_plus is None:
+        if instruction_minus is None:
+            raise ValueError("Feature sets cannot be both None")
+        else:
+            return abctk.transform_ABC.norm.DeleteFeatsVisitor(instruction_minus)
+    elif instruction_minus is None:
+        return abctk.transform_ABC.norm.WhiteListFeatsVisitor(instruction_plus)
+    else:
+        raise ValueError("Feature sets cannot be both sets")
+
+def _restore_trace(
+    generous: bool,
+    skip_ill_trees: bool,
+    tree: Tree,
+    ID: RecordID,
+) -> Tree:
+    try:
+        abctk.transform_ABC.elim_trace.restore_rel_trace(
+            tree, ID,
+            generous
+        )
+    except abctk.transform_ABC.elim_trace.ElimTraceException as e:
+        if skip_ill_trees:
+            logger.warning(
+                "An exception was raised by the convertion function. "
+                f"Tree ID: {ID}. "
+                "The tree will be abandoned."
+            )
+            prof.count_skipped()
+        else:
+            logger.error(
+                "An exception was raised by the convertion function. "
+                f"Tree ID: {ID}. "
+                "The process has been aborted."
+            )
+            raise
+    return tree
+
+def _obfuscate_if_matched(
+    matcher: typing.Pattern[str],
+    tree: Tree,
+    ID: RecordID,
+) -> Tree:
+    if matcher.search(ID.name):
+        return abctk.obfuscate.obfuscate_tree_in_place(tree, ID)
+    else:
+        return tree
+
+# ----------------
+# Incorporating comparative annotations
+# ----------------
+def load_comp_annots(
+    comp_file: typing.TextIO,
+    comp_file_format: str = "yaml",
+) -> typing.Dict[RecordID, typing.Any]:
+    """
+    Load comparative annotations indexed by the IDs of the trees.
+
+    Parameters
+    ----------
+    comp_file
+        An opened comparative annotation file.
+    comp_file_format
+        The format of the file, either `yaml` or `jsonl`.
+    """
+    import json
+    import ruamel.yaml
+
+    from abctk.obj.ID import SimpleRecordID
+    from abctk.obj.Keyaki import Keyaki_ID
+    from abctk.obj.comparative import CompRecord, ABCTComp_BCCWJ_ID
+
+    # Load file
+    comp_file_format = comp_file_format.lower()
+
+    comp_annots_raw: typing.Iterator[dict]
+    if comp_file_format == "jsonl":
+        comp_annots_raw = (
+            json.loads(line) for line in comp_file
+        )
+    elif comp_file_format == "yaml":
+        yaml = ruamel.yaml.YAML()
+        comp_annots_raw = (
+            yaml.load(comp_file)
+        )
+    else:
+        logger.error(
+            f"Wrong option for --format: {comp_file_format}. "
+            "Choose between `yaml` and `jsonl`."
+        )
+        raise ValueError
+
+    def _parse_comp_raw(record: dict):
+        ID_raw = record["ID"]
+        ID_parsed = (
+            ABCTComp_BCCWJ_ID.from_string(ID_raw)
+            or Keyaki_ID.from_string(ID_raw)
+            or SimpleRecordID.from_string(ID_raw)
+        )
+
+        return (
+            ID_parsed,
+            CompRecord.from_brackets(
+                line = record["annot"],
+                ID_v1 = record.get("ID_v1"),
+                ID = ID_raw,
+            ).dice()
+        )
+
+    # indexing
+    return dict(_parse_comp_raw(record) for record in comp_annots_raw)
+
+def _incorporate_comps(
+    comp_annots: typing.Mapping[RecordID, typing.Any],
+    tree: Tree,
+    ID: RecordID,
+) -> Tree:
+    from abctk.transform_ABC.incorporate_comp import incorporate_all_comps
+
+    comp_record = comp_annots.get(ID)
+    if comp_record:
+        incorporate_all_comps(
+            comp_record.comp,
+            tree,
+            ID,
+        )
+    else:
+        logger.warning(
+            f"Comparative annotations are not found for the tree (ID: {ID}). "
+            f"This tree will be skipped."
+        )
+    return tree
+
+# ================
+# Registry
+# ================
+class OpSpec(typing.NamedTuple):
+    """
+    An operation registered by the name of its subcommand of `abctk tweak`.
+    """
+
+    make: typing.Callable[..., TreeOp]
+    """
+    Make the operation from whether to skip ill trees
+    and the arguments of the subcommand by the names of its parameters.
+    """
+
+    desc: str
+    """
+    A description of the operation shown in progress bars and profiles.
+    """
+
+    warm_up: typing.Optional[typing.Callable[[], typing.Any]] = None
+    """
+    Load the resources of the operation beforehand, e.g. in worker processes.
+    """
+
+    @classmethod
+    def wrap_modifier(
+        cls,
+        function: typing.Callable[[Tree, str], typing.Any],
+        desc: str,
+        warm_up: typing.Optional[typing.Callable[[], typing.Any]] = None,
+    ) -> "OpSpec":
+        def make(skip_ill_trees: bool) -> TreeOp:
+            return functools.partial(run_modifier, function, skip_ill_trees)
+
+        return cls(make, desc, warm_up)
+
+    @classmethod
+    def wrap_creator(
+        cls,
+        function: typing.Callable[[X, str], X],
+        desc: str,
+    ) -> "OpSpec":
+        def make(skip_ill_trees: bool) -> TreeOp:
+            return functools.partial(run_creator, function, skip_ill_trees)
+
+        return cls(make, desc)
+
+    @classmethod
+    def wrap_rebuilder(
+        cls,
+        function: typing.Callable[..., X],
+        desc: str,
+    ) -> "OpSpec":
+        """
+        Register a creator that takes the :class:`RebuildMode`.
+        The resulting trees are new ones by default.
+        Those who own the trees, e.g. the CLI, can rebuild them in place.
+        """
+        def make(
+            skip_ill_trees: bool,
+            mode: RebuildMode = RebuildMode.COPY,
+        ) -> TreeOp:
+            return functools.partial(
+                run_creator,
+                functools.partial(function, mode = mode),
+                skip_ill_trees,
+            )
+
+        return cls(make, desc)
+
+    @classmethod
+    def wrap_visitor(
+        cls,
+        visitor: typing.Callable[[], TreeVisitor],
+        desc: str,
+    ) -> "OpSpec":
+        """
+        Register a transform declared as a visitor,
+        which can share traversals with the adjacent ones (see :meth:`TreeOpStage.appended`).
+        """
+        def make(skip_ill_trees: bool) -> TreeOp:
+            return VisitorOp((visitor(), ), skip_ill_trees)
+
+        return cls(make, desc)
+
+def _make_restore_trace(skip_ill_trees: bool, generous: bool = False) -> TreeOp:
+    return functools.partial(_restore_trace, generous, skip_ill_trees)
+
+def _make_minimize_tree(
+    skip_ill_trees: bool,
+    discard_trace: bool = True,
+    reduction_check: bool = True,
+) -> TreeOp:
+    return functools.partial(
+        run_modifier,
+        functools.partial(
+            abctk.transform_ABC.norm.minimize_tree,
+            discard_trace = discard_trace,
+            reduction_check = reduction_check,
+        ),
+        skip_ill_trees,
+    )
+
+def _make_filter_annots(
+    skip_ill_trees: bool,
+    instructions: str = "+*",
+    separator: str = ";",
+) -> TreeOp:
+    return VisitorOp(
+        (make_filter_annots_visitor(instructions, separator), ),
+        skip_ill_trees,
+    )
+
+def _make_obfuscate_tree(skip_ill_trees: bool, filter: str = "closed") -> TreeOp:
+    return functools.partial(
+        run_creator,
+        functools.partial(_obfuscate_if_matched, re.compile(filter)),
+        skip_ill_trees,
+    )
+
+def _make_incorporate_comps(
+    skip_ill_trees: bool,
+    comp_file: typing.TextIO,
+    comp_file_format: str = "yaml",
+) -> TreeOp:
+    return functools.partial(
+        _incorporate_comps,
+        load_comp_annots(comp_file, comp_file_format),
+    )
+
+OPS: typing.Dict[str, OpSpec] = {
+    "relax": OpSpec.wrap_modifier(
+        _relax,
+        "Running relax",
+    ),
+    "parse-ABC-cats": OpSpec.wrap_modifier(
+        nt.parse_all_labels_ABC,
+        "Parsing ABC cats",
+    ),
+    "check-comp": OpSpec.wrap_modifier(
+        _check_comp,
+        "Checking #comp",
+    ),
+    "collapse-unary-nodes": OpSpec.wrap_rebuilder(
+        abctk.transform_ABC.unary.collapse_unary_nodes,
+        "Collapsing unaries",
+    ),
+    "restore-unary-nodes": OpSpec.wrap_rebuilder(
+        abctk.transform_ABC.unary.restore_unary_nodes,
+        "Restoring unaries",
+    ),
+    "bin-conj": OpSpec.wrap_rebuilder(
+        abctk.transform_ABC.binconj.binarize_conj_tree,
+        "Binarizing CONJPs",
+    ),
+    "elim-empty": OpSpec.wrap_modifier(
+        abctk.transform_ABC.elim_empty.elim_empty_terminals,
+        "Del'ing * and __",
+    ),
+    "restore-trace": OpSpec(
+        _make_restore_trace,
+        "Restoring *T*",
+    ),
+    "restore-trace-in-comp": OpSpec.wrap_creator(
+        _restore_traces_in_comp,
+        "Restoring *T* and *pro* in #comp",
+    ),
+    "janome": OpSpec.wrap_modifier(
+        abctk.transform_ABC.morph_janome.add_morph_janome,
+        "Adding Janome analyses",
+        warm_up = abctk.transform_ABC.morph_janome.get_analyzer,
+    ),
+    "del-janome": OpSpec.wrap_visitor(
+        abctk.transform_ABC.morph_janome.DelJanomeVisitor,
+        "Del'ing Janome analyses",
+    ),
+    "min-nodes": OpSpec(
+        _make_minimize_tree,
+        "Minimizing annotations",
+    ),
+    "filter-annots": OpSpec(
+        _make_filter_annots,
+        "Filtering annotations",
+    ),
+    "elab-cat-annots": OpSpec.wrap_modifier(
+        abctk.transform_ABC.norm.elaborate_cat_annotations,
+        "Elaborating category-related annotations",
+    ),
+    "elab-char-spans": OpSpec.wrap_modifier(
+        abctk.transform_ABC.norm.elaborate_char_spans,
+        "Elaborating char span annotations",
+    ),
+    "obfus": OpSpec(
+        _make_obfuscate_tree,
+        "Obfuscate trees",
+    ),
+    "incorp-comps": OpSpec(
+        _make_incorporate_comps,
+        "Incorporating comparative annotations",
+    ),
+}
+"""
+The operations on single trees by the names of the subcommands of `abctk tweak`.
+"""
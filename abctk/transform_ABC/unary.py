@@ -2,112 +2,145 @@ import logging
 
 from abctk.obj.ABCCat import Annot
 logger = logging.getLogger(__name__)
-from typing import Union, TypeVar
+from typing import Union, TypeVar, List, Any
 
 from nltk.tree import Tree
 from abctk.obj.ID import RecordID
+from abctk.transform_ABC.visitor import RebuildMode, rebuild_node, rewrite_tree
+
+_UNARY_DELIM = "☆"
+"""
+The delimiter of the labels of collapsed unary nodes.
+"""
 
 X = TypeVar("X")
 def collapse_unary_nodes(
     tree: X,
     ID: Union[RecordID, str] = "<UNKNOWN>",
+    mode: RebuildMode = RebuildMode.COPY,
 ) -> X:
-    if isinstance(tree, Tree):
-        if len(tree) == 1:
-            only_child = collapse_unary_nodes(tree[0], ID)
+    """
+    Collapse each chain of unary nodes into a single node
+    labeled with their labels joined by ☆.
 
-            if isinstance(only_child, Tree):
-                node_collapsed = f"{tree.label()}☆{only_child.label()}"
+    Parameters
+    ----------
+    tree
+    ID
+    mode
+        How the nodes of the result are made. See :class:`abctk.transform_ABC.visitor.RebuildMode`.
+        With :attr:`~abctk.transform_ABC.visitor.RebuildMode.SHARE`,
+        only the nodes on the paths to the collapsed chains are made anew.
+        With :attr:`~abctk.transform_ABC.visitor.RebuildMode.IN_PLACE`,
+        the given tree is tampered and no node is made.
+    """
+    return rewrite_tree(
+        tree,
+        lambda node, children: _collapse_unary_node(node, children, mode),
+    )
 
-                return tree.__class__(
-                    node = node_collapsed,
-                    children = [collapse_unary_nodes(child, ID) for child in only_child]
-                )
+def _collapse_unary_node(
+    tree: Tree,
+    children: List[Any],
+    mode: RebuildMode,
+) -> Tree:
+    if len(children) == 1:
+        only_child = children[0]
+
+        if isinstance(only_child, Tree):
+            node_collapsed = f"{tree.label()}{_UNARY_DELIM}{only_child.label()}"
+
+            if mode is RebuildMode.IN_PLACE:
+                tree.set_label(node_collapsed)
+                tree[:] = list(only_child)
+                return tree
             else:
                 return tree.__class__(
-                    node = tree.label(),
-                    children = [only_child]
+                    node = node_collapsed,
+                    children = list(only_child)
                 )
-        else:
-            return tree.__class__(
-                node = tree.label(),
-                children = [collapse_unary_nodes(child, ID) for child in tree]
-            )
-    else:
-        return tree
-    
+        # === END IF ===
+    # === END IF ===
+
+    return rebuild_node(tree, children, mode)
+
+def is_collapsed_label(cat: Any) -> bool:
+    """
+    Check if a label (or the category of an :class:`Annot`)
+    is that of collapsed unary nodes.
+    A ☆ at the beginning does not count as a delimiter.
+    """
+    return isinstance(cat, str) and cat.find(_UNARY_DELIM, 1) > 0
+
 def restore_unary_nodes(
     tree,
     ID: Union[RecordID, str] = "<UNKNOWN>",
+    mode: RebuildMode = RebuildMode.COPY,
 ) -> Tree:
-    if isinstance(tree, Tree):
-        label: Union[str, Annot[str]] = tree.label()
-
-        if isinstance(label, Annot):
-            cat = label.cat
-            if cat.find("☆", 1):
-                unary_cats = cat.split("☆")
-
-                if len(unary_cats) > 0:
-                    unarized_tree = tree.__class__(
-                        node = Annot(
-                            cat = unary_cats.pop(),
-                            feats = label.feats,
-                            pprinter_cat = label.pprinter_cat,
-                        ),
-                        children = [
-                            restore_unary_nodes(child, ID) 
-                            for child in tree
-                        ]
-                    )
-
-                    while unary_cats:
-                        unarized_tree = tree.__class__(
-                            node = Annot(
-                                cat = unary_cats.pop(),
-                                feats = label.feats,
-                                pprinter_cat = label.pprinter_cat,
-                            ),
-                            children = [unarized_tree]
-                        )
-
-                    return unarized_tree
-                else:
-                    return tree.__class__(
-                        node = label,
-                        children = [restore_unary_nodes(child, ID) for child in tree],
-                    )
-            else:
-                return tree.__class__(
-                    node = label,
-                    children = [restore_unary_nodes(child, ID) for child in tree]
-                )
-        else:
-            if label.find("☆", 1):
-                unary_nodes = label.split("☆")
-
-                if len(unary_nodes) > 0:
-                    unarized_tree = tree.__class__(
-                        node = unary_nodes.pop(),
-                        children = [restore_unary_nodes(child, ID) for child in tree]
-                    )
-
-                    while unary_nodes:
-                        unarized_tree = tree.__class__(
-                            node = unary_nodes.pop(),
-                            children = [unarized_tree]
-                        )
-
-                    return unarized_tree
-                else:
-                    return tree.__class__(
-                        node = label,
-                        children = [restore_unary_nodes(child, ID) for child in tree],
-                    )
-            else:
-                return tree.__class__(
-                    node = label,
-                    children = [restore_unary_nodes(child, ID) for child in tree]
-                )
+    """
+    Restore the unary nodes collapsed by :func:`collapse_unary_nodes`.
+    The restored nodes of an :class:`Annot` label share its features.
+
+    Parameters
+    ----------
+    tree
+    ID
+    mode
+        How the nodes of the result are made. See :class:`abctk.transform_ABC.visitor.RebuildMode`.
+        With :attr:`~abctk.transform_ABC.visitor.RebuildMode.SHARE`,
+        only the nodes on the paths to the collapsed nodes are made anew.
+        With :attr:`~abctk.transform_ABC.visitor.RebuildMode.IN_PLACE`,
+        the given tree is tampered and only the restored unary nodes are made.
+    """
+    return rewrite_tree(
+        tree,
+        lambda node, children: _restore_unary_node(node, children, mode),
+    )
+
+def _restore_unary_node(
+    tree: Tree,
+    children: List[Any],
+    mode: RebuildMode,
+) -> Tree:
+    label: Union[str, Annot[str]] = tree.label()
+
+    if isinstance(label, Annot):
+        if not is_collapsed_label(label.cat):
+            return rebuild_node(tree, children, mode)
+
+        unary_labels = [
+            Annot(
+                cat = cat,
+                feats = label.feats,
+                pprinter_cat = label.pprinter_cat,
+            )
+            for cat in label.cat.split(_UNARY_DELIM)
+        ]
+    else:
+        if not is_collapsed_label(label):
+            return rebuild_node(tree, children, mode)
+
+        unary_labels = label.split(_UNARY_DELIM)
+    # === END IF ===
+
+    unarized_tree = tree.__class__(
+        node = unary_labels.pop(),
+        children = children,
+    )
+
+    while len(unary_labels) > 1:
+        unarized_tree = tree.__class__(
+            node = unary_labels.pop(),
+            children = [unarized_tree]
+        )
+
+    # the topmost node
+    if mode is RebuildMode.IN_PLACE:
+        tree.set_label(unary_labels.pop())
+        tree[:] = [unarized_tree]
+        return tree
     else:
-        return tree
\ No newline at end of file
+        return tree.__class__(
+            node = unary_labels.pop(),
+            children = [unarized_tree]
+        )
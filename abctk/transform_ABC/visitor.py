@@ -0,0 +1,318 @@
+"""
+Tree transforms declared as visitors,
+so that consecutive transforms can be fused into a single traversal of a tree.
+
+A :class:`TreeVisitor` declares either or both of the following:
+
+``visit(node)``
+    A rewrite of the label of the node alone, independent of the traversal.
+``run_alone(tree, ID)``
+    The transform of a whole tree.
+
+Consecutive visitors with `visit` share a traversal (see :class:`FusedTraversal`).
+Transforms that need the traversal itself,
+e.g. bottom-up computations (`min-nodes`, `elab-cat-annots`)
+or those skipping subtrees (`elab-char-spans`), are not visitors.
+They could not share a traversal anyway
+without a pre-order step of one seeing a node
+before the post-order step of a preceding one has rewritten it,
+and hooks called by a generic traversal cost as much as the walks they would save.
+
+The traversals are driven by explicit stacks instead of recursion,
+so that deep trees (e.g. long chains of coordination) do not hit the recursion limit.
+The same engine is available to single transforms:
+:func:`iter_nodes` (pre-order walks), :func:`fold_tree` (bottom-up computations)
+and :func:`rewrite_tree` (rebuilding trees, in situ or not).
+"""
+
+import enum
+import operator
+import typing
+
+from nltk.tree import Tree
+
+X = typing.TypeVar("X")
+
+# ================
+# Explicit-stack traversals
+# ================
+def iter_nodes(tree: typing.Any) -> typing.Iterator[Tree]:
+    """
+    Iterate over the nodes (not the terminals) of a tree in pre-order.
+
+    The children of a node are looked up after the node is yielded,
+    so they may be rewritten by the consumer before they are visited.
+    """
+    if not isinstance(tree, Tree):
+        return
+
+    yield tree
+    # the remaining children of the ancestors
+    stack = [iter(tree)]
+    while stack:
+        for child in stack[-1]:
+            if isinstance(child, Tree):
+                yield child
+                stack.append(iter(child))
+                break
+        else:
+            stack.pop()
+
+def fold_tree(
+    tree: typing.Any,
+    post: typing.Callable[[Tree, typing.List[typing.Any]], X],
+    leaf: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+    pre: typing.Optional[typing.Callable[[Tree], typing.Optional[bool]]] = None,
+    pruned: typing.Optional[typing.Callable[[Tree], typing.Any]] = None,
+) -> typing.Any:
+    """
+    Compute a value of a tree bottom-up with an explicit stack.
+
+    Parameters
+    ----------
+    tree
+    post
+        Post-order. Takes a node and the values of its children
+        and gives the value of the node.
+    leaf
+        The value of a terminal. Defaults to the terminal itself.
+    pre
+        Pre-order. Returning ``False`` skips the subtree.
+        The children of a node are taken after this hook,
+        which may thus rewrite them.
+    pruned
+        The value of a node whose subtree is skipped by `pre`.
+        Defaults to the node itself.
+
+    Returns
+    -------
+    value
+        The value of `tree`.
+    """
+    if not isinstance(tree, Tree):
+        return leaf(tree) if leaf is not None else tree
+
+    if pre is not None and pre(tree) is False:
+        return pruned(tree) if pruned is not None else tree
+
+    # the current node, its remaining children and the values of the children so far
+    node, children, values = tree, iter(tree), []
+    # those of the ancestors
+    stack: typing.List[tuple] = []
+    while True:
+        for child in children:
+            if not isinstance(child, Tree):
+                values.append(leaf(child) if leaf is not None else child)
+            elif pre is not None and pre(child) is False:
+                values.append(pruned(child) if pruned is not None else child)
+            else:
+                stack.append((node, children, values))
+                node, children, values = child, iter(child), []
+                break
+        else:
+            value = post(node, values)
+            if not stack:
+                return value
+            node, children, values = stack.pop()
+            values.append(value)
+    # === END WHILE ===
+
+class RebuildMode(enum.Enum):
+    """
+    How :func:`rewrite_tree` makes the nodes of the result.
+    """
+
+    COPY = "copy"
+    """
+    Every node is made anew.
+    """
+
+    SHARE = "share"
+    """
+    Nodes whose children are all kept are reused as they are,
+    so that the result shares the untouched subtrees with the given tree.
+    """
+
+    IN_PLACE = "in-place"
+    """
+    Nodes whose children are changed are modified in situ.
+    """
+
+def _rebuild_copy(node: Tree, children: typing.List[typing.Any]) -> Tree:
+    return node.__class__(node.label(), children)
+
+def _rebuild_share(node: Tree, children: typing.List[typing.Any]) -> Tree:
+    if len(children) == len(node) and not any(
+        map(operator.is_not, children, node)
+    ):
+        return node
+    else:
+        return node.__class__(node.label(), children)
+
+def _rebuild_in_place(node: Tree, children: typing.List[typing.Any]) -> Tree:
+    if len(children) != len(node) or any(
+        map(operator.is_not, children, node)
+    ):
+        node[:] = children
+    return node
+
+_REBUILDERS: typing.Dict[
+    RebuildMode,
+    typing.Callable[[Tree, typing.List[typing.Any]], Tree]
+] = {
+    RebuildMode.COPY: _rebuild_copy,
+    RebuildMode.SHARE: _rebuild_share,
+    RebuildMode.IN_PLACE: _rebuild_in_place,
+}
+
+def rebuild_node(
+    node: Tree,
+    children: typing.List[typing.Any],
+    mode: RebuildMode = RebuildMode.COPY,
+) -> Tree:
+    """
+    Make a node with the label of `node` and new `children` in the given mode.
+    """
+    return _REBUILDERS[mode](node, children)
+
+def rewrite_tree(
+    tree: typing.Any,
+    rebuild: typing.Optional[typing.Callable[[Tree, typing.List[typing.Any]], typing.Any]] = None,
+    leaf: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+    pre: typing.Optional[typing.Callable[[Tree], typing.Optional[bool]]] = None,
+    mode: RebuildMode = RebuildMode.COPY,
+) -> typing.Any:
+    """
+    Rewrite a tree bottom-up with an explicit stack.
+
+    Parameters
+    ----------
+    tree
+    rebuild
+        Post-order. Takes a node and its rewritten children
+        and gives the rewritten node.
+        Defaults to :func:`rebuild_node` in `mode`.
+    leaf
+        The rewrite of a terminal. Defaults to the terminal itself.
+    pre
+        Pre-order. Returning ``False`` keeps the subtree as it is.
+        See :func:`fold_tree`.
+    mode
+        See :class:`RebuildMode`.
+
+    Returns
+    -------
+    tree
+        The rewritten tree.
+    """
+    if rebuild is None:
+        rebuild = _REBUILDERS[mode]
+
+    return fold_tree(tree, rebuild, leaf, pre)
+
+# ================
+# Visitors
+# ================
+class TreeVisitor:
+    """
+    The base of visitors.
+    Hooks that are not defined are set to None.
+    """
+
+    visit: typing.Optional[typing.Callable[[Tree], None]] = None
+    """
+    A rewrite of a single node, which only reads and writes the node it is given.
+    Consecutive visitors with it share a traversal.
+    """
+
+    run_alone: typing.Optional[typing.Callable[[Tree, typing.Any], typing.Any]] = None
+    """
+    A direct implementation of the transform of a whole tree,
+    used when the visitor has a traversal to itself.
+    Visitors without `visit` must have it.
+    """
+
+def plan_passes(
+    visitors: typing.Sequence[TreeVisitor],
+) -> typing.List[typing.List[TreeVisitor]]:
+    """
+    Split a sequence of visitors into passes that can each share a traversal,
+    i.e. runs of visitors with `visit` and the other visitors one by one.
+    """
+    passes: typing.List[typing.List[TreeVisitor]] = []
+    current: typing.List[TreeVisitor] = []
+
+    for v in visitors:
+        if v.visit is not None:
+            current.append(v)
+        else:
+            if v.run_alone is None:
+                raise TypeError(f"{v!r} has neither `visit` nor `run_alone`")
+            if current:
+                passes.append(current)
+                current = []
+            passes.append([v])
+
+    if current:
+        passes.append(current)
+
+    return passes
+
+class _Pass:
+    """
+    The rewrites of single nodes by visitors sharing a traversal.
+    Running them one after another on each node
+    gives the same result as running them one after another on the whole tree,
+    since each of them only touches the node it is given.
+    """
+
+    def __init__(self, visitors: typing.Sequence[TreeVisitor]):
+        self.visitors = tuple(visitors)
+        self.visits = tuple(
+            v.visit for v in self.visitors if v.visit is not None
+        )
+
+    def run(self, tree: Tree, ID: typing.Any) -> None:
+        visits = self.visits
+        for node in iter_nodes(tree):
+            for f in visits:
+                f(node)
+
+class FusedTraversal:
+    """
+    Run visitors over trees with as few traversals as possible.
+    The result is the same as running the visitors one after another.
+
+    Consecutive rewrites of single nodes (`visit`) are fused together.
+    The other visitors, as well as a `visit` visitor left alone,
+    run their `run_alone`.
+
+    Parameters
+    ----------
+    visitors
+        The visitors, which are reused across trees.
+    """
+
+    def __init__(self, visitors: typing.Sequence[TreeVisitor]):
+        self.visitors = tuple(visitors)
+        self.passes: typing.List[typing.Callable[[Tree, typing.Any], typing.Any]] = [
+            p[0].run_alone
+            if len(p) == 1 and p[0].run_alone is not None
+            else _Pass(p).run
+            for p in plan_passes(self.visitors)
+        ]
+
+    def __call__(self, tree: Tree, ID: typing.Any = "<UNKNOWN>") -> Tree:
+        """
+        Modify `tree` in situ and return it.
+        """
+        for run in self.passes:
+            run(tree, ID)
+        return tree
+
+    def __getstate__(self):
+        # the passes are bound methods; rebuild them instead
+        return self.visitors
+
+    def __setstate__(self, visitors):
+        self.__init__(visitors)
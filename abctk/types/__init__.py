@@ -10,6 +10,15 @@ from .core import (
     treeIDstr_to_path_default,
 )
 
+from .compact import (
+    LabelTable,
+    CompactTypedTree,
+    compact_index,
+    expand_index,
+    compact_treebank,
+    expand_treebank,
+)
+
 from .real import (
     ABCDepMarking,
     ABCCatPlus,
@@ -0,0 +1,367 @@
+"""
+An array-backed representation of :class:`TypedTree` s.
+
+A :class:`CompactTypedTree` stores a tree as parallel arrays over its nodes in the preorder:
+the IDs of the labels interned in a :class:`LabelTable`,
+the positions of the parents,
+and the ends of the subtrees (the children of a node are found by jumping over the subtrees).
+A treebank of millions of nodes thus takes a few integers per node
+instead of a Python object with a list per node.
+Traversals, :meth:`CompactTypedTree.fmap` and :meth:`CompactTypedTree.fold`
+run as loops over the arrays.
+"""
+
+import array
+import typing
+
+import attr
+
+from .core import (
+    NT, T, NT_or_T, _NT_new, _T_new, _X1,
+    TypedTree,
+    TypedTreeIndex,
+    TypedTreebank,
+    IPrettyPrintable,
+)
+
+_I = typing.TypeVar("_I", bound = typing.Hashable)
+
+class LabelTable(typing.Generic[NT, T]):
+    """
+    A table of interned labels, shared among :class:`CompactTypedTree` s.
+    Unhashable labels are stored without interning.
+    """
+
+    def __init__(self) -> None:
+        self.labels: typing.List[NT_or_T] = []
+        self._IDs: typing.Dict[NT_or_T, int] = {}
+
+    def intern(self, label: NT_or_T) -> int:
+        try:
+            return self._IDs[label]
+        except KeyError:
+            ID = len(self.labels)
+            self.labels.append(label)
+            self._IDs[label] = ID
+            return ID
+        except TypeError:
+            # unhashable
+            self.labels.append(label)
+            return len(self.labels) - 1
+
+    def __getitem__(self, ID: int) -> NT_or_T:
+        return self.labels[ID]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+@attr.s(
+    auto_attribs = True,
+    slots = True,
+    eq = False,
+)
+class CompactTypedTree(
+    typing.Generic[NT, T],
+    IPrettyPrintable,
+):
+    """
+    An array-backed counterpart of :class:`TypedTree`.
+    Instances should be treated as immutable, since arrays are shared among them.
+    """
+
+    table: LabelTable[NT, T]
+    labels: "array.array[int]"
+    """
+    The IDs of the labels of the nodes in the preorder.
+    """
+    parents: "array.array[int]"
+    """
+    The position of the parent of each node, or -1 for the root.
+    """
+    ends: "array.array[int]"
+    """
+    The position right after the subtree of each node.
+    A node is terminal iff its end is right after itself.
+    """
+
+    @classmethod
+    def from_typed_tree(
+        cls,
+        tree: TypedTree[NT, T],
+        table: typing.Optional[LabelTable[NT, T]] = None,
+    ) -> "CompactTypedTree[NT, T]":
+        """
+        Convert a :class:`TypedTree`.
+
+        Parameters
+        ----------
+        tree
+        table
+            The label table to intern labels into.
+            Trees of a treebank should share one table.
+        """
+        if table is None:
+            table = LabelTable()
+        intern = table.intern
+
+        labels = array.array("l")
+        parents = array.array("l")
+        ends = array.array("l")
+        # the positions of the open nodes
+        opened: typing.List[int] = []
+
+        stack: typing.List[typing.Tuple[TypedTree[NT, T], int]] = [(tree, -1)]
+        while stack:
+            node, parent = stack.pop()
+            pos = len(labels)
+
+            # close the subtrees that end here
+            while opened and opened[-1] != parent:
+                ends[opened.pop()] = pos
+
+            labels.append(intern(node.root))
+            parents.append(parent)
+            ends.append(0)
+            opened.append(pos)
+            stack.extend(
+                (child, pos) for child in reversed(node.children)
+            )
+
+        size = len(labels)
+        for pos in opened:
+            ends[pos] = size
+
+        return cls(table, labels, parents, ends)
+
+    def to_typed_tree(self) -> TypedTree[NT, T]:
+        """
+        Convert back to a :class:`TypedTree`.
+        """
+        table_labels = self.table.labels
+        parents = self.parents
+        nodes: typing.List[TypedTree[NT, T]] = [
+            TypedTree(table_labels[ID], [])
+            for ID in self.labels
+        ]
+        for pos in range(1, len(nodes)):
+            typing.cast(
+                typing.List[TypedTree[NT, T]],
+                nodes[parents[pos]].children,
+            ).append(nodes[pos])
+
+        return nodes[0]
+
+    def __len__(self) -> int:
+        """
+        The number of nodes.
+        """
+        return len(self.labels)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactTypedTree):
+            return NotImplemented
+        return (
+            self.parents == other.parents
+            and all(
+                self.table[i] == other.table[j]
+                for i, j in zip(self.labels, other.labels)
+            )
+        )
+
+    @property
+    def root(self) -> NT_or_T:
+        return self.table[self.labels[0]]
+
+    def is_terminal(self) -> bool:
+        return len(self.labels) == 1
+
+    def iter_children_pos(self, pos: int) -> typing.Iterator[int]:
+        """
+        Iterate the positions of the children of the node at `pos`.
+        """
+        ends = self.ends
+        child = pos + 1
+        end = ends[pos]
+        while child < end:
+            yield child
+            child = ends[child]
+
+    def iter_df_topdown(
+        self,
+        include_term: bool = True,
+    ) -> typing.Iterator[NT_or_T]:
+        """
+        Iterate nodes in a depth-first, top-down (parents before children) way.
+        """
+        table_labels = self.table.labels
+        if include_term:
+            for ID in self.labels:
+                yield table_labels[ID]
+        else:
+            ends = self.ends
+            for pos, ID in enumerate(self.labels):
+                if ends[pos] != pos + 1:
+                    yield table_labels[ID]
+
+    def iter_df_bottomup(
+        self,
+        include_term: bool = True,
+    ) -> typing.Iterator[NT_or_T]:
+        """
+        Iterate nodes in a depth-first, bottom-up (children before parents) way.
+        As :meth:`TypedTree.iter_df_bottomup`, terminals are yielded regardless of `include_term`.
+        """
+        table_labels = self.table.labels
+        labels = self.labels
+        ends = self.ends
+        opened: typing.List[int] = []
+
+        for pos in range(len(labels)):
+            while opened and ends[opened[-1]] <= pos:
+                yield table_labels[labels[opened.pop()]]
+            opened.append(pos)
+
+        while opened:
+            yield table_labels[labels[opened.pop()]]
+
+    def iter_nonterms(self) -> typing.Iterator[NT_or_T]:
+        """
+        Iterate non-terminal nodes in a depth-first, top-down way.
+        """
+        return self.iter_df_topdown(include_term = False)
+
+    def iter_terms(self) -> typing.Iterator[NT_or_T]:
+        """
+        Iterate terminal nodes, left to right.
+        """
+        table_labels = self.table.labels
+        ends = self.ends
+        for pos, ID in enumerate(self.labels):
+            if ends[pos] == pos + 1:
+                yield table_labels[ID]
+
+    def fmap(
+        self,
+        func_nonterm: typing.Optional[typing.Callable[[NT_or_T], _NT_new]] = None,
+        func_term: typing.Optional[typing.Callable[[NT_or_T], _T_new]] = None,
+        table: typing.Optional[LabelTable[_NT_new, _T_new]] = None,
+    ) -> "CompactTypedTree[_NT_new, _T_new]":
+        """
+        Transform each non-terminal and terminal node by a given function.
+        The shape arrays are shared with the new tree.
+
+        .. note::
+            The functions are called once per distinct label and kind of nodes,
+            so they should be pure.
+
+        Parameters
+        ----------
+        func_nonterm
+        func_term
+        table
+            The label table of the new tree.
+            A new one is created if not given.
+        """
+        if table is None:
+            table = LabelTable()
+        intern = table.intern
+        table_labels = self.table.labels
+        ends = self.ends
+
+        memo: typing.Dict[typing.Tuple[int, bool], int] = {}
+        labels_new = array.array("l")
+        for pos, ID in enumerate(self.labels):
+            is_term = ends[pos] == pos + 1
+            try:
+                ID_new = memo[ID, is_term]
+            except KeyError:
+                label = table_labels[ID]
+                func = func_term if is_term else func_nonterm
+                ID_new = intern(func(label) if func else label)
+                memo[ID, is_term] = ID_new
+            labels_new.append(ID_new)
+
+        return CompactTypedTree(table, labels_new, self.parents, ends)
+
+    def fold(
+        self, func: typing.Callable[[NT_or_T, typing.Iterable[_X1]], _X1]
+    ) -> _X1:
+        """
+        Fold the tree bottom-up.
+        The nodes are visited in the reverse preorder,
+        where children always come before their parents.
+        """
+        table_labels = self.table.labels
+        labels = self.labels
+        ends = self.ends
+        results: typing.List[typing.Any] = [None] * len(labels)
+
+        for pos in range(len(labels) - 1, -1, -1):
+            children_folded = []
+            child = pos + 1
+            end = ends[pos]
+            while child < end:
+                children_folded.append(results[child])
+                results[child] = None
+                child = ends[child]
+
+            results[pos] = func(table_labels[labels[pos]], children_folded)
+
+        return results[0]
+
+    def pprint(self, **kwargs) -> str:
+        return self.to_typed_tree().pprint(**kwargs)
+
+    def __str__(self) -> str:
+        return self.pprint(is_oneline = True)
+
+def compact_index(
+    index: TypedTreeIndex[_I, NT, T],
+    table: typing.Optional[LabelTable[NT, T]] = None,
+) -> typing.Dict[_I, CompactTypedTree[NT, T]]:
+    """
+    Convert all the trees of an index, sharing a label table.
+    """
+    if table is None:
+        table = LabelTable()
+
+    return {
+        ID: CompactTypedTree.from_typed_tree(tree, table)
+        for ID, tree in index.items()
+    }
+
+def expand_index(
+    index: typing.Mapping[_I, CompactTypedTree[NT, T]],
+) -> typing.Dict[_I, TypedTree[NT, T]]:
+    return {
+        ID: tree.to_typed_tree()
+        for ID, tree in index.items()
+    }
+
+def compact_treebank(
+    treebank: TypedTreebank,
+) -> TypedTreebank:
+    """
+    Make a treebank with the trees converted to :class:`CompactTypedTree` s.
+    """
+    # the trees are kept in the compact representation in place of TypedTrees
+    return attr.evolve(
+        treebank,
+        index = typing.cast(TypedTreeIndex, compact_index(treebank.index)),
+    )
+
+def expand_treebank(
+    treebank: TypedTreebank,
+) -> TypedTreebank:
+    """
+    Make a treebank with the trees converted back to :class:`TypedTree` s.
+    """
+    return attr.evolve(
+        treebank,
+        index = expand_index(
+            typing.cast(
+                typing.Mapping[typing.Any, CompactTypedTree],
+                treebank.index,
+            )
+        ),
+    )
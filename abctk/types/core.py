@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import array
 import collections
 import concurrent.futures as cf
 import enum
@@ -283,6 +284,34 @@ class TypedTree(
         )
     # === END ===
 
+    _PTB_token: typing.ClassVar[typing.Pattern] = re.compile(r"[()]|[^\s()]+")
+    _PTB_block_size: typing.ClassVar[int] = 1024 * 1024
+
+    @classmethod
+    def _iter_PTB_blocks(
+        cls,
+        source: typing.Union[typing.TextIO, typing.Iterable[str]],
+    ) -> typing.Iterator[str]:
+        """
+        Read a stream in large blocks cut at line breaks,
+        so that no token straddles two blocks.
+        """
+        if not hasattr(source, "read"):
+            yield from source
+            return
+
+        rest = ""
+        while (chunk := source.read(cls._PTB_block_size)):
+            cut = chunk.rfind("\n") + 1
+            if cut:
+                yield rest + chunk[:cut]
+                rest = chunk[cut:]
+            else:
+                rest += chunk
+        if rest:
+            yield rest
+    # === END ===
+
     @classmethod
     def _parse_PTB_stream(
         cls,
@@ -291,9 +320,100 @@ class TypedTree(
         need_EOF: bool = False,
     ) -> typing.Iterator[
         "TypedTree[str, str]"
+    ]:
+        """
+        A parser of penn treebank trees.
+
+        Tokens are scanned with one regex call per block of the source
+        and trees are built bottom-up with an explicit stack of open nodes.
+        The grammar and the errors are the same as :meth:`_parse_PTB_stream_LL1`.
+
+        Parameters
+        ----------
+        source
+        many
+            If True, yield all the trees until EOF.
+            Otherwise, yield only the first tree
+            and leave the lines after it unconsumed.
+        need_EOF
+            If True and `many` is False,
+            raise a ValueError if there are tokens after the first tree.
+
+        Raises
+        ------
+        EOFError
+            If the stream ends in the middle of a tree,
+            or if it contains no tree while `many` is False.
+        ValueError
+            If an extra `)` is found.
+        """
+        findall = cls._PTB_token.findall
+        blocks = iter(
+            cls._iter_PTB_blocks(source) if many
+            else source # line by line
+        )
+
+        # the labels and the children of the open nodes
+        stack_labels: typing.List[str] = []
+        stack_children: typing.List[typing.List[TypedTree[str, str]]] = []
+        children: typing.List[TypedTree[str, str]] = []
+        expecting_label = False
+
+        for block in blocks:
+            tokens = findall(block)
+            for i, token in enumerate(tokens):
+                if token == "(":
+                    stack_labels.append("")
+                    stack_children.append(children)
+                    children = []
+                    expecting_label = True
+                    continue
+                elif token == ")":
+                    if not stack_labels:
+                        raise ValueError("Extra ')'!")
+                    tree = TypedTree(stack_labels.pop(), children)
+                    children = stack_children.pop()
+                    expecting_label = False
+                elif expecting_label:
+                    stack_labels[-1] = token
+                    expecting_label = False
+                    continue
+                else:
+                    tree = TypedTree(token, [])
+
+                if stack_labels:
+                    children.append(tree)
+                elif many:
+                    yield tree
+                else:
+                    yield tree
+
+                    if need_EOF and (
+                        i + 1 < len(tokens)
+                        or any(map(findall, blocks))
+                    ):
+                        raise ValueError("trailing tokens")
+                    return
+            # === END FOR token ===
+        # === END FOR block ===
+
+        if stack_labels or not many:
+            # End of stream in the middle of a tree
+            raise EOFError
+    # === END ===
+
+    @classmethod
+    def _parse_PTB_stream_LL1(
+        cls,
+        source: typing.TextIO,
+        many: bool = False,
+        need_EOF: bool = False,
+    ) -> typing.Iterator[
+        "TypedTree[str, str]"
     ]:
         """
         An LL(1) parser of penn treebank trees.
+        Superseded by :meth:`_parse_PTB_stream` and kept as the reference implementation.
         """
         # 1. Tokenization
         tokens = more_itertools.peekable(
@@ -635,38 +755,169 @@ def sample_from_TypedTreeIndex(
         k = k,
     )
 
+class _EncodedTrees(typing.NamedTuple):
+    """
+    Trees with string labels encoded in flat arrays,
+    which are far cheaper to pickle than :class:`TypedTree` objects.
+    """
+    labels: typing.List[str]
+    """
+    The labels of all the nodes in the preorder.
+    Equal labels share the same string object.
+    """
+    parents: "array.array[int]"
+    """
+    The index of the parent of each node, or -1 for the roots.
+    """
+    offsets: "array.array[int]"
+    """
+    The index of the root of each tree, followed by the number of all the nodes.
+    """
+
+def _encode_trees(
+    trees: typing.Iterable[TypedTree[str, str]],
+) -> _EncodedTrees:
+    labels: typing.List[str] = []
+    parents = array.array("l")
+    offsets = array.array("l")
+    labels_interned: typing.Dict[str, str] = {}
+    intern = labels_interned.setdefault
+
+    for tree in trees:
+        offsets.append(len(labels))
+        stack: typing.List[typing.Tuple[TypedTree[str, str], int]] = [(tree, -1)]
+        while stack:
+            node, parent = stack.pop()
+            pos = len(labels)
+            labels.append(intern(node.root, node.root))
+            parents.append(parent)
+            stack.extend(
+                (child, pos) for child in reversed(node.children)
+            )
+    offsets.append(len(labels))
+
+    return _EncodedTrees(labels, parents, offsets)
+
+def _decode_tree(
+    encoded: _EncodedTrees,
+    num: int,
+) -> TypedTree[str, str]:
+    start = encoded.offsets[num]
+    end = encoded.offsets[num + 1]
+    parents = encoded.parents
+
+    nodes: typing.List[TypedTree[str, str]] = [
+        TypedTree(label, []) 
+        for label in encoded.labels[start:end]
+    ]
+    for pos in range(start + 1, end):
+        typing.cast(
+            typing.List[TypedTree[str, str]],
+            nodes[parents[pos] - start].children,
+        ).append(nodes[pos - start])
+
+    return nodes[0]
+
+class _LazyTypedTreeIndex(
+    typing.Mapping[I, TypedTree[NT, T]]
+):
+    """
+    A tree index whose trees are decoded from :class:`_EncodedTrees` on the first access.
+    The trees have string labels, typed as those of the treebank.
+    """
+
+    def __init__(self) -> None:
+        self._locations: typing.Dict[I, typing.Tuple[_EncodedTrees, int]] = {}
+        self._decoded: typing.Dict[I, TypedTree[NT, T]] = {}
+
+    def _add(
+        self,
+        IDs: typing.Iterable[I],
+        encoded: _EncodedTrees,
+    ) -> None:
+        for num, ID in enumerate(IDs):
+            self._locations[ID] = (encoded, num)
+            self._decoded.pop(ID, None)
+
+    def __getitem__(self, ID: I) -> TypedTree[NT, T]:
+        try:
+            return self._decoded[ID]
+        except KeyError:
+            encoded, num = self._locations[ID]
+            tree = typing.cast(TypedTree[NT, T], _decode_tree(encoded, num))
+            self._decoded[ID] = tree
+            return tree
+
+    def __iter__(self) -> typing.Iterator[I]:
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, ID) -> bool:
+        return ID in self._locations
+
+class _FileSource(typing.NamedTuple):
+    """
+    A picklable reference to a file, which a worker process opens by itself.
+    """
+    kind: typing.Literal["syspath", "url", "text"]
+    value: str
+    """
+    The system path, the FS URL, or the content of the file.
+    """
+
 def _load_file(
-    args: typing.Tuple[str, int, str],
+    args: typing.Tuple[str, int, _FileSource],
     disambiguate_IDs_by_path: bool,
     uniformly_with_ID: bool,
 ) -> typing.Tuple[
     str, # path
     int, # size
     int, # status
-    typing.Tuple[typing.Tuple[str, TypedTree[str, str]], ...],
+    typing.Tuple[typing.Any, ...], # IDs
+    _EncodedTrees,
 ]:
-    path, size, content = args
-    res = tuple(
-        (
-            f"{path}/{k}"
-                if disambiguate_IDs_by_path
-                else k,
-            v,
-        )
-        for k, v in map(
-            (
-                get_ID_from_TypedTree 
-                if uniformly_with_ID else get_ID_maybe_from_TypedTree
-            ),
+    path, size, source = args
+
+    if source.kind == "syspath":
+        with open(source.value, "r", encoding = "utf-8") as h_file:
+            trees_raw = tuple(
+                TypedTree._parse_PTB_stream(
+                    h_file,
+                    many = True,
+                    need_EOF = True,
+                )
+            )
+    else:
+        if source.kind == "url":
+            with fs.open_fs(source.value) as filesys:
+                content = filesys.readtext(path, encoding = "utf-8")
+        else:
+            content = source.value
+
+        trees_raw = tuple(
             TypedTree._parse_PTB_stream(
                 io.StringIO(content),
                 many = True,
                 need_EOF = True,
             )
         )
-    )
 
-    return path, size, 0, res
+    IDs, trees = zip(
+        *map(
+            (
+                get_ID_from_TypedTree 
+                if uniformly_with_ID else get_ID_maybe_from_TypedTree
+            ),
+            trees_raw,
+        )
+    ) if trees_raw else ((), ())
+
+    if disambiguate_IDs_by_path:
+        IDs = tuple(f"{path}/{k}" for k in IDs)
+
+    return path, size, 0, tuple(IDs), _encode_trees(trees)
 # === END ===
 
 @attr.s(
@@ -714,7 +965,7 @@ class TypedTreebank(
     @classmethod
     def from_PTB_basic_FS(
         cls,
-        filesys: "fs.base.FS",
+        filesys: typing.Union[str, "fs.base.FS"],
         name: typing.Optional[str]      = None,
         glob_str: str                   = "**/*.psd",
         disambiguate_IDs_by_path: bool  = False,
@@ -724,6 +975,27 @@ class TypedTreebank(
         tqdm_buffer: typing.Optional[typing.TextIO] = None,
         uniformly_with_ID: bool = True,
     ):
+        """
+        Load trees from files in a filesystem in parallel.
+
+        Parameters
+        ----------
+        filesys
+            An FS object or an FS URL.
+            Given an URL, each worker process opens the filesystem by itself.
+            Given an object, files with system paths are opened by the workers
+            and other files are read in the current process.
+
+        Notes
+        -----
+        Trees are sent back from the workers in a compact encoding
+        and decoded on the first access to the index.
+        """
+        filesys_url: typing.Optional[str] = None
+        if isinstance(filesys, str):
+            filesys_url = filesys
+            filesys = fs.open_fs(filesys_url)
+
         # ------------
         # 1. Collect files and their info
         # ------------
@@ -743,22 +1015,28 @@ class TypedTreebank(
         )
 
         # ------------
-        # 2. Making a file reading iterator
+        # 2. Making references to the files
         # ------------
-        def _read_file(filesys: "fs.base.FS", path: str):
-            with filesys.open(path, "r") as f:
-                return f.read()
+        # Worker processes read the files by themselves if possible.
+        def _make_source(path: str) -> _FileSource:
+            if filesys_url is not None:
+                return _FileSource("url", filesys_url)
+            elif filesys.hassyspath(path):
+                return _FileSource("syspath", filesys.getsyspath(path))
+            else:
+                # the content has to be sent to the workers
+                return _FileSource("text", filesys.readtext(path, encoding = "utf-8"))
         # === END ===
 
-        file_contents = (
-            _read_file(filesys, path) 
+        file_sources = (
+            _make_source(path)
             for path in file_paths
         ) # As iterator, actual IO made delayed
 
         # ------------
         # 3. Launch a multiprocessing context
         # -----------
-        result_tree_iters = list()
+        index: _LazyTypedTreeIndex[I, NT, T] = _LazyTypedTreeIndex()
         with cf.ProcessPoolExecutor(
             max_workers = process_num
         ) as executor:
@@ -772,7 +1050,7 @@ class TypedTreebank(
                 file = tqdm_buffer,
                 disable = tqdm_buffer is None,
             ) as bar:
-                for _, size, _, trees in executor.map(
+                for _, size, _, IDs, trees_encoded in executor.map(
                     functools.partial(
                         _load_file,
                         disambiguate_IDs_by_path = disambiguate_IDs_by_path,
@@ -781,17 +1059,20 @@ class TypedTreebank(
                     zip(
                         file_paths,
                         file_sizes,
-                        file_contents,
+                        file_sources,
                     )
                 ):
                     bar.update(size)
-                    result_tree_iters.append(trees)
+                    index._add(IDs, trees_encoded)
+
+        if filesys_url is not None:
+            filesys.close()
 
         return cls(
             name if name is not None else str(filesys),
             version,
             container_version,
-            index = dict(itertools.chain.from_iterable(result_tree_iters))
+            index = index,
         )
     # === END ===
 
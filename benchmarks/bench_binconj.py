@@ -0,0 +1,83 @@
+"""
+Benchmark: binarizing conjunctions (:func:`abctk.transform_ABC.binconj.binarize_conj_tree`)
+with every node copied versus the subtrees without conjunctions shared or tampered,
+on the sample trees repeated to the size of the full treebank.
+
+The results are kept as by a consumer collecting the trees,
+so that the peak memory shows the nodes made.
+
+Usage::
+
+    python benchmarks/bench_binconj.py [FOLDER] [--scale N] [--repeat N]
+"""
+
+import argparse
+import copy
+import gc
+import pathlib
+import time
+import tracemalloc
+
+import abctk.io.nltk_tree as nt
+import abctk.transform_ABC.binconj as binconj
+from abctk.transform_ABC.visitor import RebuildMode, iter_nodes
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def run(trees, mode: RebuildMode):
+    results = []
+    for ID, tree in trees:
+        try:
+            results.append(binconj.binarize_conj_tree(tree, ID, mode = mode))
+        except Exception:
+            # ill-formed conjunctions, abandoned as by `abctk tweak`
+            pass
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument(
+        "--scale", type = int, default = 25,
+        help = "How many times the trees are repeated (25 for the sample makes ~60k trees)",
+    )
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    trees_sample = list(nt.load_ABC_psd(args.folder, prog_stream = None))
+    num_nodes = sum(
+        1 for _, tree in trees_sample for _ in iter_nodes(tree)
+    ) * args.scale
+    print(
+        f"# of trees: {len(trees_sample) * args.scale:,}, "
+        f"# of nodes: {num_nodes:,}"
+    )
+
+    for mode in RebuildMode:
+        time_best = float("inf")
+        mem_peak_best = float("inf")
+        for _ in range(args.repeat):
+            trees = [
+                tree for _ in range(args.scale)
+                for tree in copy.deepcopy(trees_sample)
+            ]
+            gc.collect()
+
+            tracemalloc.start()
+            time_start = time.process_time()
+            results = run(trees, mode)
+            time_elapsed = time.process_time() - time_start
+            _, mem_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            time_best = min(time_best, time_elapsed)
+            mem_peak_best = min(mem_peak_best, mem_peak)
+            del trees, results
+
+        print(
+            f"{mode.value:<10} time: {time_best:8.3f} s (best of {args.repeat}, traced)  "
+            f"peak mem: {mem_peak_best / 1024 ** 2:8.2f} MiB"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: checking the categories of all the nodes against fixed categories
+by comparing them with the literals per node
+versus with the precompiled patterns of :mod:`abctk.cat_pattern`.
+
+Three checks are run, as in the rules that use them:
+
+* `<N/N>` exactly (:func:`abctk.transform_ABC.elim_trace.restore_rel_trace`)
+* `<PP\\S>` and the relative modifiers, features ignored (:mod:`abctk.gen_comp`)
+* the POS tag rules of `abctk/ccg2lambda/semtag.yaml` by unification
+  (:func:`abctk.transform_ABC.jigg.tree_to_jigg`),
+  taking the first one and with the rules whose categories are not parsable skipped
+
+Usage::
+
+    python benchmarks/bench_cat_pattern.py [FOLDER] [--repeat N]
+"""
+
+import argparse
+import gc
+import importlib.resources
+import pathlib
+import time
+import typing
+
+import ruamel.yaml as yaml
+
+import abctk.cat_cache as cc
+import abctk.cat_pattern as cp
+import abctk.io.nltk_tree as nt
+from abctk.obj.ABCCat import ABCCat, ABCCatFunctor, ABCCatReprMode
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+CATS_REL_MOD = ("<N/N>", "<NP/NP>", "<NP\\NP>", "<N\\N>")
+
+def _load_postag() -> typing.List[dict]:
+    with importlib.resources.open_text("abctk.ccg2lambda", "semtag.yaml") as f_postag:
+        postag = yaml.YAML(typ = "safe", pure = True).load(f_postag)
+
+    res = []
+    for tag in postag:
+        try:
+            cat = ABCCat.parse(tag["category"], ABCCatReprMode.CCG2LAMBDA)
+        except Exception:
+            continue
+        res.append({**tag, "category": cat})
+    return res
+
+def run_literals(cats, postag) -> int:
+    count = 0
+    for cat in cats:
+        if cc.parse_cat(cat) == cc.parse_cat("<N/N>"):
+            count += 1
+        if (
+            isinstance(cat, ABCCatFunctor)
+            and cat.equiv_to(cc.parse_cat("<PP\\S>"), ignore_feature = True)
+        ):
+            count += 1
+        if any(
+            cat.equiv_to(cc.parse_cat(c), ignore_feature = True)
+            for c in CATS_REL_MOD
+        ):
+            count += 1
+        for tag in postag:
+            if cat.unify(tag["category"]):
+                count += 1
+                break
+    return count
+
+def run_patterns(cats, postag) -> int:
+    pat_rel = cp.CatPattern("<N/N>", cp.MatchMode.EXACT)
+    pat_clause = cp.CatPattern("<PP\\S>", cp.MatchMode.IGNORE_FEATURE)
+    pats_rel_mod = cp.CatPatternSet(
+        ((c, c) for c in CATS_REL_MOD),
+        cp.MatchMode.IGNORE_FEATURE,
+    )
+    pats_postag = cp.CatPatternSet(
+        ((tag["category"], tag) for tag in postag),
+        cp.MatchMode.UNIFY,
+    )
+
+    count = 0
+    for cat in cats:
+        if pat_rel.match(cat):
+            count += 1
+        if isinstance(cat, ABCCatFunctor) and pat_clause.match(cat):
+            count += 1
+        if pats_rel_mod.match_any(cat):
+            count += 1
+        if pats_postag.match_first(cat) is not None:
+            count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args()
+
+    trees = list(nt.load_ABC_psd(args.folder, prog_stream = None))
+    cats = [
+        cc.parse_cat(node.label().cat)
+        for _, tree in trees
+        for node in tree.subtrees()
+    ]
+    postag = _load_postag()
+    print(
+        f"# of nodes: {len(cats):,}, "
+        f"# of distinct categories: {len(set(cats)):,}, "
+        f"# of POS tag rules: {len(postag)}"
+    )
+
+    times_best: typing.Dict[str, float] = {}
+    counts: typing.Dict[str, int] = {}
+    for _ in range(args.repeat):
+        for name, run in (("literals", run_literals), ("patterns", run_patterns)):
+            gc.collect()
+            time_start = time.process_time()
+            counts[name] = run(cats, postag)
+            times_best[name] = min(
+                times_best.get(name, float("inf")),
+                time.process_time() - time_start,
+            )
+
+    assert counts["literals"] == counts["patterns"]
+    for name, time_best in times_best.items():
+        print(
+            f"{name:<10} time: {time_best:8.3f} s (best of {args.repeat})  "
+            f"{time_best / len(cats) * 1e9:8.1f} ns/node"
+        )
+    print(f"{'speedup':<10}       {times_best['literals'] / times_best['patterns']:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: memory and traversal speed of :class:`abctk.types.core.TypedTree`
+versus :class:`abctk.types.compact.CompactTypedTree`.
+
+Usage::
+
+    python benchmarks/bench_compact_tree.py [FOLDER] [--repeat N]
+"""
+
+import argparse
+import gc
+import pathlib
+import time
+import tracemalloc
+
+from abctk.types.core import TypedTree
+from abctk.types.compact import CompactTypedTree, LabelTable
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def _load_texts(folder: pathlib.Path):
+    return [path.read_text() for path in sorted(folder.glob("**/*.psd"))]
+
+def _build_typed(texts):
+    import io
+    return [
+        tree
+        for text in texts
+        for tree in TypedTree._parse_PTB_stream(io.StringIO(text), many = True, need_EOF = True)
+    ]
+
+def _measure_memory(name: str, build) -> list:
+    gc.collect()
+    tracemalloc.start()
+    res = build()
+    gc.collect()
+    mem_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} memory: {mem_current / 1024 ** 2:8.2f} MiB")
+    return res
+
+def _measure_time(name: str, func, repeat: int) -> None:
+    time_start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    time_elapsed = (time.perf_counter() - time_start) / repeat
+    print(f"{name:<28} time: {time_elapsed:8.3f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    texts = _load_texts(args.folder)
+    # the labels of the parser are shared with the typed trees
+    trees = _measure_memory("TypedTree", lambda: _build_typed(texts))
+
+    table = LabelTable()
+    trees_compact = _measure_memory(
+        "Compact",
+        lambda: [CompactTypedTree.from_typed_tree(tree, table) for tree in trees],
+    )
+    print(f"# of trees: {len(trees):,}, # of nodes: {sum(map(len, trees_compact)):,}")
+
+    count = lambda root, children: 1 + sum(children)
+    for name, func in (
+        ("iter_df_topdown", lambda t: sum(1 for _ in t.iter_df_topdown())),
+        ("iter_df_bottomup", lambda t: sum(1 for _ in t.iter_df_bottomup())),
+        ("iter_terms", lambda t: sum(1 for _ in t.iter_terms())),
+        ("fmap", lambda t: t.fmap(str.lower, str.upper)),
+        ("fold", lambda t: t.fold(count)),
+    ):
+        _measure_time(f"TypedTree.{name}", lambda: [func(t) for t in trees], args.repeat)
+        _measure_time(f"Compact.{name}", lambda: [func(t) for t in trees_compact], args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: decrypting obfuscated trees
+with the whole source texts loaded and words rebuilt character by character
+versus the streaming join of :class:`abctk.obfuscate.DecryptionSourceWindow`
+and :func:`abctk.obfuscate.decrypt_tree`.
+
+The source texts are made from the trees themselves.
+
+Usage::
+
+    python benchmarks/bench_decrypt.py [FOLDER] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+from nltk.tree import Tree
+
+import abctk.io.nltk_tree as nt
+import abctk.obfuscate as ob
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def _decrypt_tree_by_char(subtree, source: str, source_pos: int = 0):
+    # the former implementation
+    if isinstance(subtree, Tree):
+        children_new = []
+        for child in subtree:
+            child_new, source_pos = _decrypt_tree_by_char(child, source, source_pos)
+            children_new.append(child_new)
+        return Tree(subtree.label(), children_new), source_pos
+    elif isinstance(subtree, str):
+        word_new = ""
+        for char in subtree:
+            if char == "⛔":
+                word_new += source[source_pos]
+                source_pos += 1
+            else:
+                word_new += char
+        return word_new, source_pos
+    else:
+        return subtree, source_pos
+
+def run_whole(trees, path_source: pathlib.Path) -> int:
+    with open(path_source) as h_source:
+        source_dict = dict(ob.parse_decryption_source(h_source))
+
+    return sum(
+        1 for ID, tree in trees
+        if _decrypt_tree_by_char(tree, source_dict[ID])[0] is not None
+    )
+
+def run_streaming(trees, path_source: pathlib.Path) -> int:
+    with open(path_source) as h_source:
+        window = ob.DecryptionSourceWindow(ob.parse_decryption_source(h_source))
+
+        return sum(
+            1 for ID, tree in trees
+            if ob.decrypt_tree(tree, window.get(ID), ID = ID)[0] is not None
+        )
+
+def _measure(name: str, func, *args) -> None:
+    tracemalloc.start()
+    time_start = time.perf_counter()
+    count = func(*args)
+    time_elapsed = time.perf_counter() - time_start
+    _, mem_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<12} trees: {count:>8,}  "
+        f"time: {time_elapsed:8.3f} s  "
+        f"peak mem: {mem_peak / 1024 ** 2:8.2f} MiB"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    trees = [
+        (ID, ob.obfuscate_tree(tree))
+        for ID, tree in nt.load_Keyaki_Annot_psd(args.folder, prog_stream = None)
+    ]
+
+    with tempfile.TemporaryDirectory() as dir_temp:
+        path_source = pathlib.Path(dir_temp) / "source.tsv"
+        with open(path_source, "w") as h_source:
+            for ID, tree in nt.load_Keyaki_Annot_psd(args.folder, prog_stream = None):
+                text = "".join(
+                    word for word in tree.leaves()
+                    if not (word.startswith("*") or word.startswith("__"))
+                )
+                h_source.write(f"{ID}\t{text}\n")
+
+        for _ in range(args.repeat):
+            _measure("whole", run_whole, trees, path_source)
+            _measure("streaming", run_streaming, trees, path_source)
+
+if __name__ == "__main__":
+    main()
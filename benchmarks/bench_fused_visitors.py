@@ -0,0 +1,104 @@
+"""
+Benchmark: chained tree transforms run one after another
+versus fused into shared traversals by :class:`abctk.transform_ABC.visitor.FusedTraversal`.
+
+Only consecutive rewrites of single nodes are fused.
+The nightly chain (`filter-annots`, `min-nodes`, `elab-cat-annots`,
+`elab-char-spans`, `del-janome`) has none of them next to each other
+and still takes a walk per transform.
+
+Usage::
+
+    python benchmarks/bench_fused_visitors.py [FOLDER] [--repeat N]
+"""
+
+import argparse
+import copy
+import gc
+import pathlib
+import time
+import typing
+
+import abctk.io.nltk_tree as nt
+import abctk.transform_ABC.norm as norm
+import abctk.transform_ABC.morph_janome as mj
+from abctk.transform_ABC.visitor import FusedTraversal
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+# transforms with little work per node, which show the cost of traversals
+CHAIN_LOCAL = (
+    (
+        lambda tree, ID: norm.delete_feats(tree, ID, {"sort"}),
+        mj.del_morph_janome,
+        lambda tree, ID: norm.delete_feats(tree, ID, {"trace.elab.error"}),
+        mj.del_morph_janome,
+        lambda tree, ID: norm.delete_all_feats_with_white_list(tree, ID, {"deriv", "role"}),
+    ),
+    lambda: (
+        norm.DeleteFeatsVisitor({"sort"}),
+        mj.DelJanomeVisitor(),
+        norm.DeleteFeatsVisitor({"trace.elab.error"}),
+        mj.DelJanomeVisitor(),
+        norm.WhiteListFeatsVisitor({"deriv", "role"}),
+    ),
+)
+
+def _measure(trees, runs: typing.Dict[str, typing.Callable], repeat: int) -> typing.Dict[str, float]:
+    """
+    Take the best CPU times of the runs, interleaved to level out the noise.
+    """
+    times_best = {name: float("inf") for name in runs}
+    for _ in range(repeat):
+        for name, run in runs.items():
+            trees_copied = copy.deepcopy(trees)
+            gc.collect()
+            gc.disable()
+            try:
+                time_start = time.process_time()
+                for ID, tree in trees_copied:
+                    run(tree, ID)
+                times_best[name] = min(
+                    times_best[name],
+                    time.process_time() - time_start,
+                )
+            finally:
+                gc.enable()
+
+    for name, time_best in times_best.items():
+        print(f"{name:<24} time: {time_best:8.3f} s (best of {repeat})")
+    return times_best
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args()
+
+    trees = list(nt.load_Keyaki_Annot_psd(args.folder, prog_stream = None))
+    print(f"# of trees: {len(trees):,}")
+
+    for chain_name, (funcs, make_visitors) in (
+        ("local", CHAIN_LOCAL),
+    ):
+        def run_seq(tree, ID):
+            for func in funcs:
+                func(tree, ID)
+
+        traversal = FusedTraversal(make_visitors())
+        print(
+            f"[{chain_name}] {len(funcs)} transforms, "
+            f"{len(traversal.passes)} fused pass(es)"
+        )
+        times = _measure(
+            trees,
+            {"one after another": run_seq, "fused": traversal},
+            args.repeat,
+        )
+        print(
+            f"{'speedup':<24}       "
+            f"{times['one after another'] / times['fused']:8.2f}x"
+        )
+
+if __name__ == "__main__":
+    main()
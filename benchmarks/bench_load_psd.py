@@ -0,0 +1,68 @@
+"""
+Benchmark: reading PTB-style treebank files with NLTK's
+`BracketParseCorpusReader` versus the streaming reader
+in :mod:`abctk.io.nltk_tree`.
+
+Only bracket parsing is measured (no category parsing).
+
+Usage::
+
+    python benchmarks/bench_load_psd.py [FOLDER] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import time
+import tracemalloc
+
+import abctk.io.nltk_tree as nt
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def _measure(name: str, func) -> None:
+    tracemalloc.start()
+    time_start = time.perf_counter()
+    count = func()
+    time_elapsed = time.perf_counter() - time_start
+    _, mem_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<12} trees: {count:>8,}  "
+        f"time: {time_elapsed:8.3f} s  "
+        f"peak mem: {mem_peak / 1024 ** 2:8.2f} MiB"
+    )
+
+def run_nltk(folder: pathlib.Path) -> int:
+    from nltk.corpus.reader.bracket_parse import BracketParseCorpusReader
+    reader = BracketParseCorpusReader(
+        root = str(folder),
+        fileids = r".*\.psd$",
+    )
+    return sum(
+        1 for tree in reader.parsed_sents()
+        if nt.split_ID_from_Tree(tree)
+    )
+
+def run_streaming(folder: pathlib.Path) -> int:
+    return sum(
+        1 for tree in nt.iter_psd_trees(folder)
+        if nt.split_ID_from_Tree(tree)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    for _ in range(args.repeat):
+        try:
+            _measure("nltk", lambda: run_nltk(args.folder))
+        except PermissionError as e:
+            # NLTK >= 3.9 refuses to read outside its data paths
+            print(f"nltk         skipped: {e}")
+        _measure("streaming", lambda: run_streaming(args.folder))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: adding Janome analyses (:func:`abctk.transform_ABC.morph_janome.add_morph_janome`)
+with the cache of analyses (:class:`abctk.transform_ABC.morph_janome.MorphCache`)
+cold, warm in memory and warm in the SQLite database (as in a rerun),
+on the sample trees repeated.
+
+Usage::
+
+    python benchmarks/bench_morph_cache.py [FOLDER] [--scale N]
+"""
+
+import argparse
+import copy
+import gc
+import pathlib
+import tempfile
+import time
+
+import abctk.io.nltk_tree as nt
+import abctk.transform_ABC.morph_janome as mj
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def run(trees) -> float:
+    trees = copy.deepcopy(trees)
+    gc.collect()
+    time_start = time.process_time()
+    for ID, tree in trees:
+        mj.add_morph_janome(tree, ID)
+    return time.process_time() - time_start
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument(
+        "--scale", type = int, default = 2,
+        help = "How many times the trees are repeated",
+    )
+    args = parser.parse_args()
+
+    trees = list(nt.load_ABC_psd(args.folder, prog_stream = None)) * args.scale
+    print(f"# of trees: {len(trees):,}")
+
+    # load the dictionary beforehand
+    mj.get_analyzer()
+
+    with tempfile.TemporaryDirectory() as dir_temp:
+        conf = {"persist": True, "path": pathlib.Path(dir_temp) / "morph.sqlite3"}
+
+        mj.configure({"max-size": 0})
+        print(f"{'no cache':<10} time: {run(trees):8.3f} s")
+
+        mj.configure(conf)
+        print(f"{'cold':<10} time: {run(trees):8.3f} s  {mj.get_cache().info()}")
+        print(f"{'memory':<10} time: {run(trees):8.3f} s  {mj.get_cache().info()}")
+
+        mj.configure(conf)
+        time_db = run(trees)
+        print(
+            f"{'database':<10} time: {time_db:8.3f} s  {mj.get_cache().info()}, "
+            f"db hits: {mj.get_cache().db_hits:,}"
+        )
+        mj.get_cache().close()
+
+if __name__ == "__main__":
+    main()
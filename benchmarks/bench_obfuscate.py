@@ -0,0 +1,73 @@
+"""
+Benchmark: obfuscating trees by copying them (:func:`abctk.obfuscate.obfuscate_tree`)
+versus rewriting their leaves in place (:func:`abctk.obfuscate.obfuscate_tree_in_place`),
+and obfuscating a treebank folder file by file
+(:func:`abctk.obfuscate.obfuscate_psd_folder`).
+
+Usage::
+
+    python benchmarks/bench_obfuscate.py [FOLDER] [--repeat N] [--jobs N]
+"""
+
+import argparse
+import copy
+import gc
+import pathlib
+import tempfile
+import time
+
+import abctk.io.nltk_tree as nt
+import abctk.obfuscate as ob
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 5)
+    parser.add_argument("--jobs", type = int, default = 2)
+    args = parser.parse_args()
+
+    trees = list(nt.load_Keyaki_Annot_psd(args.folder, prog_stream = None))
+    print(f"# of trees: {len(trees):,}")
+
+    times_best = {"copy": float("inf"), "in place": float("inf")}
+    for _ in range(args.repeat):
+        for name, func in (
+            ("copy", ob.obfuscate_tree),
+            ("in place", ob.obfuscate_tree_in_place),
+        ):
+            trees_copied = copy.deepcopy(trees)
+            gc.collect()
+            gc.disable()
+            try:
+                time_start = time.process_time()
+                for ID, tree in trees_copied:
+                    func(tree, ID)
+                times_best[name] = min(
+                    times_best[name],
+                    time.process_time() - time_start,
+                )
+            finally:
+                gc.enable()
+
+    for name, time_best in times_best.items():
+        print(f"{name:<24} time: {time_best:8.3f} s (best of {args.repeat})")
+
+    for n_jobs in (1, args.jobs):
+        with tempfile.TemporaryDirectory() as dir_temp:
+            time_start = time.perf_counter()
+            num_files = sum(
+                1 for _ in ob.obfuscate_psd_folder(
+                    args.folder, dir_temp,
+                    filter = ".",
+                    n_jobs = n_jobs,
+                )
+            )
+            print(
+                f"{f'folder, {n_jobs} job(s)':<24} time: "
+                f"{time.perf_counter() - time_start:8.3f} s ({num_files} files)"
+            )
+
+if __name__ == "__main__":
+    main()
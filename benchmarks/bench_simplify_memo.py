@@ -0,0 +1,67 @@
+"""
+Benchmark: `min-nodes` and `elab-cat-annots` with the reductions of category pairs
+computed every time versus memoized by :func:`abctk.cat_cache.simplify_exh`.
+
+Usage::
+
+    python benchmarks/bench_simplify_memo.py [FOLDER] [--repeat N] [--max-size N]
+"""
+
+import argparse
+import copy
+import gc
+import pathlib
+import time
+
+import abctk.cat_cache as cc
+import abctk.io.nltk_tree as nt
+import abctk.transform_ABC.norm as norm
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def _run(trees, max_size: int) -> float:
+    cc.clear()
+    cc.configure({"simplify-exh-max-size": max_size})
+
+    trees_copied = copy.deepcopy(trees)
+    gc.collect()
+    gc.disable()
+    try:
+        time_start = time.process_time()
+        for ID, tree in trees_copied:
+            norm.elaborate_cat_annotations(tree, ID)
+            norm.minimize_tree(tree, ID)
+        return time.process_time() - time_start
+    finally:
+        gc.enable()
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 5)
+    parser.add_argument("--max-size", type = int, default = 65536)
+    args = parser.parse_args()
+
+    trees = list(nt.load_Keyaki_Annot_psd(args.folder, prog_stream = None))
+    print(f"# of trees: {len(trees):,}")
+
+    times_best = {"every time": float("inf"), "memoized": float("inf")}
+    for _ in range(args.repeat):
+        times_best["every time"] = min(times_best["every time"], _run(trees, 0))
+        times_best["memoized"] = min(times_best["memoized"], _run(trees, args.max_size))
+
+    for name, time_best in times_best.items():
+        print(f"{name:<24} time: {time_best:8.3f} s (best of {args.repeat})")
+    print(
+        f"{'speedup':<24}       "
+        f"{times_best['every time'] / times_best['memoized']:8.2f}x"
+    )
+
+    info = cc.get_stats()["simplify_exh"]
+    print(
+        f"pairs: {info.currsize:,} distinct, {info.hits + info.misses:,} looked up, "
+        f"hit rate: {info.hit_rate:.1%}"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark: tree transforms implemented by recursion (the former implementations)
+versus those driven by the explicit-stack engine of :mod:`abctk.transform_ABC.visitor`
+(:func:`~abctk.transform_ABC.visitor.iter_nodes`,
+:func:`~abctk.transform_ABC.visitor.fold_tree`,
+:func:`~abctk.transform_ABC.visitor.rewrite_tree`).
+
+The first part shows the per-node overhead on the treebank,
+the second part the transforms on a tree deeper than the recursion limit.
+
+Usage::
+
+    python benchmarks/bench_tree_engine.py [FOLDER] [--repeat N] [--depth N]
+"""
+
+import argparse
+import copy
+import gc
+import pathlib
+import sys
+import time
+import typing
+
+from nltk.tree import Tree
+
+import abctk.io.nltk_tree as nt
+from abctk.obj.ABCCat import Annot
+import abctk.obfuscate as ob
+import abctk.transform_ABC.elim_empty as ee
+import abctk.transform_ABC.norm as norm
+import abctk.transform_ABC.unary as un
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+# ================
+# The former implementations
+# ================
+def _elaborate_char_spans_rec(tree, ID = "<UNKNOWN>", offset: int = 0):
+    if isinstance(tree, Tree):
+        self_label = tree.label()
+        if norm._is_comment(self_label.cat):
+            return (offset, offset)
+        else:
+            span_start = offset
+            span_end = offset
+            for child in tree:
+                _, span_end = _elaborate_char_spans_rec(child, ID, offset)
+                offset = span_end
+            self_label.feats["char-start"] = span_start
+            self_label.feats["char-end"] = span_end
+            return (span_start, span_end)
+    elif isinstance(tree, str):
+        l = (
+            0
+            if tree.startswith("*") or tree.startswith("__")
+            else len(tree)
+        )
+        return (offset, offset + l)
+    else:
+        return (offset, offset)
+
+def _delete_feats_rec(tree, ID = "<UNKNOWN>", black_list = frozenset()):
+    if isinstance(tree, Tree):
+        self_label = tree.label()
+        if isinstance(self_label, Annot):
+            tree.set_label(
+                Annot(
+                    cat = self_label.cat,
+                    feats = {
+                        k: v for k, v in self_label.feats.items()
+                        if k not in black_list
+                    }
+                )
+            )
+        for child in tree:
+            _delete_feats_rec(child, ID, black_list)
+
+def _collapse_unary_nodes_rec(tree, ID = "<UNKNOWN>"):
+    if isinstance(tree, Tree):
+        if len(tree) == 1:
+            only_child = _collapse_unary_nodes_rec(tree[0], ID)
+            if isinstance(only_child, Tree):
+                return tree.__class__(
+                    f"{tree.label()}☆{only_child.label()}",
+                    [_collapse_unary_nodes_rec(child, ID) for child in only_child]
+                )
+            else:
+                return tree.__class__(tree.label(), [only_child])
+        else:
+            return tree.__class__(
+                tree.label(),
+                [_collapse_unary_nodes_rec(child, ID) for child in tree]
+            )
+    else:
+        return tree
+
+def _obfuscate_tree_rec(tree, ID = "<UNKNOWN>"):
+    if isinstance(tree, Tree):
+        return Tree(
+            tree.label(),
+            list(_obfuscate_tree_rec(child) for child in tree)
+        )
+    elif isinstance(tree, str) and not tree.startswith(("*", "__")):
+        return "⛔" * len(tree)
+    else:
+        return tree
+
+def _elim_empty_terminals_rec(tree, ID = "<UNKNOWN>"):
+    if isinstance(tree, Tree):
+        children_cats = tuple(
+            _elim_empty_terminals_rec(child, ID) for child in tree
+        )
+        children_num = len(children_cats)
+        if children_num == 1:
+            return children_cats[0]
+        elif any(children_cats):
+            children = list(tree)
+            tree.clear()
+            tree.extend(
+                child for child, is_empty in zip(children, children_cats)
+                if not is_empty
+            )
+            if children_num == 2:
+                tree.label().feats["deriv"] = "unary-elim-empty"
+            return False
+        else:
+            return False
+    elif isinstance(tree, str):
+        return tree.startswith("*") or tree.startswith("__")
+    else:
+        return False
+
+TRANSFORMS: typing.Dict[str, typing.Tuple[typing.Callable, typing.Callable]] = {
+    "elab-char-spans": (_elaborate_char_spans_rec, norm.elaborate_char_spans),
+    "filter-annots": (
+        lambda tree, ID: _delete_feats_rec(tree, ID, {"sort"}),
+        lambda tree, ID: norm.delete_feats(tree, ID, {"sort"}),
+    ),
+    "collapse-unary": (_collapse_unary_nodes_rec, un.collapse_unary_nodes),
+    "obfus": (_obfuscate_tree_rec, ob.obfuscate_tree),
+    "elim-empty": (_elim_empty_terminals_rec, ee.elim_empty_terminals),
+}
+
+def _make_deep_tree(depth: int) -> Tree:
+    # a left-branching chain, e.g. of coordination
+    tree = Tree(Annot("N"), ["*pro*"])
+    for i in range(depth):
+        tree = Tree(
+            Annot("NP", {"sort": "x"}),
+            [tree, Tree(Annot("N"), [f"w{i}"])]
+        )
+    return tree
+
+def _measure(trees, runs: typing.Dict[str, typing.Callable], repeat: int) -> typing.Dict[str, float]:
+    """
+    Take the best CPU times of the runs, interleaved to level out the noise.
+    """
+    times_best = {name: float("inf") for name in runs}
+    for _ in range(repeat):
+        for name, run in runs.items():
+            trees_copied = copy.deepcopy(trees)
+            gc.collect()
+            gc.disable()
+            try:
+                time_start = time.process_time()
+                for ID, tree in trees_copied:
+                    run(tree, ID)
+                times_best[name] = min(
+                    times_best[name],
+                    time.process_time() - time_start,
+                )
+            finally:
+                gc.enable()
+    return times_best
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 5)
+    parser.add_argument("--depth", type = int, default = 20000)
+    args = parser.parse_args()
+
+    trees = list(nt.load_Keyaki_Annot_psd(args.folder, prog_stream = None))
+    num_nodes = sum(
+        sum(1 for _ in tree.subtrees()) for _, tree in trees
+    )
+    print(f"# of trees: {len(trees):,}, # of nodes: {num_nodes:,}")
+
+    for name, (func_rec, func_engine) in TRANSFORMS.items():
+        times = _measure(
+            trees,
+            {"recursion": func_rec, "engine": func_engine},
+            args.repeat,
+        )
+        print(
+            f"{name:<16} "
+            f"recursion: {times['recursion'] / num_nodes * 1e9:7.1f} ns/node  "
+            f"engine: {times['engine'] / num_nodes * 1e9:7.1f} ns/node  "
+            f"ratio: {times['engine'] / times['recursion']:5.2f}"
+        )
+
+    # -------
+    # deep trees
+    # -------
+    # built bottom-up, and deepcopy would recurse
+    print(
+        f"[deep tree] depth: {args.depth:,}, "
+        f"recursion limit: {sys.getrecursionlimit():,}"
+    )
+    for name, (func_rec, func_engine) in TRANSFORMS.items():
+        try:
+            func_rec(_make_deep_tree(args.depth), "deep")
+            res_rec = "ok"
+        except RecursionError:
+            res_rec = "RecursionError"
+
+        tree = _make_deep_tree(args.depth)
+        time_start = time.process_time()
+        func_engine(tree, "deep")
+        time_elapsed = time.process_time() - time_start
+
+        print(
+            f"{name:<16} recursion: {res_rec:<16} "
+            f"engine: {time_elapsed:8.3f} s"
+        )
+
+if __name__ == "__main__":
+    main()
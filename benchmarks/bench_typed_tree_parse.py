@@ -0,0 +1,47 @@
+"""
+Benchmark: parsing PTB-style trees into :class:`abctk.types.core.TypedTree` s
+with the scanner of `TypedTree._parse_PTB_stream`
+versus the former LL(1) parser `TypedTree._parse_PTB_stream_LL1`.
+
+Usage::
+
+    python benchmarks/bench_typed_tree_parse.py [FOLDER] [--repeat N]
+"""
+
+import argparse
+import io
+import pathlib
+import time
+
+from abctk.types.core import TypedTree
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    contents = [path.read_text() for path in sorted(args.folder.glob("**/*.psd"))]
+    size = sum(len(content.encode("utf-8")) for content in contents)
+
+    for _ in range(args.repeat):
+        for name, func in (
+            ("LL1", TypedTree._parse_PTB_stream_LL1),
+            ("scanner", TypedTree._parse_PTB_stream),
+        ):
+            time_start = time.perf_counter()
+            count = sum(
+                sum(1 for _ in func(io.StringIO(content), many = True, need_EOF = True))
+                for content in contents
+            )
+            time_elapsed = time.perf_counter() - time_start
+            print(
+                f"{name:<12} trees: {count:>8,}  "
+                f"time: {time_elapsed:8.3f} s  "
+                f"throughput: {size / time_elapsed / 1024 ** 2:8.2f} MiB/s"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: the round trip of collapsing and restoring unary nodes
+(:mod:`abctk.transform_ABC.unary`), as run around external parsers,
+in each :class:`abctk.transform_ABC.visitor.RebuildMode`.
+
+Usage::
+
+    python benchmarks/bench_unary.py [FOLDER] [--repeat N]
+"""
+
+import argparse
+import copy
+import gc
+import pathlib
+import time
+import tracemalloc
+
+import abctk.io.nltk_tree as nt
+import abctk.transform_ABC.unary as un
+from abctk.transform_ABC.visitor import RebuildMode, iter_nodes
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def run_round_trip(trees, mode: RebuildMode) -> int:
+    """
+    Returns the number of nodes of the results that are not in the given trees.
+    """
+    nodes_given = set(
+        id(node) for _, tree in trees for node in iter_nodes(tree)
+    )
+
+    results = []
+    for ID, tree in trees:
+        tree = un.collapse_unary_nodes(tree, ID, mode = mode)
+        results.append(un.restore_unary_nodes(tree, ID, mode = mode))
+
+    return sum(
+        1 for tree in results for node in iter_nodes(tree)
+        if id(node) not in nodes_given
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args()
+
+    # labels unparsed
+    trees = [
+        nt.split_ID_from_Tree(tree)
+        for tree in nt.iter_psd_trees(args.folder)
+    ]
+    num_nodes = sum(
+        1 for _, tree in trees for _ in iter_nodes(tree)
+    )
+    print(f"# of trees: {len(trees):,}, # of nodes: {num_nodes:,}")
+
+    for mode in RebuildMode:
+        time_best = float("inf")
+        for _ in range(args.repeat):
+            trees_copied = copy.deepcopy(trees)
+            gc.collect()
+            gc.disable()
+            try:
+                time_start = time.process_time()
+                for ID, tree in trees_copied:
+                    tree = un.collapse_unary_nodes(tree, ID, mode = mode)
+                    un.restore_unary_nodes(tree, ID, mode = mode)
+                time_best = min(time_best, time.process_time() - time_start)
+            finally:
+                gc.enable()
+
+        trees_copied = copy.deepcopy(trees)
+        tracemalloc.start()
+        num_nodes_new = run_round_trip(trees_copied, mode)
+        _, mem_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"{mode.value:<10} time: {time_best:8.3f} s (best of {args.repeat})  "
+            f"nodes made: {num_nodes_new:>8,}  "
+            f"peak mem: {mem_peak / 1024 ** 2:8.2f} MiB"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: serializing ABC trees with the former recursive `flatten_tree`
+versus the buffered iterative :class:`abctk.io.nltk_tree.PTBWriter`.
+
+Trees are loaded beforehand; only serialization is measured.
+The output is written to the null device.
+
+Usage::
+
+    python benchmarks/bench_write_psd.py [FOLDER] [--repeat N] [--hide-feats]
+"""
+
+import argparse
+import os
+import pathlib
+import time
+
+from nltk import Tree
+
+import abctk.io.nltk_tree as nt
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "tests/resources/trees/ABCTreebank_sample"
+
+def _flatten_tree_recursive(tree, **kwargs) -> str:
+    if isinstance(tree, Tree):
+        label = tree.label()
+        label_pprint = (
+            label.pprint(**kwargs) if isinstance(label, nt.Annot)
+            else str(label)
+        )
+        children_pprint = " ".join(
+            _flatten_tree_recursive(child, **kwargs) for child in tree
+        )
+        return f"({label_pprint} {children_pprint})"
+    else:
+        return str(tree)
+
+def run_recursive(trees, h_out, **kwargs) -> None:
+    for ID, tree in trees:
+        h_out.writelines(
+            (
+                f"(TOP {_flatten_tree_recursive(tree, **kwargs)} (ID {ID}))",
+                "\n",
+            )
+        )
+
+def run_writer(trees, h_out, **kwargs) -> None:
+    with nt.PTBWriter(h_out, **kwargs) as writer:
+        for ID, tree in trees:
+            writer.write_tree_with_ID(ID, tree)
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("folder", nargs = "?", type = pathlib.Path, default = DIR_SAMPLE)
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("--hide-feats", action = "store_true")
+    args = parser.parse_args()
+
+    trees = list(nt.load_ABC_psd(args.folder, prog_stream = None))
+    kwargs = {"hide_all_feats": args.hide_feats}
+    size = sum(len(nt.flatten_tree_with_ID(ID, tree, **kwargs)) + 1 for ID, tree in trees)
+
+    with open(os.devnull, "w") as h_out:
+        for _ in range(args.repeat):
+            for name, func in (
+                ("recursive", run_recursive),
+                ("writer", run_writer),
+            ):
+                time_start = time.perf_counter()
+                func(trees, h_out, **kwargs)
+                time_elapsed = time.perf_counter() - time_start
+                print(
+                    f"{name:<12} trees: {len(trees):>8,}  "
+                    f"time: {time_elapsed:8.3f} s  "
+                    f"throughput: {size / time_elapsed / 1024 ** 2:8.2f} MiB/s"
+                )
+
+if __name__ == "__main__":
+    main()
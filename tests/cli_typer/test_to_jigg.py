@@ -0,0 +1,59 @@
+import io
+
+import lxml.etree as et
+import pytest
+
+import abctk.cli_typer.to_jigg as to_jigg
+import abctk.transform_ABC.jigg as jg
+
+def _make_sentence(ID: str, num: int, postag = None) -> et._Element:
+    if ID.startswith("ill"):
+        raise jg.JIGGConvException(ID)
+    sentence = et.Element("sentence", id = f"s{num}")
+    tokens = et.SubElement(sentence, "tokens")
+    for i in range(2):
+        et.SubElement(tokens, "token", id = f"s{num}_{i}", surf = "語")
+    ccg = et.SubElement(sentence, "ccg", root = f"s{num}_sp0")
+    et.SubElement(ccg, "span", id = f"s{num}_sp0", child = "")
+    return sentence
+
+@pytest.mark.parametrize("num_sentences", [0, 1, 3])
+def test_write_jigg(monkeypatch, num_sentences: int):
+    monkeypatch.setattr(
+        jg, "tree_to_jigg",
+        lambda tree, ID, num, postag = None: _make_sentence(ID, num, postag),
+    )
+    IDs = [f"{i}_test" for i in range(num_sentences)]
+    tb = [(ID, None) for ID in IDs] + [("ill_test", None)]
+
+    # the whole document pretty-printed, as written before
+    root = et.Element("root")
+    sentences = et.SubElement(
+        et.SubElement(root, "document", id = "d0"),
+        "sentences",
+    )
+    for num, ID in enumerate(IDs):
+        sentences.append(_make_sentence(ID, num))
+
+    out = io.BytesIO()
+    to_jigg._write_jigg(tb, out, skip_ill_trees = True)
+    assert out.getvalue() == et.tostring(
+        root,
+        pretty_print = True,
+        xml_declaration = True,
+        encoding = "utf-8",
+    )
+
+    out_file = io.BytesIO()
+    to_jigg._write_jigg(tb, out_file, skip_ill_trees = True, encoding = "UTF-8")
+    expected_file = io.BytesIO()
+    et.ElementTree(root).write(
+        expected_file,
+        xml_declaration = True,
+        encoding = "utf-8",
+        pretty_print = True,
+    )
+    assert out_file.getvalue() == expected_file.getvalue()
+
+    with pytest.raises(jg.JIGGConvException):
+        to_jigg._write_jigg(tb, io.BytesIO(), skip_ill_trees = False)
@@ -0,0 +1,160 @@
+import copy
+import functools
+import pathlib
+import types
+
+import pytest
+
+import abctk.config as CONF
+import abctk.io.nltk_tree as nt
+import abctk.profiling as prof
+import abctk.transform_ABC.tree_ops as tree_ops
+from abctk.cli_typer import tweak
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "resources/trees/ABCTreebank_sample"
+
+def _drop_some(tree, ID):
+    if ID.number % 7 == 0:
+        raise ValueError("ill tree")
+    return tree
+
+def _run_chain(n_jobs: int, skip_ill_trees: bool):
+    config = dict(CONF.CONF_DEFAULT)
+    config["skip-ill-trees"] = skip_ill_trees
+    ctx = types.SimpleNamespace(
+        obj = {
+            "CONFIG": config,
+            "n_jobs": n_jobs,
+            "treebank": nt.load_Keyaki_Annot_psd(DIR_SAMPLE),
+        }
+    )
+
+    tweak._COMMAND_TABLE["relax"].callback(ctx)
+    tweak._COMMAND_TABLE["del-janome"].callback(ctx)
+    tweak.push_tree_op(
+        ctx,
+        functools.partial(tree_ops.run_creator, _drop_some, skip_ill_trees),
+        "Dropping",
+    )
+    return [
+        (ID, nt.flatten_tree(tree))
+        for ID, tree in ctx.obj["treebank"]
+    ]
+
+@pytest.mark.parametrize("n_jobs", [2, 3])
+def test_push_tree_op_parallel(n_jobs: int):
+    expected = _run_chain(1, True)
+    assert expected
+    assert all(ID.number % 7 != 0 for ID, _ in expected)
+
+    assert _run_chain(n_jobs, True) == expected
+
+def test_push_tree_op_parallel_abort():
+    with pytest.raises(ValueError):
+        _run_chain(2, False)
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_push_tree_op_profile(n_jobs: int):
+    profiler = prof.Profiler()
+    prof.activate(profiler)
+    try:
+        trees = _run_chain(n_jobs, True)
+    finally:
+        prof.activate(None)
+
+    stats = profiler.stages["Dropping"]
+    assert stats.trees_in == profiler.stages["Running relax"].trees_out > 0
+    assert stats.trees_out == len(trees)
+    assert stats.skipped == stats.trees_in - stats.trees_out
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_profile_stages_once(tmp_path: pathlib.Path, n_jobs: int):
+    ctx = types.SimpleNamespace(
+        obj = {
+            "CONFIG": dict(CONF.CONF_DEFAULT),
+            "n_jobs": n_jobs,
+            "treebank": nt.load_Keyaki_Annot_psd(DIR_SAMPLE, prog_stream = None),
+        }
+    )
+
+    profiler = prof.Profiler()
+    prof.activate(profiler)
+    try:
+        tweak._COMMAND_TABLE["relax"].callback(ctx)
+        stage = tweak._COMMAND_TABLE["del-janome"].callback(ctx)
+        # `tqdm.auto` calls `iter` on its iterable once more than it iterates
+        iter(stage)
+        streams = [
+            stage,
+            tweak.cmd_write(ctx, tmp_path / "out.psd", False, False, [], False),
+        ]
+        tweak._drain_treebank(streams)
+    finally:
+        prof.activate(None)
+
+    desc_stage = "Running relax; Del'ing Janome analyses"
+    if n_jobs > 1:
+        desc_stage += f" ({n_jobs} processes)"
+    # each stage once
+    assert sorted(profiler.stages) == sorted(
+        (
+            "Running relax", "Del'ing Janome analyses",
+            desc_stage, "Writing out ABC trees",
+        )
+    )
+    num_trees = profiler.stages["Writing out ABC trees"].trees_out
+    assert num_trees > 0
+    assert profiler.stages["Running relax"].trees_out == num_trees
+
+def test_write_folder_jobs(monkeypatch, tmp_path: pathlib.Path):
+    n_jobs_used = []
+    init_orig = nt.PSDFolderWriter.__init__
+
+    def _init(self, *args, **kwargs):
+        init_orig(self, *args, **kwargs)
+        n_jobs_used.append(self.n_jobs)
+
+    monkeypatch.setattr(nt.PSDFolderWriter, "__init__", _init)
+
+    config = dict(CONF.CONF_DEFAULT)
+    config["max_process_num"] = 3
+    ctx = types.SimpleNamespace(
+        obj = {
+            "CONFIG": config,
+            "n_jobs": 1,
+            "treebank": nt.load_Keyaki_Annot_psd(DIR_SAMPLE, prog_stream = None),
+        }
+    )
+    tweak._drain_treebank(
+        [tweak.cmd_write(ctx, tmp_path, True, False, [], False)]
+    )
+
+    # as configured
+    assert n_jobs_used == [3]
+    assert any(tmp_path.iterdir())
+
+def test_decrypt_stream(trees, tmp_path: pathlib.Path):
+    path_source = tmp_path / "source.tsv"
+    with open(path_source, "w") as h_source:
+        for ID, tree in trees:
+            text = "".join(
+                word for word in tree.leaves()
+                if not (word.startswith("*") or word.startswith("__"))
+            )
+            h_source.write(f"{ID}\t{text}\n")
+
+    ctx = types.SimpleNamespace(
+        obj = {
+            "CONFIG": dict(CONF.CONF_DEFAULT),
+            "n_jobs": 1,
+            "treebank": iter(copy.deepcopy(trees)),
+        }
+    )
+    tweak.cmd_obfuscate_tree(ctx, ".")
+    tweak.cmd_decrypt_tree(ctx, ".", 10, path_source)
+
+    assert [
+        (ID, nt.flatten_tree(tree)) for ID, tree in ctx.obj["treebank"]
+    ] == [
+        (ID, nt.flatten_tree(tree)) for ID, tree in trees
+    ]
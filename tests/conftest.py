@@ -0,0 +1,30 @@
+import pathlib
+
+import pytest
+
+import abctk.io.nltk_tree as nt
+
+DIR_SAMPLE = pathlib.Path(__file__).parent / "resources/trees/ABCTreebank_sample"
+
+@pytest.fixture(scope = "session")
+def dir_sample() -> pathlib.Path:
+    return DIR_SAMPLE
+
+@pytest.fixture(scope = "session")
+def trees():
+    """
+    The sample trees with their IDs, shared among the tests.
+    Copy them before modifying them.
+    """
+    return list(nt.load_Keyaki_Annot_psd(DIR_SAMPLE, prog_stream = None))
+
+@pytest.fixture(scope = "session")
+def trees_unparsed():
+    """
+    The sample trees with their IDs, whose labels are left unparsed.
+    Copy them before modifying them.
+    """
+    return [
+        nt.split_ID_from_Tree(tree)
+        for tree in nt.iter_psd_trees(DIR_SAMPLE)
+    ]
@@ -0,0 +1,210 @@
+import io
+import pathlib
+import typing
+
+import pytest
+from nltk import Tree
+
+import abctk.io.nltk_tree as nt
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "resources/trees/ABCTreebank_sample"
+
+def test_find_psd_files():
+    paths = nt.find_psd_files(DIR_SAMPLE)
+    assert paths == sorted(p.name for p in DIR_SAMPLE.glob("*.psd"))
+
+    assert nt.find_psd_files(DIR_SAMPLE, r"misc_KNB") == []
+    assert nt.find_psd_files(DIR_SAMPLE, r"misc_KNB.*") == ["misc_KNB-b2psg.psd"]
+
+def test_iter_psd_trees_equiv():
+    # The sample files put one tree per line
+    trees_expected = []
+    for path in nt.find_psd_files(DIR_SAMPLE):
+        with open(DIR_SAMPLE / path) as h:
+            trees_expected.extend(
+                Tree.fromstring(line) for line in h if line.strip()
+            )
+
+    trees = list(nt.iter_psd_trees(DIR_SAMPLE))
+    assert trees == trees_expected
+
+def test_iter_trees_from_stream_multiline():
+    source = io.StringIO(
+        "junk before the first tree\n"
+        "( (S (NP 太郎)\n"
+        "     (VP 走る))\n"
+        "  (ID 1_test))\n"
+        "(TOP (S (、)) (ID 2_test))\n"
+    )
+    trees = list(nt.iter_trees_from_stream(source))
+
+    assert trees == [
+        Tree.fromstring("( (S (NP 太郎) (VP 走る)) (ID 1_test))"),
+        Tree.fromstring("(TOP (S (、 、)) (ID 2_test))"),
+    ]
+
+def test_iter_trees_from_stream_ill_trees():
+    source = "(TOP (S (NP 太郎) (ID 1_test))\n(TOP (S 花子) (ID 2_test))\n"
+
+    trees = list(nt.iter_trees_from_stream(io.StringIO(source)))
+    assert trees == [Tree.fromstring("(TOP (S 花子) (ID 2_test))")]
+
+    with pytest.raises(nt.InvalidTreeSyntaxException):
+        list(
+            nt.iter_trees_from_stream(
+                io.StringIO(source),
+                skip_ill_trees = False,
+            )
+        )
+
+def test_split_psd_file():
+    path = DIR_SAMPLE / "misc_KNB-b2psg.psd"
+    chunks = list(nt._split_psd_file(str(path), path.name, chunk_size = 4096))
+    assert len(chunks) > 1
+
+    with open(path, "rb") as h:
+        content = h.read()
+
+    offset = 0
+    for chunk in chunks:
+        assert chunk.offset == offset
+        assert content[chunk.offset:chunk.offset + 1] == b"("
+        offset += chunk.length
+    assert offset == len(content)
+
+def test_load_ABC_psd_parallel():
+    trees_serial = list(
+        nt.load_ABC_psd(DIR_SAMPLE, prog_stream = None, n_jobs = 1)
+    )
+    trees_parallel = list(
+        nt.load_ABC_psd(DIR_SAMPLE, prog_stream = None, n_jobs = 2)
+    )
+
+    assert [str(ID) for ID, _ in trees_parallel] == [str(ID) for ID, _ in trees_serial]
+    assert [tree for _, tree in trees_parallel] == [tree for _, tree in trees_serial]
+
+def test_load_ABC_psd_chunk_lines(tmp_path: pathlib.Path):
+    # not line breaks in reading files
+    (tmp_path / "a.psd").write_text(
+        "(S (N a)\n (COMMENT {x (N b)\x0c})\n (ID 1_a))\n"
+        "(S (N c) (ID 2_a))\n",
+        encoding = "utf-8",
+    )
+    trees_serial = list(
+        nt.load_ABC_psd(tmp_path, prog_stream = None, skip_ill_trees = False)
+    )
+    assert len(trees_serial) == 2
+
+    chunks = list(nt._split_psd_file(str(tmp_path / "a.psd"), "a.psd"))
+    trees_chunk = [
+        tree
+        for chunk in chunks
+        for tree in nt._load_ABC_psd_chunk(chunk, skip_ill_trees = False)
+    ]
+    assert [str(ID) for ID, _ in trees_chunk] == [str(ID) for ID, _ in trees_serial]
+    assert [tree for _, tree in trees_chunk] == [tree for _, tree in trees_serial]
+
+def _iter_sample_lines(read: typing.List[int]):
+    for path in nt.find_psd_files(DIR_SAMPLE):
+        with open(DIR_SAMPLE / path) as h:
+            for line in h:
+                read[0] += 1
+                yield line
+
+@pytest.mark.parametrize(
+    "load_psd, load_stream",
+    [
+        (nt.load_Keyaki_Annot_psd, nt.load_Keyaki_Annot_stream),
+        (
+            lambda folder, **kwargs: nt.load_ABC_psd(folder, n_jobs = 1, **kwargs),
+            nt.load_ABC_stream,
+        ),
+    ]
+)
+def test_load_stream(load_psd, load_stream):
+    expected = list(load_psd(DIR_SAMPLE, prog_stream = None))
+
+    read = [0]
+    trees = load_stream(_iter_sample_lines(read), prog_stream = None)
+
+    # the first tree comes before the whole stream is read
+    ID_first, tree_first = next(trees)
+    assert read[0] < 3
+
+    trees = [(ID_first, tree_first)] + list(trees)
+    assert [str(ID) for ID, _ in trees] == [str(ID) for ID, _ in expected]
+    assert [tree for _, tree in trees] == [tree for _, tree in expected]
+
+def _flatten_tree_recursive(tree, **kwargs):
+    # the former recursive implementation of nt.flatten_tree
+    if isinstance(tree, Tree):
+        label = tree.label()
+        label_pprint = (
+            label.pprint(**kwargs) if isinstance(label, nt.Annot)
+            else str(label)
+        )
+        children_pprint = " ".join(
+            _flatten_tree_recursive(child, **kwargs) for child in tree
+        )
+        return f"({label_pprint} {children_pprint})"
+    else:
+        return str(tree)
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"hide_all_feats": True},
+        {"hide_all_feats": True, "feats_to_print": ("role", )},
+        {"verbose_role": True},
+    ]
+)
+def test_PTBWriter(options):
+    trees = list(
+        nt.load_ABC_psd(
+            DIR_SAMPLE, "misc_KNB.*",
+            prog_stream = None,
+            n_jobs = 1,
+        )
+    )
+    trees.append((trees[0][0], Tree("X", [])))
+
+    expected = "".join(
+        f"(TOP {_flatten_tree_recursive(tree, **options)} (ID {ID}))\n"
+        for ID, tree in trees
+    )
+
+    out = io.StringIO()
+    with nt.PTBWriter(out, buffer_size = 100, **options) as writer:
+        for ID, tree in trees:
+            writer.write_tree_with_ID(ID, tree)
+    assert out.getvalue() == expected
+
+    assert nt.flatten_tree_with_ID(*trees[0], **options) == expected.split("\n")[0]
+
+def test_PSDFolderWriter_jobs(tmp_path: pathlib.Path):
+    # written one at a time unless specified
+    assert nt.PSDFolderWriter(tmp_path).n_jobs == 1
+    assert nt.PSDFolderWriter(tmp_path, n_jobs = 4).n_jobs == 4
+
+@pytest.mark.parametrize("max_memory", [1024, 256 * 1024 ** 2])
+def test_dump_ABC_to_psd(tmp_path: pathlib.Path, max_memory: int):
+    trees = list(
+        nt.load_ABC_psd(DIR_SAMPLE, prog_stream = None, n_jobs = 1)
+    )
+
+    # the former implementation, without duplicated IDs
+    expected = {}
+    for ID, tree in sorted(trees[::-1], key = lambda x: x[0]):
+        expected.setdefault(ID.name, []).append(nt.flatten_tree_with_ID(ID, tree))
+
+    nt.dump_ABC_to_psd(
+        trees[::-1], tmp_path,
+        prog_stream = None,
+        max_memory = max_memory,
+        n_jobs = 2,
+    )
+    
+    for name, texts in expected.items():
+        path = tmp_path / nt.Keyaki_ID.from_string("0_" + name).tell_path()
+        assert path.read_text() == "\n".join(texts)
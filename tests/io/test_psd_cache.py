@@ -0,0 +1,58 @@
+import os
+import pathlib
+import shutil
+
+import abctk.io.nltk_tree as nt
+import abctk.io.psd_cache as pc
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "resources/trees/ABCTreebank_sample"
+
+def _load(folder, cache):
+    return [
+        (str(ID), str(tree))
+        for ID, tree in nt.load_ABC_psd(
+            folder,
+            prog_stream = None,
+            n_jobs = 1,
+            cache = cache,
+        )
+    ]
+
+def test_load_ABC_psd_cached(tmp_path: pathlib.Path):
+    folder = tmp_path / "treebank"
+    shutil.copytree(DIR_SAMPLE, folder)
+    cache = pc.PSDCache(tmp_path / "cache")
+
+    expected = _load(folder, None)
+
+    # cold
+    assert _load(folder, cache) == expected
+    stats = cache.stats()
+    assert stats.entries == len(nt.find_psd_files(folder))
+
+    # warm
+    paths = nt.find_psd_files(folder)
+    assert all(
+        cache.is_valid("ABC", os.path.abspath(folder / path))
+        for path in paths
+    )
+    assert _load(folder, cache) == expected
+
+    # touched but not modified
+    path_target = folder / paths[0]
+    os.utime(path_target, ns = (0, 0))
+    assert cache.is_valid("ABC", os.path.abspath(path_target))
+
+    # modified
+    with open(path_target, "a") as h:
+        h.write("\n")
+    assert not cache.is_valid("ABC", os.path.abspath(path_target))
+    assert _load(folder, cache) == expected
+
+    assert cache.clear() == stats.entries
+    assert cache.stats().entries == 0
+
+def test_evict(tmp_path: pathlib.Path):
+    cache = pc.PSDCache(tmp_path / "cache", max_size = 0)
+    _load(DIR_SAMPLE, cache)
+    assert cache.stats().entries == 0
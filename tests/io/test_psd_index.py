@@ -0,0 +1,50 @@
+import pathlib
+import shutil
+
+import abctk.io.nltk_tree as nt
+import abctk.io.psd_index as pi
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "resources/trees/ABCTreebank_sample"
+
+def test_index_lookup(tmp_path: pathlib.Path):
+    folder = tmp_path / "treebank"
+    shutil.copytree(DIR_SAMPLE, folder)
+
+    trees = [
+        (str(ID), str(tree))
+        for ID, tree in nt.load_ABC_psd(folder, prog_stream = None, n_jobs = 1)
+    ]
+
+    with pi.PSDIndex(folder) as index:
+        stats = index.update()
+        assert stats.scanned == len(nt.find_psd_files(folder))
+        assert len(index) == len(trees)
+
+        for ID, tree in trees[::97]:
+            assert str(index.get_tree(ID)) == tree
+
+        assert index.get_tree("0_no_such_ID") is None
+
+def test_index_update(tmp_path: pathlib.Path):
+    folder = tmp_path / "treebank"
+    folder.mkdir()
+    path_a = folder / "a.psd"
+    path_b = folder / "b.psd"
+    path_a.write_text("( (S (NP 太郎) (VP 走る)) (ID 1_a))\n( (S 花子) (ID 2_a))\n")
+    path_b.write_text("( (S 次郎) (ID 1_b))\n")
+
+    with pi.PSDIndex(folder) as index:
+        assert index.update() == pi.IndexUpdateStats(scanned = 2, removed = 0, unchanged = 0)
+        assert index.get_raw("2_a") == "( (S 花子) (ID 2_a))\n"
+
+        path_a.write_text("( (S 三郎)\n  (ID 3_a))\n")
+        path_b.unlink()
+        assert index.update() == pi.IndexUpdateStats(scanned = 1, removed = 1, unchanged = 0)
+        assert index.locate("2_a") is None
+        assert index.locate("1_b") is None
+        assert index.get_raw("3_a") == "( (S 三郎)\n  (ID 3_a))\n"
+
+    # the index persists
+    with pi.PSDIndex(folder) as index:
+        assert index.update() == pi.IndexUpdateStats(scanned = 0, removed = 0, unchanged = 1)
+        assert len(index) == 1
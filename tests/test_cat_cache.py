@@ -0,0 +1,85 @@
+import pytest
+
+from abctk.obj.ABCCat import ABCCat, ABCCatReprMode
+import abctk.cat_cache as cc
+import abctk.config as CONF
+
+@pytest.fixture(autouse = True)
+def clear_memos():
+    cc.clear()
+    yield
+    cc.clear()
+
+@pytest.mark.parametrize(
+    "source",
+    ("NP", "<NP\\PPs>", "<<PPs\\Sm>/<PPs\\Sm>>", "<Sm|PPs>")
+)
+def test_parse_cat(source: str):
+    cat = cc.parse_cat(source)
+    assert cat == ABCCat.parse(source)
+    assert cc.parse_cat(source) is cat
+
+    info = cc.get_stats()["parse"]
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+@pytest.mark.parametrize(
+    "mode",
+    (ABCCatReprMode.TLCG, ABCCatReprMode.DEPCCG, ABCCatReprMode.CCG2LAMBDA)
+)
+def test_pprint_cat(mode: ABCCatReprMode):
+    source = "<<PPs\\Sm>/<PPs\\Sm>>"
+    expected = ABCCat.parse(source).pprint(mode)
+
+    assert cc.pprint_cat(source, mode) == expected
+    assert cc.pprint_cat(cc.parse_cat(source), mode) == expected
+    assert cc.get_stats()["pprint"].hits == 1
+
+@pytest.mark.parametrize(
+    "left, right",
+    (
+        ("NP", "<NP\\PPs>"),
+        ("<Sm/NP>", "NP"),
+        ("NP", "NP"),
+    )
+)
+def test_simplify_exh(left: str, right: str):
+    expected = ABCCat.simplify_exh(left, right)
+
+    res = cc.simplify_exh(left, right)
+    assert res == expected
+    assert isinstance(res, frozenset)
+    assert cc.simplify_exh(left, right) is res
+    assert cc.simplify_exh(cc.parse_cat(left), cc.parse_cat(right)) == expected
+
+    info = cc.get_stats()["simplify_exh"]
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+def test_configure():
+    try:
+        cc.configure({"simplify-exh-max-size": 1})
+        assert cc.get_stats()["simplify_exh"].maxsize == 1
+        assert cc.get_stats()["parse"].maxsize == (
+            CONF.CONF_DEFAULT["cat-cache"]["parse-max-size"]
+        )
+
+        cc.simplify_exh("NP", "<NP\\PPs>")
+        cc.simplify_exh("<Sm/NP>", "NP")
+        assert cc.get_stats()["simplify_exh"].currsize == 1
+    finally:
+        cc.configure(CONF.CONF_DEFAULT["cat-cache"])
+
+def test_bounded_memo_eviction():
+    memo = cc.BoundedMemo(lambda x: x * 2, maxsize = 2)
+    memo(1)
+    memo(2)
+    memo(1) # 1 is now the most recent
+    memo(3) # evicts 2
+
+    assert memo.info() == cc.MemoInfo(hits = 1, misses = 3, maxsize = 2, currsize = 2)
+    memo(1)
+    assert memo.hits == 2
+    memo(2)
+    assert memo.misses == 4
+
+    memo.resize(1)
+    assert memo.info().currsize == 1
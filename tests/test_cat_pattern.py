@@ -0,0 +1,86 @@
+import pytest
+
+from abctk.obj.ABCCat import ABCCat
+import abctk.cat_cache as cc
+import abctk.cat_pattern as cp
+
+@pytest.mark.parametrize(
+    "left, right, expected",
+    (
+        ("NP", "PPs", True),
+        ("<N/N>", "<NP/NP>", True),
+        ("<N/N>", "<N\\N>", False),
+        ("<<PPs\\Sm>/<PPs\\Sm>>", "<<PPo\\Sm>/<PPo\\Sm>>", True),
+        ("<<PPs\\Sm>/<PPs\\Sm>>", "<Sm/<PPs\\Sm>>", False),
+        ("<N/N>", "N", False),
+    )
+)
+def test_cat_shape(left: str, right: str, expected: bool):
+    shape_left, _ = cp.cat_shape(cc.parse_cat(left))
+    shape_right, _ = cp.cat_shape(cc.parse_cat(right))
+    assert (shape_left == shape_right) == expected
+
+@pytest.mark.parametrize("mode", list(cp.MatchMode))
+@pytest.mark.parametrize(
+    "pattern, cat",
+    (
+        ("<N/N>", "<N/N>"),
+        ("<N/N>", "<NP/NP>"),
+        ("<N/N>", "N"),
+        ("<PP\\S>", "<PP\\S>"),
+        ("<PP\\S>", "<<PP\\S>/<PP\\S>>"),
+    )
+)
+def test_cat_pattern(mode: cp.MatchMode, pattern: str, cat: str):
+    pat = cp.CatPattern(pattern, mode)
+
+    cat_parsed = ABCCat.parse(cat)
+    if mode is cp.MatchMode.EXACT:
+        expected = cat_parsed == ABCCat.parse(pattern)
+    elif mode is cp.MatchMode.IGNORE_FEATURE:
+        expected = cat_parsed.equiv_to(ABCCat.parse(pattern), ignore_feature = True)
+    else:
+        expected = bool(cat_parsed.unify(ABCCat.parse(pattern)))
+
+    assert pat.match(cat) == expected
+    assert pat(cat_parsed) == expected
+
+    # the verdict is memoized per interned category
+    assert pat.match(cat) == expected
+    assert pat._memo.info().hits == 1
+
+def test_cat_pattern_set():
+    pats = cp.CatPatternSet(
+        (
+            ("<N/N>", 0),
+            ("<NP\\NP>", 1),
+            ("N", 2),
+            ("<NP/NP>", 3),
+            ("<N/N>", 4),
+        ),
+        cp.MatchMode.EXACT,
+    )
+    assert len(pats) == 5
+
+    # in the given order
+    assert pats.match_all("<N/N>") == (0, 4)
+    assert pats.match_first("<N/N>") == 0
+    assert pats.match_any("<NP\\NP>")
+    assert pats.match_all("<N\\N>") == ()
+    assert pats.match_first("<<N/N>/<N/N>>", default = -1) == -1
+    assert not pats.match_any("NP")
+
+@pytest.mark.parametrize("mode", list(cp.MatchMode))
+def test_cat_pattern_set_consistent(mode: cp.MatchMode):
+    sources = (
+        "N", "NP", "⊥", "<N/N>", "<NP\\NP>", "<PP\\S>",
+        "<<PPs\\Sm>/<PPs\\Sm>>", "<Sm|PPs>", "<⊥/N>",
+    )
+    pats = cp.CatPatternSet(((s, s) for s in sources), mode)
+
+    for source in sources:
+        cat = cc.parse_cat(source)
+        assert pats.match_all(cat) == tuple(
+            s for s in sources
+            if cp.CatPattern(s, mode).match(cat)
+        )
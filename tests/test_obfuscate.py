@@ -0,0 +1,174 @@
+import copy
+import pathlib
+
+import pytest
+from nltk.tree import Tree
+
+import abctk.io.nltk_tree as nt
+import abctk.obfuscate as ob
+
+def _text(tree: Tree) -> str:
+    return "".join(
+        word for word in tree.leaves()
+        if not (word.startswith("*") or word.startswith("__"))
+    )
+
+def test_obfuscate_tree_in_place(trees):
+    for ID, tree in trees:
+        expected = nt.flatten_tree(ob.obfuscate_tree(tree))
+        tree_copied = tree.copy(deep = True)
+
+        res = ob.obfuscate_tree_in_place(tree_copied, ID)
+        assert res is tree_copied
+        assert nt.flatten_tree(res) == expected
+
+    tree = Tree.fromstring("(S (NP *pro*) (NP __dummy__) (VP (V 見た)))")
+    node_VP = tree[2]
+    ob.obfuscate_tree_in_place(tree)
+    assert tree == Tree.fromstring("(S (NP *pro*) (NP __dummy__) (VP (V ⛔⛔)))")
+    assert tree[2] is node_VP
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_obfuscate_psd_folder(
+    trees, dir_sample: pathlib.Path, tmp_path: pathlib.Path, n_jobs: int,
+):
+    with nt.PSDFolderWriter(tmp_path / "expected") as writer:
+        for ID, tree in trees:
+            if "KNB" in ID.name:
+                tree = ob.obfuscate_tree(tree)
+            writer.add(ID, tree)
+
+    res = list(
+        ob.obfuscate_psd_folder(
+            dir_sample, tmp_path / "res",
+            filter = "KNB",
+            n_jobs = n_jobs,
+        )
+    )
+    assert sum(count for _, count in res) == len(trees)
+
+    paths_expected = sorted(
+        p.relative_to(tmp_path / "expected")
+        for p in (tmp_path / "expected").rglob("*.psd")
+    )
+    assert paths_expected == sorted(
+        p.relative_to(tmp_path / "res")
+        for p in (tmp_path / "res").rglob("*.psd")
+    )
+    for path in paths_expected:
+        assert (
+            (tmp_path / "res" / path).read_bytes()
+            == (tmp_path / "expected" / path).read_bytes()
+        )
+
+def test_obfuscate_psd_folder_shared(tmp_path: pathlib.Path):
+    dir_source = tmp_path / "source"
+    dir_source.mkdir()
+    for num in (1, 2):
+        (dir_source / f"{num}.psd").write_text(
+            f"( (IP-MAT (N 花)) (ID {num}_closed_test;JP))\n"
+        )
+
+    with pytest.raises(ob.SharedOutputFileException):
+        list(ob.obfuscate_psd_folder(dir_source, tmp_path / "res"))
+
+def test_decrypt_tree_sample(trees):
+    for ID, tree in trees:
+        tree_obfus = ob.obfuscate_tree(tree)
+        text = _text(tree)
+
+        res, pos = ob.decrypt_tree(tree_obfus, text, ID = ID)
+        assert res == tree
+        assert pos == len(text)
+
+def test_decrypt_tree():
+    tree_obfus = Tree.fromstring(
+        "(S (NP (N ⛔⛔) (P ⛔)) (NP *pro*) (VP (V ⛔-⛔)))"
+    )
+    res, pos = ob.decrypt_tree(tree_obfus, "太郎がい")
+    # the source is too short for the last word
+    assert res == Tree.fromstring(
+        "(S (NP (N 太郎) (P が)) (NP *pro*) (VP (V ⛔-⛔)))"
+    )
+    assert pos == 4
+
+    res, pos = ob.decrypt_tree(tree_obfus, "太郎が見た")
+    assert res == Tree.fromstring(
+        "(S (NP (N 太郎) (P が)) (NP *pro*) (VP (V 見-た)))"
+    )
+    assert pos == 5
+
+    # the original is not modified
+    assert tree_obfus[0][0][0] == "⛔⛔"
+    # untouched subtrees are shared
+    assert res[1] is tree_obfus[1]
+
+def test_decrypt_tree_overflow():
+    tree_obfus = Tree.fromstring("(S (N ⛔⛔) (P ⛔⛔) (V ⛔))")
+    res, pos = ob.decrypt_tree(tree_obfus, "太郎が")
+
+    # the overflowing words remain untouched
+    assert res == Tree.fromstring("(S (N 太郎) (P ⛔⛔) (V ⛔))")
+    assert pos == 3
+
+def test_source_window():
+    source = [(i, f"text{i}") for i in range(10)]
+
+    window = ob.DecryptionSourceWindow(source, window = 3)
+    assert window.get(0) == "text0"
+    # read ahead within the window
+    assert window.get(2) == "text2"
+    assert window.get(1) == "text1"
+    # not found within the window
+    with pytest.raises(KeyError):
+        window.get(100)
+    # the oldest texts are discarded beyond the window
+    assert window.get(6) == "text6"
+    assert window.get(5) == "text5"
+    # kept for trees of the same ID until discarded
+    assert window.get(6) == "text6"
+    with pytest.raises(KeyError):
+        window.get(3)
+    assert window.get(8) == "text8"
+    assert window.get(7) == "text7"
+    with pytest.raises(KeyError):
+        window.get(6)
+
+def test_source_window_unbounded():
+    source = [(i, f"text{i}") for i in range(10)]
+
+    window = ob.DecryptionSourceWindow(source, window = 0)
+    assert [window.get(i) for i in reversed(range(10))] == [
+        f"text{i}" for i in reversed(range(10))
+    ]
+    # as with all the texts loaded first
+    assert [window.get(i) for i in range(10)] == [
+        f"text{i}" for i in range(10)
+    ]
+
+def test_source_window_duplicated_IDs():
+    trees = [
+        (ID, Tree.fromstring(f"(S (N ⛔⛔) (V ⛔) (ID {ID}))"))
+        for ID in ("1_closed_test", "2_closed_test", "2_closed_test", "3_closed_test")
+    ]
+    source = [
+        ("1_closed_test", "太郎来"),
+        ("2_closed_test", "花子寝"),
+        ("3_closed_test", "次郎見"),
+    ]
+
+    for window_size in (0, 1, 100):
+        window = ob.DecryptionSourceWindow(source, window = window_size)
+        res = [
+            ob.decrypt_tree(tree, window.get(ID), ID = ID)[0].leaves()[:2]
+            for ID, tree in copy.deepcopy(trees)
+        ]
+        assert res == [
+            ["太郎", "来"], ["花子", "寝"], ["花子", "寝"], ["次郎", "見"],
+        ]
+
+def test_parse_decryption_source():
+    res = list(ob.parse_decryption_source(["1_closed_test;JP\t太郎が来た\n"]))
+    assert len(res) == 1
+    assert res[0][0].name == "closed_test"
+    assert res[0][1] == "太郎が来た"
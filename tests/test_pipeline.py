@@ -0,0 +1,104 @@
+import copy
+import pathlib
+import types
+
+import pytest
+
+import abctk.config as CONF
+import abctk.io.nltk_tree as nt
+from abctk.cli_typer import tweak
+from abctk.pipeline import TreePipeline, InvalidPipelineException
+
+COMMANDS = (
+    "relax",
+    ("filter-annots", {"instructions": "0*;+role;+deriv"}),
+    "min-nodes",
+    ("restore-trace", {"generous": True}),
+    "del-janome",
+)
+
+def _flatten(trees):
+    return [(str(ID), nt.flatten_tree(tree)) for ID, tree in trees]
+
+def _run_cli(trees):
+    ctx = types.SimpleNamespace(
+        obj = {
+            "CONFIG": dict(CONF.CONF_DEFAULT),
+            "n_jobs": 1,
+            "treebank": iter(copy.deepcopy(trees)),
+        }
+    )
+    tweak._COMMAND_TABLE["relax"].callback(ctx)
+    tweak.cmd_filter_annots(ctx, "0*;+role;+deriv")
+    tweak.cmd_minimize_tree(ctx, True, True)
+    tweak.cmd_restore_trace(ctx, True)
+    tweak._COMMAND_TABLE["del-janome"].callback(ctx)
+    return list(ctx.obj["treebank"])
+
+def test_pipeline(trees):
+    expected = _flatten(_run_cli(trees))
+
+    pipeline = TreePipeline(COMMANDS)
+    assert pipeline.names == tuple(
+        c if isinstance(c, str) else c[0] for c in COMMANDS
+    )
+    assert _flatten(pipeline.run(copy.deepcopy(trees))) == expected
+
+    # streaming
+    stream = pipeline.stream(iter(copy.deepcopy(trees)))
+    ID, tree = next(stream)
+    assert (str(ID), nt.flatten_tree(tree)) == expected[0]
+
+    # single trees
+    res = []
+    for ID, tree in copy.deepcopy(trees):
+        tree = pipeline.run_tree(tree, ID)
+        if tree is not None:
+            res.append((ID, tree))
+    assert _flatten(res) == expected
+
+def test_pipeline_visitor_first(trees):
+    pipeline = TreePipeline(["filter-annots", "del-janome"])
+
+    expected = _flatten(TreePipeline(["relax"] + list(pipeline.names)).run(
+        copy.deepcopy(trees)
+    ))
+    assert _flatten(pipeline.run(copy.deepcopy(trees))) == expected
+
+def test_pipeline_parallel(trees):
+    expected = _flatten(TreePipeline(COMMANDS).run(copy.deepcopy(trees)))
+
+    with TreePipeline(COMMANDS, n_jobs = 2, chunk_size = 16) as pipeline:
+        batches = (trees[:500], trees[500:])
+
+        res = pipeline.run(copy.deepcopy(batches[0]))
+        executor = pipeline._executor
+        assert executor is not None
+
+        # the workers are reused
+        res += pipeline.run(copy.deepcopy(batches[1]))
+        assert pipeline._executor is executor
+
+    assert pipeline._executor is None
+    assert _flatten(res) == expected
+
+@pytest.mark.parametrize(
+    "commands",
+    [
+        ["no-such-command"],
+        ["flatten-conj"],
+        [("min-nodes", {"no_such_arg": True})],
+        # the source is required
+        ["decrypt"],
+        # the source is read along the stream
+        [("decrypt", {"source": pathlib.Path(__file__)})],
+    ]
+)
+def test_pipeline_invalid(commands):
+    with pytest.raises(InvalidPipelineException):
+        TreePipeline(commands)
+
+def test_pipeline_keeps_inputs(trees):
+    trees_copy = copy.deepcopy(trees[:50])
+    TreePipeline(["collapse-unary-nodes", "restore-unary-nodes"]).run(trees_copy)
+    assert _flatten(trees_copy) == _flatten(trees[:50])
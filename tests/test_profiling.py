@@ -0,0 +1,92 @@
+import json
+import pathlib
+import time
+
+import pytest
+
+import abctk.profiling as prof
+
+@pytest.fixture
+def profiler(tmp_path: pathlib.Path):
+    profiler = prof.Profiler(tmp_path / "profile.json")
+    prof.activate(profiler)
+    yield profiler
+    prof.activate(None)
+
+def _busy(seconds: float) -> None:
+    # spend CPU time
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+def _load():
+    for i in range(5):
+        _busy(0.01)
+        yield i
+
+def _double(source):
+    for i in source:
+        _busy(0.02)
+        yield i * 2
+
+def test_disabled():
+    prof.activate(None)
+
+    source = iter(range(3))
+    assert prof.wrap_iter("load", source) is source
+    assert prof.wrap_stage("double", _double) is _double
+    with prof.stage("block") as stats:
+        assert stats is None
+    prof.count_skipped()
+
+def test_exclusive(profiler: prof.Profiler):
+    tb = prof.wrap_iter("load", _load())
+    tb = prof.wrap_stage("double", _double)(tb)
+    assert list(tb) == [0, 2, 4, 6, 8]
+
+    load = profiler.stages["load"]
+    double = profiler.stages["double"]
+    assert (load.trees_in, load.trees_out) == (0, 5)
+    assert (double.trees_in, double.trees_out) == (5, 5)
+
+    # the time of the loader is not counted as that of the next stage
+    assert load.cpu == pytest.approx(0.05, abs = 0.02)
+    assert double.cpu == pytest.approx(0.1, abs = 0.02)
+    assert load.rss_peak > 0
+
+def _op(tree, ID):
+    if ID % 2:
+        prof.count_skipped()
+        return None
+    return tree
+
+def test_wrap_op(profiler: prof.Profiler):
+    op = prof.wrap_op("op", _op)
+    assert [op(i, i) for i in range(5)] == [0, None, 2, None, 4]
+
+    stats = profiler.stages["op"]
+    assert (stats.trees_in, stats.trees_out, stats.skipped) == (5, 3, 2)
+
+    # measurements of another process
+    exported = profiler.export()
+    assert stats.trees_in == 0
+
+    profiler.merge(exported)
+    profiler.merge(exported)
+    assert (stats.trees_in, stats.trees_out, stats.skipped) == (10, 6, 4)
+
+def test_dump(profiler: prof.Profiler):
+    with prof.stage("block") as stats:
+        stats.trees_out = 3
+    with prof.stage("block"):
+        pass
+
+    prof.close()
+    assert prof.get_profiler() is None
+
+    with open(profiler.path) as h:
+        report = json.load(h)
+    assert [s["name"] for s in report["stages"]] == ["block", "block #2"]
+    assert report["stages"][0]["trees_out"] == 3
+    assert report["rss_peak"] > 0
+    assert "hit_rate" in report["memos"]["simplify_exh"]
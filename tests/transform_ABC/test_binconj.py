@@ -1,3 +1,4 @@
+import copy
 import typing
 
 import pytest
@@ -7,6 +8,7 @@ from nltk.tree import Tree
 from abctk.obj.ABCCat import Annot, ABCCat
 import abctk.io.nltk_tree as at
 import abctk.transform_ABC.binconj as abin
+from abctk.transform_ABC.visitor import RebuildMode
 
 def parse_nodes(tree: typing.Union[Tree, str]):
     if isinstance(tree, Tree):
@@ -37,7 +39,7 @@ class TestItem(typing.NamedTuple):
 
     @classmethod
     def from_string(cls, source: str, answer_chopped_cat):
-        ID, tree = at._split_ID_from_Tree(
+        ID, tree = at.split_ID_from_Tree(
             Tree.fromstring(source)
         )
         parse_nodes(tree)
@@ -138,4 +140,38 @@ def test_binarize_conj_tree(item: TestItem):
 
     _test_tree(tree_bin)
 
-    print(tree_bin)
\ No newline at end of file
+    print(tree_bin)
+@pytest.mark.parametrize(
+    "item", test_items
+)
+@pytest.mark.parametrize(
+    "mode", list(RebuildMode)
+)
+def test_binarize_conj_tree_modes(item: TestItem, mode: RebuildMode):
+    tree_bin = abin.binarize_conj_tree(item.spanw_new().tree, item.ID)
+    
+    tree = item.spanw_new().tree
+    assert abin.binarize_conj_tree(tree, item.ID, mode = mode) == tree_bin
+
+def test_binarize_conj_tree_share():
+    tree = TestItem.from_string(
+        """
+( (S (NP#deriv=conj (NP 女) 
+                    (P や) 
+                    (NP 男))
+     (VP (V 来) (AX た)))
+  (ID 3))
+        """,
+        (),
+    ).tree
+    tree_orig = copy.deepcopy(tree)
+
+    tree_bin = abin.binarize_conj_tree(tree, mode = RebuildMode.SHARE)
+    assert tree == tree_orig
+    assert tree_bin == abin.binarize_conj_tree(tree)
+
+    # the spine above the conjunction is copied
+    assert tree_bin is not tree
+    # the others are shared
+    assert tree_bin[1] is tree[1]
+    assert tree_bin[0][0][0] is tree[0][0]
@@ -0,0 +1,94 @@
+import pytest
+
+import abctk
+import abctk.transform_ABC.morph_janome as mj
+
+SENTENCES = (
+    ("太郎", "が", "本", "を", "読ん", "だ"),
+    ("花子", "は", "走っ", "た"),
+    ("ＡＢＣ", "ツリーバンク"),
+)
+
+@pytest.fixture(scope = "module")
+def analyzer() -> mj.ABCMorphAnalyzer:
+    return mj.get_analyzer()
+
+def _no_analyzer() -> mj.ABCMorphAnalyzer:
+    raise AssertionError("The analyzer should not be built")
+
+def test_morph_cache(analyzer):
+    cache = mj.MorphCache(lambda: analyzer, maxsize = 2)
+
+    for words in SENTENCES + SENTENCES[-1:]:
+        expected = tuple(
+            mj.MorphToken.from_janome(token)
+            for token in analyzer.analyze(words)
+        )
+        assert cache.analyze(words) == expected
+        assert "".join(token.surface for token in expected) == "".join(words)
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 2)
+
+def test_morph_cache_persist(analyzer, tmp_path):
+    db_path = tmp_path / "morph.sqlite3"
+
+    cache = mj.MorphCache(lambda: analyzer, db_path = db_path)
+    res = [cache.analyze(words) for words in SENTENCES]
+    cache.close()
+
+    # found in the database
+    cache = mj.MorphCache(_no_analyzer, db_path = db_path)
+    assert [cache.analyze(words) for words in SENTENCES] == res
+    assert cache.db_hits == len(SENTENCES)
+    cache.close()
+
+    # not shared among dictionaries
+    cache = mj.MorphCache(
+        lambda: analyzer,
+        db_path = db_path,
+        dic_key = mj.make_dic_key([("ツリーバンク", 1285, 1285, 0, "名詞", "一般")]),
+    )
+    assert cache.analyze(SENTENCES[0]) == res[0]
+    assert cache.db_hits == 0
+    cache.close()
+
+def test_make_dic_key():
+    key = mj.make_dic_key()
+    assert f"abctk-{abctk.__version__};" in key
+    assert key.endswith(";user-dic-none")
+    assert mj.make_dic_key([("ツリーバンク", 1285, 1285, 0, "名詞", "一般")]) != key
+
+def test_add_morph_janome_cached():
+    from nltk.tree import Tree
+
+    mj.configure({"max-size": 16})
+    tree = Tree("S", [Tree("NP", ["太郎"]), Tree("VP", ["*pro*", "走っ", "た"])])
+    mj.add_morph_janome(tree)
+    mj.add_morph_janome(tree)
+
+    assert tree[0].label().feats["janome"].startswith("名詞,")
+    assert mj.get_cache().info().hits == 1
+
+def test_morph_analyze_janome_jigg(analyzer):
+    import lxml.etree as et
+    import abctk.transform_ABC.jigg as jg
+
+    words = SENTENCES[0]
+    tokens_root = et.Element("tokens")
+    for word in ("*pro*", ) + words:
+        et.SubElement(tokens_root, "token", surf = word)
+
+    jg._morph_analyze_janome(tokens_root)
+
+    expected = [
+        mj.MorphToken.from_janome(token)
+        for token in analyzer.analyze(words)
+    ]
+    tokens_xml = tokens_root.xpath("token")
+    assert tokens_xml[0].get("cForm") is None
+    assert [t.get("cForm") for t in tokens_xml[1:]] == [
+        token.infl_form or "*" for token in expected
+    ]
+    # the conjugation forms of 読ん and だ
+    assert [t.get("cForm") for t in tokens_xml[5:]] == ["連用タ接続", "基本形"]
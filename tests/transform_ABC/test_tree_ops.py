@@ -0,0 +1,79 @@
+import copy
+import functools
+
+import pytest
+
+import abctk.io.nltk_tree as nt
+import abctk.profiling as prof
+import abctk.transform_ABC.elim_trace as elim_trace
+import abctk.transform_ABC.tree_ops as tree_ops
+from abctk.transform_ABC.visitor import RebuildMode
+
+def test_appended_fuses_visitors():
+    stage = tree_ops.TreeOpStage(iter(()), (), ())
+    for name in ("del-janome", "filter-annots", "relax", "del-janome"):
+        stage = stage.appended(tree_ops.OPS[name].make(True), tree_ops.OPS[name].desc)
+
+    assert len(stage.ops) == 3
+    assert len(stage.ops[0].visitors) == 2
+    assert stage.descs[0] == "Del'ing Janome analyses; Filtering annotations"
+
+    # not fused across different handling of ill trees
+    stage = stage.appended(tree_ops.OPS["filter-annots"].make(False), "")
+    assert len(stage.ops) == 4
+
+    # transforms of whole trees are not visitors
+    stage = stage.appended(tree_ops.OPS["min-nodes"].make(False), "")
+    assert len(stage.ops) == 5
+
+# `bin-conj` is tested in test_binconj.py
+@pytest.mark.parametrize("name", ["collapse-unary-nodes", "restore-unary-nodes"])
+def test_rebuilder_mode(trees, name: str):
+    trees = copy.deepcopy(trees)
+    trees_orig = [nt.flatten_tree(tree) for _, tree in trees]
+
+    op = tree_ops.OPS[name].make(False)
+    res = [
+        nt.flatten_tree(op(tree, ID))
+        for ID, tree in trees
+    ]
+    # the inputs are kept by default
+    assert [nt.flatten_tree(tree) for _, tree in trees] == trees_orig
+
+    op_in_place = tree_ops.OPS[name].make(False, mode = RebuildMode.IN_PLACE)
+    assert [
+        nt.flatten_tree(op_in_place(tree, ID))
+        for ID, tree in copy.deepcopy(trees)
+    ] == res
+
+def _raise(exception: Exception, *args, **kwargs):
+    raise exception
+
+@pytest.mark.parametrize(
+    "target, exception, op",
+    (
+        (
+            "abctk.transform_ABC.elim_trace.restore_rel_trace",
+            elim_trace.ElimTraceException("1", None),
+            functools.partial(tree_ops._restore_trace, False, True),
+        ),
+        (
+            "abctk.obfuscate.obfuscate_tree_in_place",
+            ValueError("ill tree"),
+            tree_ops.OPS["obfus"].make(True, filter = "."),
+        ),
+    )
+)
+def test_count_skipped(monkeypatch, trees, target: str, exception: Exception, op):
+    monkeypatch.setattr(target, functools.partial(_raise, exception))
+
+    profiler = prof.Profiler()
+    prof.activate(profiler)
+    try:
+        op_profiled = prof.wrap_op("op", op)
+        for ID, tree in copy.deepcopy(trees[:3]):
+            op_profiled(tree, ID)
+    finally:
+        prof.activate(None)
+
+    assert profiler.stages["op"].skipped == 3
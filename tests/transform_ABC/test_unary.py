@@ -0,0 +1,62 @@
+import copy
+
+import pytest
+
+from nltk.tree import Tree
+
+from abctk.obj.ABCCat import Annot
+import abctk.transform_ABC.unary as un
+from abctk.transform_ABC.visitor import RebuildMode
+
+def test_collapse_restore():
+    tree = Tree.fromstring("(A (B (C c)) (D (E e) (F (G (H h)))))")
+
+    tree_collapsed = un.collapse_unary_nodes(tree)
+    assert tree_collapsed == Tree.fromstring("(A (B☆C c) (D (E e) (F☆G☆H h)))")
+    assert un.restore_unary_nodes(tree_collapsed) == tree
+
+@pytest.mark.parametrize("label, expected", [
+    ("A☆B", True),
+    ("A", False),
+    ("☆A", False),
+    (Annot("A☆B").cat, True),
+    (None, False),
+])
+def test_is_collapsed_label(label, expected: bool):
+    assert un.is_collapsed_label(label) == expected
+
+def test_restore_leading_delim():
+    tree = Tree.fromstring("(☆ (A a) (B b))")
+    assert un.restore_unary_nodes(tree) == tree
+
+@pytest.mark.parametrize("mode", list(RebuildMode))
+def test_modes(trees_unparsed, mode: RebuildMode):
+    for ID, tree in trees_unparsed:
+        tree_copied = copy.deepcopy(tree)
+
+        tree_collapsed = un.collapse_unary_nodes(tree_copied, ID, mode = mode)
+        assert tree_collapsed == un.collapse_unary_nodes(tree, ID)
+
+        tree_restored = un.restore_unary_nodes(tree_collapsed, ID, mode = mode)
+        assert tree_restored == tree
+
+        if mode is RebuildMode.IN_PLACE:
+            assert tree_restored is tree_copied
+        # === END IF ===
+
+def test_share():
+    tree = Tree.fromstring("(A (B (C c)) (D (E e) (F f)))")
+    tree_orig = copy.deepcopy(tree)
+
+    tree_collapsed = un.collapse_unary_nodes(tree, mode = RebuildMode.SHARE)
+    assert tree == tree_orig
+    assert tree_collapsed[1] is tree[1]
+
+    tree_restored = un.restore_unary_nodes(
+        tree_collapsed, mode = RebuildMode.SHARE
+    )
+    assert tree_restored == tree_orig
+    assert tree_restored[1] is tree[1]
+
+    # nothing to do
+    assert un.restore_unary_nodes(tree[1], mode = RebuildMode.SHARE) is tree[1]
@@ -0,0 +1,215 @@
+import copy
+import pickle
+import sys
+
+import pytest
+
+from nltk.tree import Tree
+
+import abctk.io.nltk_tree as nt
+from abctk.obj.ABCCat import Annot
+import abctk.obfuscate as ob
+import abctk.transform_ABC.elim_empty as ee
+import abctk.transform_ABC.norm as norm
+import abctk.transform_ABC.morph_janome as mj
+import abctk.transform_ABC.unary as un
+from abctk.transform_ABC.visitor import (
+    FusedTraversal, TreeVisitor, plan_passes,
+    RebuildMode, fold_tree, iter_nodes, rewrite_tree,
+)
+
+FUNCS = (
+    lambda tree, ID: norm.delete_feats(tree, ID, {"sort"}),
+    mj.del_morph_janome,
+    lambda tree, ID: norm.minimize_tree(tree, ID),
+    lambda tree, ID: norm.delete_all_feats_with_white_list(tree, ID, {"deriv", "role"}),
+)
+
+class MinimizeAlone(TreeVisitor):
+    """
+    A transform of whole trees, which is a boundary of passes.
+    """
+
+    def run_alone(self, tree, ID) -> None:
+        norm.minimize_tree(tree, ID)
+
+def make_visitors():
+    return (
+        norm.DeleteFeatsVisitor({"sort"}),
+        mj.DelJanomeVisitor(),
+        MinimizeAlone(),
+        norm.WhiteListFeatsVisitor({"deriv", "role"}),
+    )
+
+def _run_seq(trees):
+    res = []
+    for ID, tree in copy.deepcopy(trees):
+        for func in FUNCS:
+            func(tree, ID)
+        res.append(nt.flatten_tree(tree))
+    return res
+
+def test_plan_passes():
+    passes = plan_passes(make_visitors())
+    assert [len(p) for p in passes] == [2, 1, 1]
+
+    passes = plan_passes(
+        (
+            norm.DeleteFeatsVisitor({"sort"}),
+            mj.DelJanomeVisitor(),
+            MinimizeAlone(),
+            norm.WhiteListFeatsVisitor({"deriv"}),
+            mj.DelJanomeVisitor(),
+        )
+    )
+    assert [len(p) for p in passes] == [2, 1, 2]
+
+    with pytest.raises(TypeError):
+        plan_passes((TreeVisitor(), ))
+
+def test_fused_traversal(trees):
+    traversal = FusedTraversal(make_visitors())
+
+    res = []
+    for ID, tree in copy.deepcopy(trees):
+        traversal(tree, ID)
+        res.append(nt.flatten_tree(tree))
+
+    assert res == _run_seq(trees)
+
+def test_fused_traversal_local(trees):
+    funcs = (
+        lambda tree, ID: norm.delete_feats(tree, ID, {"sort"}),
+        mj.del_morph_janome,
+        lambda tree, ID: norm.delete_all_feats_with_white_list(tree, ID, {"deriv", "role"}),
+    )
+    traversal = FusedTraversal(
+        (
+            norm.DeleteFeatsVisitor({"sort"}),
+            mj.DelJanomeVisitor(),
+            norm.WhiteListFeatsVisitor({"deriv", "role"}),
+        )
+    )
+    assert len(traversal.passes) == 1
+
+    res = []
+    for ID, tree in copy.deepcopy(trees):
+        traversal(tree, ID)
+        res.append(nt.flatten_tree(tree))
+
+    res_seq = []
+    for ID, tree in copy.deepcopy(trees):
+        for func in funcs:
+            func(tree, ID)
+        res_seq.append(nt.flatten_tree(tree))
+
+    assert res == res_seq
+
+def test_fused_traversal_pickle(trees):
+    traversal = pickle.loads(pickle.dumps(FusedTraversal(make_visitors())))
+
+    res = []
+    for ID, tree in copy.deepcopy(trees):
+        traversal(tree, ID)
+        res.append(nt.flatten_tree(tree))
+
+    assert res == _run_seq(trees)
+
+def test_iter_nodes():
+    tree = Tree.fromstring("(A (B b (C c)) (D d) e)")
+    assert [n.label() for n in iter_nodes(tree)] == ["A", "B", "C", "D"]
+    assert list(iter_nodes("a")) == []
+
+    # children are taken after their parent is yielded
+    labels = []
+    for node in iter_nodes(tree):
+        labels.append(node.label())
+        if node.label() == "B":
+            node[1] = Tree("E", ["e"])
+    assert labels == ["A", "B", "E", "D"]
+
+def test_fold_tree():
+    tree = Tree.fromstring("(A (B b (C c)) (D dd) e)")
+
+    # the length of the text
+    assert fold_tree(tree, lambda node, values: sum(values), leaf = len) == 5
+    assert fold_tree("abc", lambda node, values: sum(values), leaf = len) == 3
+
+    # skipping subtrees
+    assert fold_tree(
+        tree,
+        lambda node, values: sum(values),
+        leaf = len,
+        pre = lambda node: node.label() != "B",
+        pruned = lambda node: 0,
+    ) == 3
+
+@pytest.mark.parametrize("mode", list(RebuildMode))
+def test_rewrite_tree(mode: RebuildMode):
+    tree = Tree.fromstring("(A (B b (C c)) (D d))")
+    tree_orig = copy.deepcopy(tree)
+    subtree_B, subtree_D = tree[0], tree[1]
+
+    res = rewrite_tree(
+        tree,
+        leaf = lambda leaf: leaf.upper() if leaf == "d" else leaf,
+        mode = mode,
+    )
+    assert res == Tree.fromstring("(A (B b (C c)) (D D))")
+
+    if mode is RebuildMode.COPY:
+        assert tree == tree_orig
+        assert res[0] is not subtree_B
+    elif mode is RebuildMode.SHARE:
+        assert tree == tree_orig
+        assert res is not tree
+        assert res[0] is subtree_B
+        assert res[1] is not subtree_D
+    else:
+        assert res is tree
+        assert res[0] is subtree_B
+        assert res[1] is subtree_D
+
+def _make_deep_tree(depth: int) -> Tree:
+    # a left-branching chain, e.g. of coordination
+    tree = Tree(Annot("N"), ["*pro*"])
+    for i in range(depth):
+        tree = Tree(
+            Annot("NP", {"i": str(i)}),
+            [tree, Tree(Annot("N"), [f"w{i}"])]
+        )
+    return tree
+
+def test_deep_tree():
+    depth = sys.getrecursionlimit() * 2
+    ID = "deep"
+
+    tree = _make_deep_tree(depth)
+    assert sum(1 for _ in iter_nodes(tree)) == depth * 2 + 1
+
+    span = norm.elaborate_char_spans(tree, ID)
+    # empty terminals are not counted
+    text_len = sum(len(f"w{i}") for i in range(depth))
+    assert span == (0, text_len)
+
+    norm.minimize_tree(tree, ID)
+    norm.delete_feats(tree, ID, {"i"})
+    assert "i" not in tree.label().feats
+
+    FusedTraversal(make_visitors())(tree, ID)
+
+    tree_obfus = ob.obfuscate_tree(tree, ID)
+    text = "".join(f"w{i}" for i in range(depth))
+    tree_decrypted, _ = ob.decrypt_tree(tree_obfus, text, ID = ID)
+    assert tree_decrypted[1][0] == f"w{depth - 1}"
+
+    tree_collapsed = un.collapse_unary_nodes(tree, ID)
+    tree_restored = un.restore_unary_nodes(tree_collapsed, ID)
+    assert sum(1 for _ in iter_nodes(tree_restored)) == depth * 2 + 1
+
+    assert ee.elim_empty_terminals(tree, ID) is False
+    # the empty terminal at the bottom is removed
+    bottom = tree
+    while len(bottom) == 2 and isinstance(bottom[0], Tree):
+        bottom = bottom[0]
+    assert bottom.label().feats["deriv"] == "unary-elim-empty"
@@ -0,0 +1,45 @@
+import io
+import pathlib
+
+import pytest
+
+from abctk.types.core import TypedTree
+from abctk.types.compact import CompactTypedTree, LabelTable
+
+DIR_SAMPLE = pathlib.Path(__file__).parent.parent / "resources/trees/ABCTreebank_sample"
+
+def _load_trees():
+    trees = []
+    for path in sorted(DIR_SAMPLE.glob("*.psd")):
+        with open(path) as h:
+            trees.extend(TypedTree._parse_PTB_stream(h, many = True, need_EOF = True))
+    return trees
+
+TREES = _load_trees()[::50] + [
+    TypedTree("a", []),
+    TypedTree("A", [TypedTree("B", []), TypedTree("C", [TypedTree("c", [])])]),
+]
+
+@pytest.mark.parametrize("tree", TREES)
+def test_compact_equiv(tree: TypedTree):
+    table = LabelTable()
+    compact = CompactTypedTree.from_typed_tree(tree, table)
+
+    assert compact.to_typed_tree() == tree
+    assert len(compact) == sum(1 for _ in tree.iter_df_topdown())
+    assert compact.root == tree.root
+
+    for include_term in (True, False):
+        assert list(compact.iter_df_topdown(include_term)) == list(tree.iter_df_topdown(include_term))
+        assert list(compact.iter_df_bottomup(include_term)) == list(tree.iter_df_bottomup(include_term))
+    assert list(compact.iter_terms()) == list(tree.iter_terms())
+    assert list(compact.iter_nonterms()) == list(tree.iter_nonterms())
+
+    fmapped = tree.fmap(str.lower, str.upper)
+    fmapped_compact = compact.fmap(str.lower, str.upper).to_typed_tree()
+    assert fmapped_compact.pprint(is_oneline = True) == fmapped.pprint(is_oneline = True)
+
+    func = lambda root, children: f"[{root} {' '.join(children)}]"
+    assert compact.fold(func) == tree.fold(func)
+
+    assert str(compact) == str(tree)
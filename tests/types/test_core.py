@@ -0,0 +1,107 @@
+import io
+import pathlib
+
+import pytest
+
+from abctk.types.core import TypedTree
+
+DIR_RESOURCES = pathlib.Path(__file__).parent.parent / "resources/trees"
+
+def _parse_both(source: str, **kwargs):
+    res = []
+    for parser in (
+        TypedTree._parse_PTB_stream,
+        TypedTree._parse_PTB_stream_LL1,
+    ):
+        try:
+            res.append(list(parser(io.StringIO(source), **kwargs)))
+        except (EOFError, ValueError) as e:
+            res.append(type(e))
+    return res
+
+@pytest.mark.parametrize(
+    "path",
+    sorted(DIR_RESOURCES.glob("**/*.psd")),
+    ids = lambda p: p.name,
+)
+def test_parse_PTB_stream_equiv_resources(path: pathlib.Path):
+    res_new, res_old = _parse_both(
+        path.read_text(),
+        many = True,
+        need_EOF = True,
+    )
+    assert res_new == res_old
+    assert res_new
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "",
+        "  \n",
+        "word",
+        "(A (B b) (C c))",
+        "( (A (B b)) (ID 1_test))\n( (C c) (ID 2_test))",
+        "(A\n (B b)\n (C　c))\n(D d)",
+        "((A a)(B b))",
+        "(A (B b)",
+        "(A (B b)))",
+        ")",
+        "(A ()) (B (C))",
+        "(A b) trailing",
+    ]
+)
+@pytest.mark.parametrize(
+    "many, need_EOF",
+    [(True, True), (True, False), (False, True), (False, False)],
+)
+def test_parse_PTB_stream_equiv(source: str, many: bool, need_EOF: bool):
+    res_new, res_old = _parse_both(source, many = many, need_EOF = need_EOF)
+    assert res_new == res_old
+
+def test_take_one_PTB_basic_from_stream():
+    source = io.StringIO("(A\n (B b))\n(C c)\n")
+    tree = TypedTree.take_one_PTB_basic_from_stream(source)
+    assert tree == TypedTree("A", [TypedTree("B", [TypedTree("b", [])])])
+    assert source.read() == "(C c)\n"
+
+def test_encode_trees():
+    from abctk.types.core import _encode_trees, _decode_tree
+
+    trees = list(
+        TypedTree._parse_PTB_stream(
+            io.StringIO("(A (B b) (C (D d) e))\n(F)\n(G g)"),
+            many = True,
+        )
+    )
+    encoded = _encode_trees(trees)
+    assert [_decode_tree(encoded, i) for i in range(len(trees))] == trees
+
+@pytest.mark.parametrize("mode", ["syspath", "url", "text"])
+def test_from_PTB_basic_FS(mode: str):
+    import fs
+    import fs.copy
+    import fs.memoryfs
+    from abctk.types.core import TypedTreebank, get_ID_from_TypedTree
+
+    folder = DIR_RESOURCES / "ABCTreebank_sample"
+    expected = {}
+    for path in sorted(folder.glob("*.psd")):
+        with open(path) as h:
+            expected.update(
+                map(
+                    get_ID_from_TypedTree,
+                    TypedTree._parse_PTB_stream(h, many = True, need_EOF = True),
+                )
+            )
+
+    if mode == "syspath":
+        filesys = fs.open_fs(str(folder))
+    elif mode == "url":
+        filesys = f"osfs://{folder}"
+    else:
+        filesys = fs.memoryfs.MemoryFS()
+        fs.copy.copy_fs(str(folder), filesys)
+
+    tb = TypedTreebank.from_PTB_basic_FS(filesys, process_num = 2)
+    assert len(tb.index) == len(expected)
+    assert dict(tb.index) == expected